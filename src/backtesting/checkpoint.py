@@ -0,0 +1,104 @@
+"""
+Checkpoints of long-running backtest loops.
+
+A rolling backtest is a sequence of independent solves linked only by a little state:
+the results so far, the weights carried into the next rebalance and, for the ML path,
+the fitted model and the random number generator. Saving that state every few
+rebalances lets a crashed or interrupted run restart from its last completed date
+instead of from the beginning. Checkpoints are zlib-compressed pickles, written
+atomically so that a crash during a save leaves the previous checkpoint intact. A
+``fingerprint`` of the run's settings and input data saved alongside lets a resume
+refuse a checkpoint written with other inputs.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Format version stored with every checkpoint; older checkpoints are refused
+CHECKPOINT_VERSION = 2
+
+
+def save_checkpoint(path: Union[str, Path], state: Dict[str, Any]) -> None:
+    """
+    Writes the loop state to ``path``, replacing any previous checkpoint.
+
+    Args:
+        path: Checkpoint file; its directory is created if needed.
+        state: Picklable loop state.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = zlib.compress(
+        pickle.dumps({"version": CHECKPOINT_VERSION, **state}, protocol=pickle.HIGHEST_PROTOCOL)
+    )
+
+    # Write to a temporary file first so that a crash never leaves a partial checkpoint
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except Exception:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+    logger.debug(f"Saved checkpoint {path.name} ({len(payload)} bytes).")
+
+
+def load_checkpoint(path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """
+    Reads a checkpoint written by ``save_checkpoint``.
+
+    Args:
+        path: Checkpoint file.
+
+    Returns:
+        The saved loop state, or None if there is no checkpoint at ``path``.
+
+    Raises:
+        ValueError: If the checkpoint was written by an incompatible version.
+    """
+    try:
+        with open(path, "rb") as f:
+            state = pickle.loads(zlib.decompress(f.read()))
+    except FileNotFoundError:
+        return None
+
+    version = state.pop("version", None)
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(
+            f"Checkpoint {path} has format version {version}, expected {CHECKPOINT_VERSION}."
+        )
+    return state
+
+
+def fingerprint(settings: Dict[str, Any], *data: Optional[Union[pd.DataFrame, pd.Series]]) -> str:
+    """
+    Hashes a run's settings and input data, to check that a checkpoint belongs to the run.
+
+    Args:
+        settings: Parameters of the run; their ``repr`` must identify them.
+        *data: Inputs of the run, labels and values; None is hashed distinctly.
+
+    Returns:
+        Hex digest identifying the run.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr(sorted(settings.items())).encode())
+    for frame in data:
+        if frame is None:
+            digest.update(b"<none>")
+            continue
+        labels = frame.columns if isinstance(frame, pd.DataFrame) else [frame.name]
+        digest.update(repr(list(labels)).encode())
+        digest.update(pd.util.hash_pandas_object(frame).to_numpy().tobytes())
+    return digest.hexdigest()
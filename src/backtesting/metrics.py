@@ -67,13 +67,22 @@ def _calculate_cvar_corrected(returns: pd.Series, alpha: float = 0.95) -> float:
     return -cvar  # Return as a positive value for loss
 
 
-def calculate_annual_turnover(daily_weights: pd.DataFrame) -> float:
+def calculate_annual_turnover(
+    daily_weights: pd.DataFrame, rebalance_turnover: pd.Series = None
+) -> float:
     """
     Calculates the annualized portfolio turnover from daily weights.
     Turnover is defined as half the sum of absolute changes in weights, annualized.
+
+    Drifting weights change every day without any trade. For a bought-and-held book pass
+    ``rebalance_turnover``, the L1 size of each rebalance's trades (e.g.
+    ``DriftAccounting.turnover``); only those trades are then counted, over the days of
+    ``daily_weights``.
     """
     if daily_weights is None or daily_weights.empty:
         return 0.0
+    if rebalance_turnover is not None:
+        return 0.5 * rebalance_turnover.sum() / len(daily_weights) * 252
     # The daily turnover is half the sum of absolute changes in weights
     daily_turnover = 0.5 * daily_weights.diff().abs().sum(axis=1)
     # Annualize by taking the mean daily turnover and multiplying by 252
@@ -86,8 +95,14 @@ def calculate_raw_metrics(
     benchmark_returns: pd.Series,
     daily_weights: pd.DataFrame = None,
     risk_free_rate: float = 0.0,
+    rebalance_turnover: pd.Series = None,
 ) -> pd.Series:
-    """Calculates key performance metrics and returns them as raw numbers."""
+    """
+    Calculates key performance metrics and returns them as raw numbers.
+
+    The annual turnover is computed from ``daily_weights``, or from the trades in
+    ``rebalance_turnover`` when the weights drift (see ``calculate_annual_turnover``).
+    """
     if not isinstance(portfolio_returns, pd.Series):
         portfolio_returns = pd.Series(portfolio_returns)
     if not isinstance(benchmark_returns, pd.Series):
@@ -115,7 +130,7 @@ def calculate_raw_metrics(
     metrics["95% CVaR"] = _calculate_cvar_corrected(portfolio_returns, 0.95)
 
     if daily_weights is not None:
-        metrics["Annual Turnover"] = calculate_annual_turnover(daily_weights)
+        metrics["Annual Turnover"] = calculate_annual_turnover(daily_weights, rebalance_turnover)
     else:
         metrics["Annual Turnover"] = np.nan
 
@@ -4,14 +4,107 @@ Implements the CLEIR methodology for Task A
 """
 
 import logging
+import multiprocessing
+import queue
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 import cvxpy as cp
-from typing import List, Tuple, Optional, Dict
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, fields, replace
+
+from .factor_model import PCAFactorModel
+from .first_order import cvar_of_losses, project_capped_simplex, solve_cvar_first_order
+from .lp_backend import solve_cvar_column_generation, solve_cvar_cutting_plane, solve_cvar_lp
+from .presolve import PresolvedCVaR, presolve_cvar
+from .result_cache import ResultCache
+from .scenario_reduction import ScenarioReducer
+from .sensitivity import weight_sensitivities
+from ..backtesting.accounting import DriftAccounting, drift_accounting
+from ..backtesting.checkpoint import fingerprint, load_checkpoint, save_checkpoint
 
 logger = logging.getLogger(__name__)
 
+# Solvers that bypass CVXPY and work on the NumPy arrays directly
+NATIVE_SOLVERS = {
+    "HIGHS": solve_cvar_lp,
+    "CUTTING_PLANE": solve_cvar_cutting_plane,
+    "COLUMN_GENERATION": solve_cvar_column_generation,
+    "FIRST_ORDER": solve_cvar_first_order,
+}
+
+# Solvers that can be seeded with a previous primal-dual solution through CVXPY
+WARM_START_SOLVERS = ["SCS", "OSQP"]
+
+# Upper bound on compiled problems kept per optimizer (one per distinct window shape)
+MAX_CACHED_PROBLEMS = 8
+
+# Serializes compilations, whose warning filter is process-wide state shared by all threads
+_COMPILE_LOCK = threading.Lock()
+
+# Solvers raced against each other by solver="RACE" unless race_solvers is given
+RACE_SOLVERS = ["ECOS", "SCS", "CLARABEL", "HIGHS"]
+
+# Solvers whose 'optimal' answers solve the LP to full accuracy; SCS and 'FIRST_ORDER'
+# stop at a looser tolerance
+EXACT_SOLVERS = ["HIGHS", "ECOS", "CLARABEL", "CUTTING_PLANE", "COLUMN_GENERATION"]
+
+# OptimizationResult fields collected per rebalance by RollingCVaROptimizer.backtest
+TELEMETRY_FIELDS = [
+    "status",
+    "solver",
+    "solvers_tried",
+    "total_time",
+    "presolve_time",
+    "setup_time",
+    "solve_time",
+    "iterations",
+    "iterations_saved",
+    "n_scenarios",
+    "n_assets",
+    "n_factors",
+    "n_variables",
+    "n_constraints",
+    "from_cache",
+]
+
+# CVXPY solvers with a native wall-clock limit, and the option that sets it
+TIME_LIMIT_OPTIONS = {"SCS": "time_limit_secs", "CLARABEL": "time_limit", "OSQP": "time_limit"}
+
+# CVXPY solvers with only an iteration limit, and the option that sets it. Under a time
+# budget the limit is derived from the time per iteration of the problem's previous solve.
+ITERATION_LIMIT_OPTIONS = {"ECOS": "max_iters"}
+
+# Regime probabilities solved by RegimeAwareCVaROptimizer.solve_regime_path by default
+REGIME_GRID = (0.0, 0.25, 0.5, 0.75, 1.0)
+
+
+@dataclass(frozen=True)
+class CVaRParams:
+    """
+    Parameters of one CVaR solve.
+
+    Passed per call (``optimize(..., params=...)``) instead of set on the optimizer, so
+    that a single optimizer can serve concurrent solves with different parameters.
+    """
+
+    alpha: float
+    lasso_penalty: float
+    max_weight: float
+    transaction_cost: float
+    warm_start: bool = False
+
+
+@dataclass(frozen=True)
+class AlphaAwareParams(CVaRParams):
+    """Parameters of one alpha-aware CVaR solve."""
+
+    alpha_factor: float = 0.01
+
 
 @dataclass
 class OptimizationResult:
@@ -25,6 +118,206 @@ class OptimizationResult:
     turnover: float
     status: str
     solve_time: float
+    iterations: Optional[int] = None
+    # Iterations a warm-started solver saved versus its first (cold) solve of the same
+    # compiled problem; None for solvers that ignore warm starts
+    iterations_saved: Optional[int] = None
+    # Solver that produced the weights (the fallback or the race winner, if any)
+    solver: Optional[str] = None
+    # Solvers attempted, in order, including failed ones earlier in the fallback chain
+    solvers_tried: Optional[List[str]] = None
+    # Wall-clock time of the whole call, and its parts outside the solver itself:
+    # presolve, scenario reduction and factor compression, then CVXPY parameter loading
+    # and canonicalization (or LP assembly) plus the solver's own setup
+    total_time: Optional[float] = None
+    presolve_time: Optional[float] = None
+    setup_time: Optional[float] = None
+    # Dimensions of the problem handed to the solver
+    n_scenarios: Optional[int] = None
+    n_assets: Optional[int] = None
+    n_factors: Optional[int] = None
+    n_variables: Optional[int] = None
+    n_constraints: Optional[int] = None
+    # Whether the result was served by the optimizer's ResultCache
+    from_cache: bool = False
+    # d(weights)/d(parameter) per parameter, when requested with ``sensitivities=True``
+    sensitivities: Optional[Dict[str, np.ndarray]] = None
+
+
+@dataclass
+class RegimePath:
+    """Solutions of one window on a grid of regime probabilities, with the window's data."""
+
+    grid: np.ndarray
+    results: List[OptimizationResult]
+    params: CVaRParams
+    returns: np.ndarray
+    benchmark: np.ndarray
+    current_weights: Optional[np.ndarray] = None
+    labels: Optional[np.ndarray] = None
+    scenario_weights: Optional[np.ndarray] = None
+    missing_assets: Optional[np.ndarray] = None
+
+
+@dataclass
+class BacktestState:
+    """End state of a rolling backtest, from which it is extended as new days arrive."""
+
+    # Last trading day accounted for
+    last_date: pd.Timestamp
+    # Last rebalance: its date, target weights and the holdings it traded from
+    last_rebalance: pd.Timestamp
+    targets: pd.Series
+    pre_trade: pd.Series
+    # Weights carried into the next optimization, and the solver's warm start
+    current_weights: np.ndarray
+    last_weights: Optional[np.ndarray] = None
+
+
+class _CVaRProblem:
+    """
+    DPP-compliant CVaR-LASSO problem compiled once for a fixed (T, N) shape.
+
+    The returns window, benchmark, current weights and optimizer parameters are all
+    ``cp.Parameter``s, so a rebalance only updates parameter values before solving and
+    CVXPY reuses the canonicalization from the first solve.
+
+    With ``n_factors``, the returns parameter holds factor scores (T x k) and the
+    tracking error is priced through the exposures ``y = B.T @ w`` of a factor model.
+    Without ``with_lasso``, the L1 term (constant on the long-only budget set) is left
+    out of the compiled problem altogether.
+    """
+
+    def __init__(
+        self,
+        n_scenarios: int,
+        n_assets: int,
+        n_factors: Optional[int] = None,
+        with_lasso: bool = True,
+    ):
+        self.n_scenarios = n_scenarios
+        self.n_assets = n_assets
+        self.n_factors = n_factors
+        # Iteration count of each solver's first (cold) solve, the reference for warm-start
+        # savings
+        self.cold_iterations: Dict[str, int] = {}
+
+        # --- Data and parameters ---
+        self.returns = cp.Parameter((n_scenarios, n_factors or n_assets))
+        self.loadings = cp.Parameter((n_assets, n_factors)) if n_factors else None
+        self.benchmark = cp.Parameter(n_scenarios)
+        self.current_weights = cp.Parameter(n_assets)
+        self.linear_tilt = cp.Parameter(n_assets)
+        # p_t / (1 - alpha) per scenario, so the CVaR term stays DPP-compliant
+        self.tail_weights = cp.Parameter(n_scenarios, nonneg=True)
+        self.max_weight = cp.Parameter(nonneg=True)
+        self.lasso_penalty = cp.Parameter(nonneg=True) if with_lasso else None
+        self.transaction_cost = cp.Parameter(nonneg=True)
+
+        # --- Variables ---
+        self.w = cp.Variable(n_assets)
+        self.z = cp.Variable(n_scenarios)
+        self.zeta = cp.Variable()
+        # Epigraph of |w - current_weights|; keeps the turnover term DPP-compliant
+        self.trades = cp.Variable(n_assets)
+
+        if n_factors:
+            # Exposures as a variable keep both products parameter-times-variable (DPP)
+            self.exposures = cp.Variable(n_factors)
+            tracking_error = (self.returns @ self.exposures) - self.benchmark
+        else:
+            tracking_error = (self.returns @ self.w) - self.benchmark
+        self.cvar = self.zeta + self.tail_weights @ self.z
+
+        objective = (
+            self.cvar
+            + self.transaction_cost * cp.sum(self.trades)
+            - self.linear_tilt @ self.w
+        )
+        if with_lasso:
+            objective += self.lasso_penalty * cp.norm1(self.w)
+        constraints = [
+            self.z >= 0,
+            self.z >= -tracking_error - self.zeta,
+            cp.sum(self.w) == 1.0,  # Fully invested constraint
+            self.w >= 0,
+            self.w <= self.max_weight,
+            self.trades >= self.w - self.current_weights,
+            self.trades >= self.current_weights - self.w,
+        ]
+        if n_factors:
+            constraints.append(self.exposures == self.loadings.T @ self.w)
+        self.problem = cp.Problem(cp.Minimize(objective), constraints)
+        metrics = self.problem.size_metrics
+        self.n_variables = metrics.num_scalar_variables
+        self.n_constraints = metrics.num_scalar_eq_constr + metrics.num_scalar_leq_constr
+        # Seconds per iteration of the last solve with each solver
+        self.iteration_time: Dict[str, float] = {}
+        # Solver CVXPY's cached solving chain was compiled for
+        self.compiled_solver: Optional[str] = None
+
+    def set_data(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        alpha: float,
+        max_weight: float,
+        lasso_penalty: float,
+        transaction_cost: float,
+        current_weights: Optional[np.ndarray] = None,
+        linear_tilt: Optional[np.ndarray] = None,
+        scenario_weights: Optional[np.ndarray] = None,
+        factor_loadings: Optional[np.ndarray] = None,
+    ) -> None:
+        """Loads one window of data and the optimizer parameters into the problem."""
+        self.returns.value = R
+        if self.loadings is not None:
+            self.loadings.value = factor_loadings
+        self.benchmark.value = b
+        probabilities = (
+            scenario_weights
+            if scenario_weights is not None
+            else np.full(self.n_scenarios, 1.0 / self.n_scenarios)
+        )
+        self.tail_weights.value = probabilities / (1 - alpha)
+        self.max_weight.value = max_weight
+        if self.lasso_penalty is not None:
+            self.lasso_penalty.value = lasso_penalty
+        if current_weights is not None:
+            self.current_weights.value = current_weights
+            self.transaction_cost.value = transaction_cost
+        else:
+            self.current_weights.value = np.zeros(self.n_assets)
+            self.transaction_cost.value = 0.0
+        self.linear_tilt.value = (
+            linear_tilt if linear_tilt is not None else np.zeros(self.n_assets)
+        )
+
+    def solve(self, **solver_kwargs: Any) -> None:
+        """Solves the problem with the loaded data, compiling it first for a new solver."""
+        solver = solver_kwargs["solver"]
+        if solver != self.compiled_solver:
+            # The problem is compiled once and re-solved with new parameter values, which
+            # is exactly the trade-off CVXPY's large-parameter DPP warning advises against
+            # for one-off solves. The warning is only raised while compiling, so it is
+            # silenced there, under a lock because the filter list is process-wide.
+            with _COMPILE_LOCK, warnings.catch_warnings():
+                warnings.filterwarnings(
+                    "ignore", message="Your problem has too many parameters", category=UserWarning
+                )
+                self.problem.get_problem_data(solver)
+            self.compiled_solver = solver
+        self.problem.solve(**solver_kwargs)
+        stats = self.problem.solver_stats
+        if stats.num_iters and stats.solve_time:
+            self.iteration_time[solver] = stats.solve_time / stats.num_iters
+
+    def iteration_limit(self, solver: str, remaining: float) -> Optional[int]:
+        """Returns the iterations of ``solver`` that fit in ``remaining`` seconds, if known."""
+        seconds = self.iteration_time.get(solver)
+        if seconds is None:
+            return None
+        return max(int(remaining / seconds), 1)
 
 
 class CVaROptimizer:
@@ -34,6 +327,11 @@ class CVaROptimizer:
     Implements the CLEIR methodology from Gendreau et al. (2019).
     """
 
+    # Per-call parameter object; its fields are also the optimizer's default attributes
+    _params_class: type = CVaRParams
+    # Grid keys of ``optimize_batch`` forwarded to ``optimize`` as keyword arguments
+    _batch_arguments: Tuple[str, ...] = ()
+
     def __init__(
         self,
         alpha: float = 0.95,
@@ -41,6 +339,13 @@ class CVaROptimizer:
         max_weight: float = 0.05,
         transaction_cost: float = 0.002,  # Increased from 0.001 per feedback
         solver: str = "ECOS",
+        warm_start: bool = False,
+        solver_options: Optional[Dict[str, Any]] = None,
+        scenario_reducer: Optional[ScenarioReducer] = None,
+        factor_model: Optional[PCAFactorModel] = None,
+        presolve: bool = True,
+        race_solvers: Optional[List[str]] = None,
+        result_cache: Optional[ResultCache] = None,
     ):
         """
         Initialize CVaR optimizer.
@@ -51,18 +356,75 @@ class CVaROptimizer:
             max_weight: Maximum weight per stock (default 0.05)
             transaction_cost: Transaction cost per trade (default 0.001)
             solver: CVXPY solver to use (default 'ECOS'). 'SCS' is a good alternative.
+                'HIGHS' skips CVXPY and solves the sparse LP directly with SciPy's HiGHS.
+                'CUTTING_PLANE' solves it with Künzi-Bay–Mayer aggregated tail cuts instead
+                of one auxiliary variable per scenario, which suits long lookbacks.
+                'COLUMN_GENERATION' solves HiGHS LPs on a growing subset of the assets,
+                priced by reduced costs, which suits large, mostly zero-weight universes.
+                'FIRST_ORDER' runs a matrix-vector-only accelerated projected gradient on a
+                smoothed CVaR, for universes too large for interior-point memory.
+                'RACE' runs ``race_solvers`` concurrently in separate processes and keeps
+                the first optimal answer, terminating the others. It is the only setting
+                that starts processes; every other solver runs in the calling process.
+            warm_start: Start each solve from the previous window's primal-dual solution.
+                Only first-order solvers (SCS, OSQP, 'FIRST_ORDER') use it; interior-point
+                solvers ignore it.
+            solver_options: Extra keyword arguments for the non-CVXPY backends, e.g.
+                ``{"tol": 1e-9, "max_iter": 500}`` for 'CUTTING_PLANE' or 'FIRST_ORDER'.
+            scenario_reducer: Optional ScenarioReducer that shrinks each returns window
+                to a weighted scenario budget before solving.
+            factor_model: Optional PCAFactorModel; the solver then works with the window's
+                factor scores and exposures plus a residual-volatility penalty.
+            presolve: Drop the constant L1 term, assets without any data that are not held,
+                and duplicate scenarios before solving. Dropped assets get a weight of 0.
+            race_solvers: Solvers raced by 'RACE' (default: ECOS, SCS, CLARABEL, HIGHS).
+            result_cache: Optional ResultCache; solves of a window already seen with the
+                same settings are then read from disk instead of re-solved.
         """
         self.alpha = alpha
         self.lasso_penalty = lasso_penalty
         self.max_weight = max_weight
         self.transaction_cost = transaction_cost
         self.solver = solver
+        self.warm_start = warm_start
+        self.solver_options = solver_options or {}
+        self.scenario_reducer = scenario_reducer
+        self.factor_model = factor_model
+        self.presolve = presolve
+        self.race_solvers = race_solvers or list(RACE_SOLVERS)
+        self.result_cache = result_cache
+        # Solver state kept per thread: compiled problems hold the data of the solve in
+        # progress, so threads sharing this optimizer never share them
+        self._local = threading.local()
 
         logger.info(
             f"Initialized CVaROptimizer with alpha={alpha}, "
             f"lasso_penalty={lasso_penalty}, max_weight={max_weight}"
         )
 
+    @property
+    def params(self) -> CVaRParams:
+        """The optimizer's default parameters, used by calls that pass no ``params``."""
+        return self._params_class(
+            **{field.name: getattr(self, field.name) for field in fields(self._params_class)}
+        )
+
+    @property
+    def _problems(self) -> "OrderedDict[Tuple[int, int, Optional[int], bool], _CVaRProblem]":
+        """This thread's compiled problems, keyed by shape and L1 term."""
+        if not hasattr(self._local, "problems"):
+            self._local.problems = OrderedDict()
+        return self._local.problems
+
+    @property
+    def _last_weights(self) -> Optional[np.ndarray]:
+        """Weights of this thread's last successful solve, the 'FIRST_ORDER' warm start."""
+        return getattr(self._local, "last_weights", None)
+
+    @_last_weights.setter
+    def _last_weights(self, weights: Optional[np.ndarray]) -> None:
+        self._local.last_weights = weights
+
     def _get_empty_result(self, n_assets: int, status: str = "failed") -> OptimizationResult:
         """Returns an empty OptimizationResult for failed optimizations."""
         return OptimizationResult(
@@ -90,113 +452,844 @@ class CVaROptimizer:
             returns: DataFrame of asset returns (T x N)
             benchmark_returns: Series of benchmark returns (T x 1)
             current_weights: Current portfolio weights for turnover calculation
+            scenario_weights: Optional scenario probabilities (T,) summing to one
+            time_budget: Optional wall-clock budget in seconds. When it runs out, the
+                best feasible portfolio found so far is returned with status
+                'deadline_feasible'.
+            params: Optional CVaRParams for this call only (default: ``self.params``).
+                The optimizer itself is never modified, so one instance can serve
+                concurrent calls from several threads.
+            sensitivities: If True, ``result.sensitivities`` holds the analytic
+                derivative d(weights)/d(max_weight) of the optimal portfolio (see
+                ``sensitivity.weight_sensitivities``). It stays None unless the window
+                was solved exactly: 'optimal' from one of ``EXACT_SOLVERS``, without
+                scenario reduction or a factor model.
 
         Returns:
             OptimizationResult containing optimal weights and metrics
         """
-        # Fill NaNs to prevent numerical errors in the solver
-        returns = returns.fillna(0.0)
-        if benchmark_returns is not None:
-            benchmark_returns = benchmark_returns.fillna(0.0)
+        # Fill NaNs to prevent numerical errors in the solver; presolve still needs to know
+        # which assets had no data at all
+        kwargs.setdefault("missing_assets", _missing_assets(returns))
+        R = _clean_array(returns)
+        b = _clean_array(benchmark_returns) if benchmark_returns is not None else None
+        return self.optimize_array(R, b, current_weights, labels=returns.columns.values, **kwargs)
+
+    def optimize_array(
+        self,
+        R: np.ndarray,
+        b: Optional[np.ndarray] = None,
+        current_weights: Optional[np.ndarray] = None,
+        labels: Optional[np.ndarray] = None,
+        **kwargs,
+    ) -> OptimizationResult:
+        """
+        Optimize portfolio from NumPy arrays, without any pandas round-trip.
 
-        n_assets = returns.shape[1]
+        ``optimize`` is a thin wrapper around this method. The arrays are used as they
+        are: a C-contiguous float64 ``R`` is never copied before presolve, and float32
+        input is upcast once.
+
+        Args:
+            R: Asset returns (T x N), free of NaNs.
+            b: Benchmark returns (T,); the equal-weighted mean of ``R`` if None.
+            current_weights: Current portfolio weights for turnover calculation
+            labels: Asset labels of the columns of ``R``, used by subclasses to align
+                label-indexed inputs such as alpha scores.
+            **kwargs: ``scenario_weights``, ``time_budget``, ``params`` and
+                ``sensitivities``, as for ``optimize``, and ``missing_assets``, the mask
+                (N,) of the assets without any data in the window, which presolve drops
+                unless they are held.
+
+        Returns:
+            OptimizationResult containing optimal weights and metrics
+        """
+        R = np.asarray(R, dtype=np.float64)
+        n_assets = R.shape[1]
 
         try:
-            n_scenarios = returns.shape[0]
+            if b is None:
+                b = R.mean(axis=1)
+
+            return self._solve(
+                R,
+                np.asarray(b, dtype=np.float64),
+                current_weights,
+                scenario_weights=kwargs.get("scenario_weights"),
+                time_budget=kwargs.get("time_budget"),
+                params=kwargs.get("params"),
+                sensitivities=kwargs.get("sensitivities", False),
+                missing_assets=kwargs.get("missing_assets"),
+            )
 
-            if benchmark_returns is None:
-                benchmark_returns = returns.mean(axis=1)
+        except Exception as e:
+            logger.error(f"Optimization failed: {str(e)}")
+            return self._get_empty_result(n_assets, status="exception")
 
-            R = returns.values
-            b = benchmark_returns.values.reshape(-1, 1)
+    def optimize_batch(
+        self,
+        returns: pd.DataFrame,
+        param_grid: List[Dict[str, float]],
+        benchmark_returns: Optional[pd.Series] = None,
+        current_weights: Optional[np.ndarray] = None,
+        **kwargs,
+    ) -> List[OptimizationResult]:
+        """
+        Optimizes one returns window for every point of a parameter grid.
 
-            w = cp.Variable(n_assets)
-            z = cp.Variable(n_scenarios)
-            zeta = cp.Variable()
+        All points share the data preparation and, for CVXPY solvers, the compiled
+        problem, since the parameters are ``cp.Parameter``s. Points are solved in sorted
+        order so that each one is warm-started from its neighbour (SCS, OSQP and
+        'FIRST_ORDER'); the results are returned in the order of ``param_grid``. Each
+        point is solved with its own CVaRParams; the optimizer is not modified.
 
-            tracking_error = (R @ w) - b.flatten()
-            cvar = zeta + (1.0 / ((1 - self.alpha) * n_scenarios)) * cp.sum(z)
+        Args:
+            returns: DataFrame of asset returns (T x N)
+            param_grid: One dict per point, e.g. ``{"alpha": 0.99, "max_weight": 0.03}``.
+                Keys left out keep the values of ``params`` (default: ``self.params``).
+            benchmark_returns: Series of benchmark returns (T x 1)
+            current_weights: Current portfolio weights for turnover calculation
+            **kwargs: Passed to ``optimize`` for every point (e.g. ``alpha_scores``).
 
-            constraints = [
-                z >= 0,
-                z >= -tracking_error - zeta,
-                cp.sum(w) == 1.0,  # Fully invested constraint
-                w >= 0,
-                w <= self.max_weight,
-            ]
+        Returns:
+            List of OptimizationResult, one per grid point.
+        """
+        base_params = kwargs.pop("params", None) or self.params
+        param_names = {field.name for field in fields(base_params)}
+        allowed = param_names | set(self._batch_arguments)
+        for point in param_grid:
+            unknown = set(point) - allowed
+            if unknown:
+                raise ValueError(
+                    f"Unsupported batch parameters {sorted(unknown)}; use {sorted(allowed)}."
+                )
+
+        kwargs.setdefault("missing_assets", _missing_assets(returns))
+        R = _clean_array(returns)
+        b = _clean_array(benchmark_returns) if benchmark_returns is not None else None
+
+        # Sorting the grid makes consecutive solves neighbours in parameter space
+        order = sorted(range(len(param_grid)), key=lambda i: sorted(param_grid[i].items()))
+        results: List[Optional[OptimizationResult]] = [None] * len(param_grid)
+        for i in order:
+            point = param_grid[i]
+            params = replace(
+                base_params,
+                warm_start=True,
+                **{k: v for k, v in point.items() if k in param_names},
+            )
+            point_kwargs = {k: v for k, v in point.items() if k in self._batch_arguments}
+            results[i] = self.optimize_array(
+                R,
+                b,
+                current_weights,
+                labels=returns.columns.values,
+                params=params,
+                **kwargs,
+                **point_kwargs,
+            )
 
-            objective_terms = [cvar]
-            if self.lasso_penalty > 0:
-                objective_terms.append(self.lasso_penalty * cp.norm1(w))
+        return results
+
+    def _get_problem(
+        self, n_scenarios: int, n_assets: int, n_factors: Optional[int] = None
+    ) -> _CVaRProblem:
+        """Returns the compiled problem for a (T, N, k) shape, building it on first use."""
+        with_lasso = not self.presolve
+        key = (n_scenarios, n_assets, n_factors, with_lasso)
+        problem = self._problems.get(key)
+        if problem is None:
+            logger.debug(f"Building CVaR problem for {n_scenarios} scenarios x {n_assets} assets.")
+            problem = _CVaRProblem(n_scenarios, n_assets, n_factors, with_lasso)
+            self._problems[key] = problem
+            if len(self._problems) > MAX_CACHED_PROBLEMS:
+                self._problems.popitem(last=False)
+        else:
+            self._problems.move_to_end(key)
+        return problem
+
+    def _cache_settings(self, params: CVaRParams) -> Dict[str, Any]:
+        """Returns the settings that, with the window's data, determine a solve."""
+        settings: Dict[str, Any] = {
+            "optimizer": type(self).__name__,
+            "alpha": params.alpha,
+            "lasso_penalty": params.lasso_penalty,
+            "max_weight": params.max_weight,
+            "transaction_cost": params.transaction_cost,
+            "solver": self.solver,
+            "solver_options": sorted(self.solver_options.items()),
+            "presolve": self.presolve,
+            "race_solvers": self.race_solvers if self.solver == "RACE" else None,
+        }
+        for name in ("scenario_reducer", "factor_model"):
+            component = getattr(self, name)
+            if component is not None:
+                public = {k: v for k, v in vars(component).items() if not k.startswith("_")}
+                component = (type(component).__name__, sorted(public.items()))
+            settings[name] = component
+        return settings
+
+    def _solve(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        current_weights: Optional[np.ndarray] = None,
+        linear_tilt: Optional[np.ndarray] = None,
+        scenario_weights: Optional[np.ndarray] = None,
+        time_budget: Optional[float] = None,
+        params: Optional[CVaRParams] = None,
+        sensitivities: bool = False,
+        missing_assets: Optional[np.ndarray] = None,
+    ) -> OptimizationResult:
+        """
+        Solves one window, reading and storing the result in the result cache if set.
+
+        Only optimal results are cached; budget-limited and failed solves are not. With
+        ``sensitivities``, the derivatives of the optimal weights are added to the result.
+        See ``_solve_window`` for the other arguments.
+        """
+        start = time.perf_counter()
+        params = params or self.params
+        key, result = None, None
+        if self.result_cache is not None:
+            key = self.result_cache.make_key(
+                self._cache_settings(params),
+                returns=R,
+                benchmark=b,
+                current_weights=current_weights,
+                linear_tilt=linear_tilt,
+                scenario_weights=scenario_weights,
+                missing_assets=missing_assets,
+            )
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                logger.info("Optimization result served from the result cache.")
+                self._last_weights = cached.weights
+                result = replace(cached, from_cache=True, total_time=time.perf_counter() - start)
+
+        if result is None:
+            result = self._solve_window(
+                R,
+                b,
+                current_weights,
+                linear_tilt,
+                scenario_weights,
+                time_budget,
+                params,
+                missing_assets,
+            )
+            if key is not None and result.status in ["optimal", "optimal_inaccurate"]:
+                self.result_cache.put(key, result)
+
+        if sensitivities and result.status in ["optimal", "optimal_inaccurate"]:
+            result.sensitivities = self._sensitivities(
+                R, b, result, current_weights, scenario_weights, params
+            )
+        return result
+
+    def _sensitivities(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        result: OptimizationResult,
+        current_weights: Optional[np.ndarray],
+        scenario_weights: Optional[np.ndarray],
+        params: CVaRParams,
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """Returns the weight sensitivities of an exact solve of the window, else None."""
+        approximate = self.scenario_reducer is not None or self.factor_model is not None
+        if approximate or result.status != "optimal" or result.solver not in EXACT_SOLVERS:
+            logger.info(
+                f"No sensitivities for a {result.status} {result.solver} solve"
+                f"{' of an approximated window' if approximate else ''}; they need an "
+                "exact LP vertex."
+            )
+            return None
+        # Presolve is exact: assets it dropped sit at their zero bound and folded scenarios
+        # repeat tail rows, so the active set of the full window is that of the solve
+        return weight_sensitivities(
+            R,
+            b.reshape(-1),
+            result.weights,
+            alpha=params.alpha,
+            max_weight=params.max_weight,
+            current_weights=current_weights,
+            transaction_cost=params.transaction_cost,
+            scenario_weights=scenario_weights,
+        )
+
+    def _solve_window(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        current_weights: Optional[np.ndarray] = None,
+        linear_tilt: Optional[np.ndarray] = None,
+        scenario_weights: Optional[np.ndarray] = None,
+        time_budget: Optional[float] = None,
+        params: Optional[CVaRParams] = None,
+        missing_assets: Optional[np.ndarray] = None,
+    ) -> OptimizationResult:
+        """
+        Solves the CVaR problem for one window of scenario data.
+
+        The window goes through presolve, then the optional scenario reduction and
+        factor compression, before it reaches the solver; the solution is mapped back to
+        the full universe.
+
+        Args:
+            R: Asset returns (T x N), already cleaned of NaNs.
+            b: Benchmark returns (T,).
+            current_weights: Current portfolio weights for the turnover penalty.
+            linear_tilt: Per-asset reward subtracted from the objective (e.g. alpha scores).
+            scenario_weights: Scenario probabilities (T,); equally likely if None.
+            time_budget: Wall-clock budget in seconds; see ``optimize``.
+            params: Parameters of this solve (default: ``self.params``).
+            missing_assets: Mask (N,) of the assets without any data in the window.
+
+        Returns:
+            OptimizationResult containing optimal weights and metrics
+        """
+        start = time.perf_counter()
+        params = params or self.params
+        deadline = start + time_budget if time_budget is not None else None
+        b = b.reshape(-1)
+        n_assets = R.shape[1]
+
+        if self.presolve:
+            presolved = presolve_cvar(
+                R,
+                b,
+                params.max_weight,
+                current_weights,
+                linear_tilt,
+                scenario_weights,
+                missing_assets,
+            )
+        else:
+            presolved = PresolvedCVaR(
+                R, b, current_weights, linear_tilt, scenario_weights, np.ones(n_assets, dtype=bool)
+            )
+        R_s, b_s, p_s = presolved.returns, presolved.benchmark, presolved.scenario_weights
+        tilt_s = presolved.linear_tilt
+        # Presolve is exact; reduction and factor compression approximate the window
+        approximate = False
+
+        if self.scenario_reducer is not None:
+            reduced = self.scenario_reducer.reduce(
+                R_s, b_s, reference_weights=presolved.current_weights, probabilities=p_s
+            )
+            R_s, b_s, p_s = reduced.returns, reduced.benchmark, reduced.probabilities
+            approximate = True
+
+        factor_loadings = None
+        if self.factor_model is not None:
+            # Solve in factor space, with residual risk as a linear penalty
+            decomposition = self.factor_model.decompose(R_s)
+            residual_tilt = -self.factor_model.residual_penalty * decomposition.residual_vol
+            tilt_s = residual_tilt if tilt_s is None else tilt_s + residual_tilt
+            R_s, factor_loadings = decomposition.scores, decomposition.loadings
+            approximate = True
+
+        telemetry = {
+            "presolve_time": time.perf_counter() - start,
+            "n_scenarios": R_s.shape[0],
+            "n_assets": int(presolved.active.sum()),
+            "n_factors": R_s.shape[1] if factor_loadings is not None else None,
+        }
+
+        initial_weights = None
+        if self._last_weights is not None and self._last_weights.shape == (n_assets,):
+            initial_weights = presolved.restrict(self._last_weights)
+
+        result = self._solve_backend(
+            R_s,
+            b_s,
+            presolved.current_weights,
+            tilt_s,
+            p_s,
+            factor_loadings,
+            params,
+            initial_weights,
+            deadline,
+        )
+        if result.status not in ["optimal", "optimal_inaccurate"]:
+            if deadline is not None and (
+                result.status == "user_limit" or time.perf_counter() >= deadline
+            ):
+                iterate = None
+                if np.all(np.isfinite(result.weights)):
+                    iterate = presolved.expand(result.weights)
+                fallback = self._deadline_result(
+                    R, b, current_weights, linear_tilt, scenario_weights, iterate, start, params
+                )
+                return self._with_telemetry(fallback, result, start, telemetry)
+            empty = self._get_empty_result(n_assets, status=result.status)
+            return self._with_telemetry(empty, result, start, telemetry)
+
+        weights = presolved.expand(result.weights)
+        self._last_weights = weights
+        if not approximate and not presolved.is_reduced:
+            return self._with_telemetry(result, result, start, telemetry)
+
+        # Report metrics, and the exact CVaR of approximated windows, on the full window
+        if approximate:
+            cvar, _ = cvar_of_losses(b - R @ weights, params.alpha, scenario_weights)
+        else:
+            cvar = result.cvar
+        full = self._build_result(
+            R,
+            b,
+            weights,
+            cvar=cvar,
+            current_weights=current_weights,
+            status=result.status,
+            solve_time=result.solve_time,
+            iterations=result.iterations,
+            iterations_saved=result.iterations_saved,
+            scenario_weights=scenario_weights,
+            solver=result.solver,
+        )
+        return self._with_telemetry(full, result, start, telemetry)
+
+    @staticmethod
+    def _with_telemetry(
+        result: OptimizationResult,
+        backend_result: OptimizationResult,
+        start: float,
+        telemetry: Dict[str, Any],
+    ) -> OptimizationResult:
+        """Adds the call's timings and dimensions, and the backend's telemetry, to a result."""
+        return replace(
+            result,
+            solvers_tried=backend_result.solvers_tried,
+            setup_time=backend_result.setup_time,
+            n_variables=backend_result.n_variables,
+            n_constraints=backend_result.n_constraints,
+            total_time=time.perf_counter() - start,
+            **telemetry,
+        )
+
+    def _deadline_result(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        current_weights: Optional[np.ndarray],
+        linear_tilt: Optional[np.ndarray],
+        scenario_weights: Optional[np.ndarray],
+        iterate: Optional[np.ndarray],
+        start: float,
+        params: CVaRParams,
+    ) -> OptimizationResult:
+        """
+        Returns the best feasible portfolio available when the time budget runs out.
+
+        Candidates are the solver's last iterate and the previous weights (equal weights
+        if there are none), each projected onto ``sum(w) = 1, 0 <= w <= max_weight``. The
+        one with the lower objective is kept, with status 'deadline_feasible'.
+        """
+        n_assets = R.shape[1]
+        candidates = [w for w in (iterate, current_weights) if w is not None]
+        if not candidates:
+            candidates = [np.full(n_assets, 1.0 / n_assets)]
+
+        best_weights, best_cvar, best_objective = None, np.nan, np.inf
+        for candidate in candidates:
+            weights = project_capped_simplex(np.asarray(candidate, dtype=float), params.max_weight)
+            cvar, _ = cvar_of_losses(b - R @ weights, params.alpha, scenario_weights)
+            objective = cvar
             if current_weights is not None:
-                turnover = cp.sum(cp.abs(w - current_weights))
-                objective_terms.append(self.transaction_cost * turnover)
+                objective += params.transaction_cost * np.abs(weights - current_weights).sum()
+            if linear_tilt is not None:
+                objective -= linear_tilt @ weights
+            if objective < best_objective:
+                best_weights, best_cvar, best_objective = weights, cvar, objective
+
+        logger.warning("Time budget ran out; returning the best feasible portfolio found.")
+        return self._build_result(
+            R,
+            b,
+            best_weights,
+            cvar=best_cvar,
+            current_weights=current_weights,
+            status="deadline_feasible",
+            solve_time=time.perf_counter() - start,
+            scenario_weights=scenario_weights,
+        )
+
+    def _solve_backend(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        current_weights: Optional[np.ndarray],
+        linear_tilt: Optional[np.ndarray],
+        scenario_weights: Optional[np.ndarray],
+        factor_loadings: Optional[np.ndarray],
+        params: CVaRParams,
+        initial_weights: Optional[np.ndarray],
+        deadline: Optional[float] = None,
+    ) -> OptimizationResult:
+        """Solves a prepared window with the configured solver and its SCS fallback."""
+        args = (R, b, current_weights, linear_tilt, scenario_weights, factor_loadings, params)
+        if self.solver == "RACE":
+            return self._solve_race(*args, deadline=deadline)
+
+        if self.solver in NATIVE_SOLVERS:
+            result = self._solve_native(*args, initial_weights, deadline=deadline)
+            if result.status in ["optimal", "optimal_inaccurate"]:
+                return result
+            if deadline is not None and (
+                result.status == "user_limit" or time.perf_counter() >= deadline
+            ):
+                return result
+            logger.warning(f"{self.solver} failed with status {result.status}. Falling back to SCS.")
+            fallback = self._solve_cvxpy(*args, solvers=["SCS"], deadline=deadline)
+            return replace(fallback, solvers_tried=[self.solver] + (fallback.solvers_tried or []))
+
+        # Try the default solver first, then fall back to SCS for robustness
+        solvers = [self.solver]
+        if self.solver != "SCS":
+            solvers.append("SCS")
+        return self._solve_cvxpy(*args, solvers=solvers, deadline=deadline)
+
+    def _solve_race(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        current_weights: Optional[np.ndarray],
+        linear_tilt: Optional[np.ndarray],
+        scenario_weights: Optional[np.ndarray],
+        factor_loadings: Optional[np.ndarray],
+        params: CVaRParams,
+        solvers: Optional[List[str]] = None,
+        deadline: Optional[float] = None,
+    ) -> OptimizationResult:
+        """
+        Races ``race_solvers`` on the same problem, one process each.
+
+        The first 'optimal' answer wins and the remaining processes are terminated. If no
+        solver is optimal, the first 'optimal_inaccurate' answer is used. Forked processes
+        inherit the problems compiled so far; each solver's first compile still happens in
+        its own process. At the ``deadline`` all remaining processes are terminated.
 
-            objective = cp.Minimize(cp.sum(objective_terms))
-            problem = cp.Problem(objective, constraints)
+        Forking a process that runs other threads can deadlock the child on a lock held by
+        one of them, so the workers are spawned instead whenever other threads are running,
+        e.g. when the optimizer is called from a thread pool.
+        """
+        solvers = solvers or self.race_solvers
+        n_assets = factor_loadings.shape[0] if factor_loadings is not None else R.shape[1]
+        settings = {"solver_options": self.solver_options, "presolve": self.presolve}
+        args = (R, b, current_weights, linear_tilt, scenario_weights, factor_loadings, params)
+        fork = _fork_is_safe()
+        context = multiprocessing.get_context("fork" if fork else "spawn")
+        # A forked worker inherits this optimizer, compiled problems included; a spawned
+        # one is rebuilt from its settings
+        source = self if fork else settings
+        results = context.Queue()
+        processes = {
+            solver: context.Process(
+                target=_race_worker, args=(source, solver, args, results), daemon=True
+            )
+            for solver in solvers
+        }
 
-            # Try the default solver first, then fall back to SCS for robustness
-            solvers = [self.solver]
-            if self.solver != "SCS":
-                solvers.append("SCS")
+        start = time.perf_counter()
+        for process in processes.values():
+            process.start()
 
-            for solver in solvers:
+        winner, fallback = None, None
+        pending = set(processes)
+        try:
+            while pending and winner is None:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    logger.warning(f"Time budget ran out before {sorted(pending)} finished.")
+                    break
                 try:
-                    solver_kwargs = {"solver": solver, "verbose": False}
-                    # Use more robust settings specifically for the SCS fallback solver
-                    if solver == "SCS":
-                        solver_kwargs.update(
-                            {
-                                "max_iters": 5000,
-                                "eps": 1e-4,
-                            }
-                        )
-                    problem.solve(**solver_kwargs)
-                    if problem.status in ["optimal", "optimal_inaccurate"] and w.value is not None:
-                        logger.info(f"Successfully solved with {solver}.")
-                        break  # Exit loop on success
-                except (cp.SolverError, ValueError) as e:
-                    logger.warning(f"Solver {solver} failed with error: {e}. Trying next solver.")
+                    solver, result = results.get(timeout=0.05)
+                except queue.Empty:
+                    # A worker killed by the OS never reports back
+                    if not any(processes[s].is_alive() for s in pending) and results.empty():
+                        break
+                    continue
+                pending.discard(solver)
+                if result is None:
                     continue
+                if result.status == "optimal":
+                    winner = result
+                elif result.status == "optimal_inaccurate" and fallback is None:
+                    fallback = result
+        finally:
+            for process in processes.values():
+                if process.is_alive():
+                    process.terminate()
+            for process in processes.values():
+                process.join()
+
+        best = winner or fallback
+        if best is None:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return self._get_empty_result(n_assets, status="user_limit")
+            logger.warning(f"No solver in {solvers} solved the problem.")
+            return self._get_empty_result(n_assets, status="race_failed")
+
+        best.solve_time = time.perf_counter() - start
+        best.solvers_tried = list(solvers)
+        logger.info(f"Solver race won by {best.solver} in {best.solve_time:.3f}s.")
+        return best
+
+    def _solve_native(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        current_weights: Optional[np.ndarray],
+        linear_tilt: Optional[np.ndarray],
+        scenario_weights: Optional[np.ndarray],
+        factor_loadings: Optional[np.ndarray],
+        params: CVaRParams,
+        initial_weights: Optional[np.ndarray] = None,
+        deadline: Optional[float] = None,
+    ) -> OptimizationResult:
+        """Solves the CVaR problem with one of the NumPy/SciPy backends, bypassing CVXPY."""
+        n_assets = factor_loadings.shape[0] if factor_loadings is not None else R.shape[1]
+        options = dict(self.solver_options)
+        if self.solver == "FIRST_ORDER" and params.warm_start and initial_weights is not None:
+            options.setdefault("initial_weights", initial_weights)
+        if deadline is not None:
+            options["time_limit"] = max(deadline - time.perf_counter(), 0.0)
+
+        start = time.perf_counter()
+        solution = NATIVE_SOLVERS[self.solver](
+            R,
+            b,
+            alpha=params.alpha,
+            max_weight=params.max_weight,
+            lasso_penalty=params.lasso_penalty,
+            transaction_cost=params.transaction_cost,
+            current_weights=current_weights,
+            linear_tilt=linear_tilt,
+            scenario_weights=scenario_weights,
+            factor_loadings=factor_loadings,
+            **options,
+        )
+        elapsed = time.perf_counter() - start
+        if solution.weights is None:
+            result = self._get_empty_result(n_assets, status=solution.status)
+        else:
+            logger.info(f"Successfully solved with {self.solver}.")
+            result = self._build_result(
+                R,
+                b,
+                solution.weights,
+                cvar=solution.cvar,
+                current_weights=current_weights,
+                status=solution.status,
+                solve_time=solution.solve_time,
+                iterations=solution.iterations,
+                scenario_weights=scenario_weights,
+                factor_loadings=factor_loadings,
+                solver=self.solver,
+            )
+        return replace(
+            result,
+            solvers_tried=[self.solver],
+            setup_time=max(elapsed - solution.solve_time, 0.0),
+            n_variables=getattr(solution, "n_variables", None),
+            n_constraints=getattr(solution, "n_constraints", None),
+        )
 
-            if problem.status not in ["optimal", "optimal_inaccurate"]:
-                logger.warning(f"Optimization status: {problem.status}. Returning empty result.")
-                return self._get_empty_result(n_assets, status=problem.status)
+    def _prepare_problem(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        current_weights: Optional[np.ndarray],
+        linear_tilt: Optional[np.ndarray],
+        scenario_weights: Optional[np.ndarray],
+        factor_loadings: Optional[np.ndarray],
+        params: CVaRParams,
+    ) -> _CVaRProblem:
+        """Returns the compiled problem for the window's shape, loaded with its data."""
+        n_assets = factor_loadings.shape[0] if factor_loadings is not None else R.shape[1]
+        n_factors = R.shape[1] if factor_loadings is not None else None
+        cvar_problem = self._get_problem(R.shape[0], n_assets, n_factors)
+        cvar_problem.set_data(
+            R,
+            b,
+            alpha=params.alpha,
+            max_weight=params.max_weight,
+            lasso_penalty=params.lasso_penalty,
+            transaction_cost=params.transaction_cost,
+            current_weights=current_weights,
+            linear_tilt=linear_tilt,
+            scenario_weights=scenario_weights,
+            factor_loadings=factor_loadings,
+        )
+        return cvar_problem
 
-            optimal_weights = w.value
-            if optimal_weights is None:
-                logger.error(
-                    f"Opt status is {problem.status}, but weights are None. Returning empty."
-                )
-                return self._get_empty_result(n_assets, status=f"{problem.status}_no_weights")
+    def _solve_cvxpy(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        current_weights: Optional[np.ndarray],
+        linear_tilt: Optional[np.ndarray],
+        scenario_weights: Optional[np.ndarray],
+        factor_loadings: Optional[np.ndarray],
+        params: CVaRParams,
+        solvers: List[str],
+        deadline: Optional[float] = None,
+    ) -> OptimizationResult:
+        """Solves the compiled CVXPY problem, trying each solver in turn."""
+        start = time.perf_counter()
+        n_assets = factor_loadings.shape[0] if factor_loadings is not None else R.shape[1]
+        cvar_problem = self._prepare_problem(
+            R, b, current_weights, linear_tilt, scenario_weights, factor_loadings, params
+        )
+        problem = cvar_problem.problem
+        w = cvar_problem.w
+
+        tried: List[str] = []
+        # Time spent inside the solvers; the rest of the call is modelling overhead
+        solver_time = 0.0
+        for solver in solvers:
+            remaining = deadline - time.perf_counter() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                # With warm_start, CVXPY seeds the solver with the (w, z, zeta) iterate and
+                # duals stored on this compiled problem by the previous window's solve.
+                solver_kwargs = {
+                    "solver": solver,
+                    "verbose": False,
+                    "warm_start": params.warm_start and solver in WARM_START_SOLVERS,
+                }
+                # Use more robust settings specifically for the SCS fallback solver
+                if solver == "SCS":
+                    solver_kwargs.update(
+                        {
+                            "max_iters": 5000,
+                            "eps": 1e-4,
+                        }
+                    )
+                if remaining is not None and solver in TIME_LIMIT_OPTIONS:
+                    solver_kwargs[TIME_LIMIT_OPTIONS[solver]] = remaining
+                elif remaining is not None and solver in ITERATION_LIMIT_OPTIONS:
+                    # The first solve of a compiled problem runs with the solver's own cap
+                    max_iters = cvar_problem.iteration_limit(solver, remaining)
+                    if max_iters is not None:
+                        solver_kwargs[ITERATION_LIMIT_OPTIONS[solver]] = max_iters
+                tried.append(solver)
+                cvar_problem.solve(**solver_kwargs)
+                solver_time += problem.solver_stats.solve_time or 0.0
+                if problem.status in ["optimal", "optimal_inaccurate"] and w.value is not None:
+                    logger.info(f"Successfully solved with {solver}.")
+                    break  # Exit loop on success
+            except (cp.SolverError, ValueError) as e:
+                logger.warning(f"Solver {solver} failed with error: {e}. Trying next solver.")
+                continue
+
+        if not tried:
+            # The budget ran out before any solver started
+            return self._get_empty_result(n_assets, status="user_limit")
+
+        telemetry = {
+            "solvers_tried": tried,
+            "setup_time": max(time.perf_counter() - start - solver_time, 0.0),
+            "n_variables": cvar_problem.n_variables,
+            "n_constraints": cvar_problem.n_constraints,
+        }
+        if problem.status not in ["optimal", "optimal_inaccurate"]:
+            logger.warning(f"Optimization status: {problem.status}. Returning empty result.")
+            result = self._get_empty_result(n_assets, status=problem.status)
+            if deadline is not None and w.value is not None:
+                # Keep the last iterate as a candidate for the deadline fallback
+                result.weights = np.array(w.value)
+            return replace(result, **telemetry)
 
+        optimal_weights = w.value
+        if optimal_weights is None:
+            logger.error(f"Opt status is {problem.status}, but weights are None. Returning empty.")
+            result = self._get_empty_result(n_assets, status=f"{problem.status}_no_weights")
+            return replace(result, **telemetry)
+
+        iterations = problem.solver_stats.num_iters
+        iterations_saved = None
+        solver = tried[-1]
+        if iterations is not None:
+            if solver not in cvar_problem.cold_iterations:
+                cvar_problem.cold_iterations[solver] = iterations
+            elif params.warm_start and solver in WARM_START_SOLVERS:
+                iterations_saved = cvar_problem.cold_iterations[solver] - iterations
+
+        result = self._build_result(
+            R,
+            b,
+            optimal_weights,
+            cvar=cvar_problem.cvar.value,
+            current_weights=current_weights,
+            status=problem.status,
+            solve_time=problem.solver_stats.solve_time
+            if problem.solver_stats.solve_time is not None
+            else 0.0,
+            iterations=iterations,
+            iterations_saved=iterations_saved,
+            scenario_weights=scenario_weights,
+            factor_loadings=factor_loadings,
+            solver=tried[-1],
+        )
+        return replace(result, **telemetry)
+
+    def _build_result(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        optimal_weights: np.ndarray,
+        cvar: float,
+        current_weights: Optional[np.ndarray],
+        status: str,
+        solve_time: float,
+        iterations: Optional[int] = None,
+        iterations_saved: Optional[int] = None,
+        scenario_weights: Optional[np.ndarray] = None,
+        factor_loadings: Optional[np.ndarray] = None,
+        solver: Optional[str] = None,
+    ) -> OptimizationResult:
+        """Computes the in-sample metrics of a solution and wraps them in a result."""
+        if factor_loadings is not None:
+            portfolio_ret_series = R @ (factor_loadings.T @ optimal_weights)
+        else:
             portfolio_ret_series = R @ optimal_weights
-            tracking_err_series = portfolio_ret_series - b.flatten()
-            turnover_val = (
-                np.sum(np.abs(optimal_weights - current_weights))
-                if current_weights is not None
-                else 0.0
-            )
-
-            result = OptimizationResult(
-                weights=optimal_weights,
-                cvar=cvar.value,
-                portfolio_return=np.mean(portfolio_ret_series),
-                portfolio_volatility=np.std(portfolio_ret_series),
-                tracking_error=np.std(tracking_err_series),
-                turnover=turnover_val,
-                status=problem.status,
-                solve_time=problem.solver_stats.solve_time
-                if problem.solver_stats.solve_time is not None
-                else 0.0,
-            )
-
-            logger.info(f"Optimization complete: CVaR={result.cvar:.4f}, Status={result.status}")
-            return result
+        tracking_err_series = portfolio_ret_series - b
+        if scenario_weights is None:
+            portfolio_return = np.mean(portfolio_ret_series)
+            portfolio_volatility = np.std(portfolio_ret_series)
+            tracking_error = np.std(tracking_err_series)
+        else:
+            portfolio_return = scenario_weights @ portfolio_ret_series
+            portfolio_volatility = np.sqrt(
+                scenario_weights @ (portfolio_ret_series - portfolio_return) ** 2
+            )
+            tracking_mean = scenario_weights @ tracking_err_series
+            tracking_error = np.sqrt(scenario_weights @ (tracking_err_series - tracking_mean) ** 2)
+        turnover_val = (
+            np.sum(np.abs(optimal_weights - current_weights))
+            if current_weights is not None
+            else 0.0
+        )
 
-        except Exception as e:
-            logger.error(f"Optimization failed: {str(e)}")
-            return self._get_empty_result(n_assets, status="exception")
+        result = OptimizationResult(
+            weights=optimal_weights,
+            cvar=cvar,
+            portfolio_return=portfolio_return,
+            portfolio_volatility=portfolio_volatility,
+            tracking_error=tracking_error,
+            turnover=turnover_val,
+            status=status,
+            solve_time=solve_time,
+            iterations=iterations,
+            iterations_saved=iterations_saved,
+            solver=solver,
+        )
+
+        logger.info(f"Optimization complete: CVaR={result.cvar:.4f}, Status={result.status}")
+        return result
 
     def calculate_portfolio_metrics(
         self,
@@ -217,6 +1310,7 @@ class CVaROptimizer:
         """
         # Portfolio returns
         portfolio_returns = returns @ weights
+        max_drawdown = self._calculate_max_drawdown(portfolio_returns)
 
         # Basic metrics
         metrics = {
@@ -224,9 +1318,8 @@ class CVaROptimizer:
             "annual_volatility": portfolio_returns.std() * np.sqrt(252),
             "sharpe_ratio": (portfolio_returns.mean() * 252)
             / (portfolio_returns.std() * np.sqrt(252)),
-            "max_drawdown": self._calculate_max_drawdown(portfolio_returns),
-            "calmar_ratio": (portfolio_returns.mean() * 252)
-            / abs(self._calculate_max_drawdown(portfolio_returns)),
+            "max_drawdown": max_drawdown,
+            "calmar_ratio": (portfolio_returns.mean() * 252) / abs(max_drawdown),
             "sortino_ratio": self._calculate_sortino_ratio(portfolio_returns),
             "cvar_95": self._calculate_cvar(portfolio_returns, 0.95),
             "cvar_99": self._calculate_cvar(portfolio_returns, 0.99),
@@ -257,6 +1350,92 @@ class CVaROptimizer:
 
         return metrics
 
+    def calculate_portfolio_metrics_batch(
+        self,
+        returns: pd.DataFrame,
+        weights: Union[np.ndarray, pd.DataFrame],
+        benchmark_returns: Optional[pd.Series] = None,
+    ) -> pd.DataFrame:
+        """
+        Calculate the metrics of ``calculate_portfolio_metrics`` for many portfolios.
+
+        All K portfolios' returns come from one matrix product, and every metric is a
+        reduction along the time axis of that K x T matrix; each CVaR level needs one
+        partition instead of a full sort.
+
+        Args:
+            returns: DataFrame of asset returns (T x N)
+            weights: Candidate portfolios (K x N), e.g. a frontier or a parameter sweep;
+                a DataFrame's index labels the rows of the result
+            benchmark_returns: Benchmark returns for comparison, on the dates of ``returns``
+
+        Returns:
+            DataFrame with one row per portfolio and one column per metric
+        """
+        W = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        index = weights.index if isinstance(weights, pd.DataFrame) else None
+        # K x T, one row of daily returns per portfolio
+        P = np.ascontiguousarray((returns.to_numpy(dtype=np.float64) @ W.T).T)
+        n_days = P.shape[1]
+
+        mean = P.mean(axis=1)
+        std = P.std(axis=1, ddof=1)
+        wealth = np.cumprod(1 + P, axis=1)
+        running_max = np.maximum.accumulate(wealth, axis=1)
+        max_drawdown = ((wealth - running_max) / running_max).min(axis=1)
+
+        # Sortino: RMS of the negative returns only, as in _calculate_sortino_ratio
+        downside = np.minimum(P, 0.0)
+        n_down = (P < 0).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            downside_std = np.sqrt((downside**2).sum(axis=1) / n_down)
+            sortino = np.where(
+                downside_std > 0, (mean * 252) / (downside_std * np.sqrt(252)), np.inf
+            )
+
+        metrics = {
+            "annual_return": mean * 252,
+            "annual_volatility": std * np.sqrt(252),
+            "sharpe_ratio": (mean * 252) / (std * np.sqrt(252)),
+            "max_drawdown": max_drawdown,
+            "calmar_ratio": (mean * 252) / np.abs(max_drawdown),
+            "sortino_ratio": sortino,
+        }
+        for alpha in (0.95, 0.99):
+            # Returns at or below the linearly interpolated (1 - alpha) percentile
+            n_tail = int(np.floor((1 - alpha) * (n_days - 1))) + 1
+            tail = np.partition(P, n_tail - 1, axis=1)[:, :n_tail]
+            metrics[f"cvar_{round(alpha * 100)}"] = -tail.mean(axis=1)
+
+        # Tracking error metrics if benchmark provided
+        if benchmark_returns is not None:
+            b = benchmark_returns.to_numpy(dtype=np.float64)
+            active = P - b
+            active_std = active.std(axis=1, ddof=1)
+            b_centered = b - b.mean()
+            cov_b = (P - mean[:, None]) @ b_centered / (n_days - 1)
+            metrics.update(
+                {
+                    "tracking_error": active_std * np.sqrt(252),
+                    "information_ratio": (active.mean(axis=1) * 252)
+                    / (active_std * np.sqrt(252)),
+                    "beta": cov_b / b.var(ddof=1),
+                    "correlation": cov_b / (std * b.std(ddof=1)),
+                }
+            )
+
+        # Weight concentration metrics
+        metrics.update(
+            {
+                "effective_n": 1 / np.sum(W**2, axis=1),
+                "max_weight": W.max(axis=1),
+                "n_positions": np.sum(W > 0.001, axis=1),
+                "concentration_top5": np.sort(W, axis=1)[:, -5:].sum(axis=1),
+            }
+        )
+
+        return pd.DataFrame(metrics, index=index)
+
     @staticmethod
     def _calculate_max_drawdown(returns: pd.Series) -> float:
         """Calculate maximum drawdown from returns series."""
@@ -293,12 +1472,13 @@ class CVaROptimizer:
         Returns:
             pd.Series: Series of risk contributions for each asset.
         """
-        portfolio_variance = weights.T @ returns.cov().values @ weights
+        cov = returns.cov().values
+        portfolio_variance = weights.T @ cov @ weights
         if portfolio_variance < 1e-9:
             return pd.Series(np.zeros_like(weights), index=returns.columns)
 
         # Marginal Contribution to Risk (MCTR)
-        mctr = returns.cov().values @ weights
+        mctr = cov @ weights
 
         # Risk Contribution (RC) = weight * MCTR / portfolio_stdev
         portfolio_stdev = np.sqrt(portfolio_variance)
@@ -306,6 +1486,59 @@ class CVaROptimizer:
 
         return pd.Series(risk_contribution, index=returns.columns)
 
+    def calculate_cvar_decomposition(
+        self, returns: pd.DataFrame, weights: pd.DataFrame, lookback_window: int = 252
+    ) -> pd.DataFrame:
+        """
+        Calculate CVaR risk contributions by asset for every rebalance date at once.
+
+        The contribution of asset i is ``-w_i * E[r_i | tail]``, where the tail is the
+        ``ceil((1 - alpha) * T)`` worst days of the portfolio over the lookback window
+        ending the day before the rebalance. Contributions add up to the portfolio's
+        historical CVaR (as a positive loss).
+
+        All dates are evaluated in one pass: portfolio returns for every date's weights
+        come from a single matrix product, the lookback windows are a strided view of
+        them, and only the tail days of each window are gathered from ``returns``.
+
+        Args:
+            returns (pd.DataFrame): Daily asset returns covering every lookback window.
+            weights (pd.DataFrame): Portfolio weights, one row per rebalance date and one
+                column per asset (e.g. the rebalance weights of a backtest).
+            lookback_window (int): Number of days in each window.
+
+        Returns:
+            pd.DataFrame: CVaR contributions, indexed like ``weights``.
+        """
+        weights = weights.reindex(columns=returns.columns, fill_value=0.0).fillna(0.0)
+        values = _clean_array(returns)
+        W = weights.to_numpy(dtype=np.float64)
+
+        # Windows end the day before each rebalance date, as in the rolling backtest
+        ends = returns.index.searchsorted(weights.index, side="left")
+        starts = ends - lookback_window
+        if (starts < 0).any():
+            raise ValueError(
+                f"Not enough history for a {lookback_window}-day window before "
+                f"{weights.index[starts < 0][0]}."
+            )
+
+        # Portfolio returns of every date's weights over the whole history (days x dates)
+        portfolio_returns = values @ W.T
+        windows = np.lib.stride_tricks.sliding_window_view(
+            portfolio_returns, lookback_window, axis=0
+        )
+        n_dates = W.shape[0]
+        window_returns = windows[starts, np.arange(n_dates)]  # dates x T
+
+        # Rounded first so that e.g. (1 - 0.95) * 100 gives 5 tail days, not 6
+        n_tail = max(int(np.ceil(round((1 - self.alpha) * lookback_window, 9))), 1)
+        tail_days = np.argpartition(window_returns, n_tail - 1, axis=1)[:, :n_tail]
+        tail_returns = values[starts[:, None] + tail_days]  # dates x tail x N
+        contributions = -W * tail_returns.mean(axis=1)
+
+        return pd.DataFrame(contributions, index=weights.index, columns=returns.columns)
+
 
 class RollingCVaROptimizer:
     """
@@ -313,7 +1546,16 @@ class RollingCVaROptimizer:
     """
 
     def __init__(
-        self, optimizer: CVaROptimizer, lookback_window: int = 252, rebalance_frequency: str = "Q"
+        self,
+        optimizer: CVaROptimizer,
+        lookback_window: int = 252,
+        rebalance_frequency: str = "Q",
+        time_budget: Optional[float] = None,
+        sensitivities: bool = False,
+        regime_grid: Optional[Tuple[float, ...]] = None,
+        n_jobs: Optional[int] = None,
+        speculation_tol: float = 0.0,
+        speculation_passes: int = 2,
     ):
         """
         Initialize rolling optimizer.
@@ -322,10 +1564,45 @@ class RollingCVaROptimizer:
             optimizer: CVaROptimizer instance
             lookback_window: Number of days for historical data
             rebalance_frequency: 'D', 'W', 'M', or 'Q'
+            time_budget: Wall-clock budget per rebalance in seconds (None: unlimited)
+            sensitivities: If True, each rebalance row carries d(weights)/d(parameter)
+                in a 'sensitivities' column (see ``CVaROptimizer.optimize``).
+            regime_grid: With a RegimeAwareCVaROptimizer and regimes, solve every window
+                on this grid of regime probabilities and keep the paths in
+                ``regime_paths`` for later what-if queries (see
+                ``RegimeAwareCVaROptimizer.solve_regime_path``).
+            n_jobs: With more than one job, solve all windows speculatively in a pool of
+                ``n_jobs`` processes against guessed current weights, then correct them
+                in a sequential pass that only re-solves windows whose guess was wrong
+                (see ``_speculation_holds``). With the default ``speculation_tol``
+                the results match the sequential backtest. Only exact solvers
+                (``EXACT_SOLVERS`` or 'RACE') speculate; the others solve sequentially.
+            speculation_tol: Largest objective suboptimality accepted for a speculative
+                solution in the correction pass (default: only provably optimal ones).
+            speculation_passes: Most parallel passes refining the guessed current weights
+                before the correction pass (at least 1).
         """
+        if regime_grid is not None and n_jobs is not None and n_jobs > 1:
+            raise ValueError("regime_grid cannot be combined with the speculative n_jobs mode.")
+        if speculation_passes < 1:
+            raise ValueError(f"speculation_passes must be at least 1, got {speculation_passes}.")
         self.optimizer = optimizer
         self.lookback_window = lookback_window
         self.rebalance_frequency = rebalance_frequency
+        self.time_budget = time_budget
+        self.sensitivities = sensitivities
+        self.regime_grid = regime_grid
+        self.n_jobs = n_jobs
+        self.speculation_tol = speculation_tol
+        self.speculation_passes = speculation_passes
+        # Regime solution paths of the last backtest, by rebalance date
+        self.regime_paths: Dict[pd.Timestamp, RegimePath] = {}
+        # Solver telemetry of the last backtest, one row per rebalance
+        self.telemetry = pd.DataFrame()
+        # Drifted holdings, returns and trades of the last backtest
+        self.accounting: Optional[DriftAccounting] = None
+        # End state of the last backtest or update, for extending it with ``update``
+        self.state: Optional[BacktestState] = None
         self.original_params = {
             "max_weight": optimizer.max_weight,
             "lasso_penalty": optimizer.lasso_penalty,
@@ -339,6 +1616,9 @@ class RollingCVaROptimizer:
         end_date: Optional[str] = None,
         alpha_scores: Optional[pd.DataFrame] = None,
         regimes: Optional[pd.Series] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: int = 1,
+        resume_from: Optional[str] = None,
     ) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame]:
         """
         Run rolling window backtest.
@@ -350,6 +1630,13 @@ class RollingCVaROptimizer:
             end_date: Backtest end date.
             alpha_scores: DataFrame of alpha scores.
             regimes: Series of market regimes.
+            checkpoint_path: File to save the loop state to every ``checkpoint_every``
+                rebalances and at the end; None disables checkpoints.
+            checkpoint_every: Number of rebalances between checkpoints.
+            resume_from: Checkpoint of an interrupted run with the same inputs; the loop
+                restarts after its last completed rebalance. A missing file starts afresh.
+                Regime paths are not checkpointed, so after a resume ``regime_paths``
+                only holds the rebalances solved by this call.
 
         Returns:
             A tuple containing:
@@ -374,79 +1661,140 @@ class RollingCVaROptimizer:
 
         # 2. Main backtest loop
         rebalance_results = []
+        telemetry_rows = []
+        self.regime_paths = {}
         # Initialize weights for the first period
         current_weights = np.ones(returns.shape[1]) / returns.shape[1]
 
-        for date in rebalance_dates:
-            lookback_end_loc = returns.index.get_loc(date)
-            assert isinstance(
-                lookback_end_loc, int
-            ), "Index lookup for rebalance date did not return a single integer location."
-            lookback_start_loc = max(0, lookback_end_loc - self.lookback_window)
-            lookback_returns = returns.iloc[lookback_start_loc:lookback_end_loc]
-            lookback_benchmark = benchmark_returns.iloc[lookback_start_loc:lookback_end_loc]
+        # Restore the loop state of an interrupted run and skip its completed rebalances
+        all_dates = rebalance_dates
+        state = load_checkpoint(resume_from) if resume_from else None
+        n_done = 0
+        if state is not None:
+            n_done = len(state["dates"])
+            if list(all_dates[:n_done]) != state["dates"]:
+                raise ValueError(
+                    f"Checkpoint {resume_from} does not match the rebalance dates of this "
+                    "backtest."
+                )
+            fingerprint_now = self._fingerprint(
+                returns, benchmark_returns, alpha_scores, regimes, state["dates"][-1]
+            )
+            if fingerprint_now != state["fingerprint"]:
+                raise ValueError(
+                    f"Checkpoint {resume_from} does not match the optimizer settings or the "
+                    "returns of this backtest."
+                )
+            rebalance_results = state["rebalance_results"]
+            telemetry_rows = state["telemetry_rows"]
+            current_weights = state["current_weights"]
+            self.optimizer._last_weights = state["last_weights"]
+            logger.info(
+                f"Resuming backtest from {resume_from} after {n_done} of "
+                f"{len(all_dates)} rebalances."
+            )
+        elif resume_from:
+            logger.info(f"No checkpoint at {resume_from}; starting the backtest afresh.")
+        rebalance_dates = all_dates[n_done:]
+
+        windows = [
+            self._window_kwargs(returns, benchmark_returns, date, alpha_scores, regimes)
+            for date in rebalance_dates
+        ]
+        speculative = None
+        if self.n_jobs is not None and self.n_jobs > 1 and windows:
+            if self.optimizer.solver in EXACT_SOLVERS + ["RACE"]:
+                speculative = self._speculate(windows, current_weights)
+            else:
+                logger.warning(
+                    f"{self.optimizer.solver} answers are not exact enough to verify "
+                    "speculative solutions; solving the windows sequentially."
+                )
+        n_kept = 0
+
+        for i, date in enumerate(rebalance_dates):
+            optimizer_kwargs = windows[i]
+            lookback_returns = optimizer_kwargs["returns"]
+            lookback_benchmark = optimizer_kwargs["benchmark_returns"]
 
             # Ensure current_weights match the current asset universe size
             if len(current_weights) != lookback_returns.shape[1]:
                 current_weights = np.ones(lookback_returns.shape[1]) / lookback_returns.shape[1]
+            optimizer_kwargs = {**optimizer_kwargs, "current_weights": current_weights}
 
-            # --- Parameter Adjustment (for compatible optimizers) ---
-            optimizer_kwargs = {
-                "returns": lookback_returns,
-                "benchmark_returns": lookback_benchmark,
-                "current_weights": current_weights,
-            }
-            if regimes is not None and hasattr(self.optimizer, "_interpolate_params"):
-                regime_prob = regimes.asof(date)
-                optimizer_kwargs["regime_prob"] = regime_prob
-
-            if alpha_scores is not None and isinstance(
-                self.optimizer, (AlphaAwareCVaROptimizer, RegimeAwareCVaROptimizer)
+            # --- Run Optimization ---
+            if self.regime_grid is not None and "regime_prob" in optimizer_kwargs:
+                path = self.optimizer.solve_regime_path(
+                    lookback_returns,
+                    lookback_benchmark,
+                    current_weights,
+                    grid=self.regime_grid,
+                    time_budget=self.time_budget,
+                )
+                self.regime_paths[date] = path
+                opt_result = self.optimizer.optimize_on_path(path, optimizer_kwargs["regime_prob"])
+            elif speculative is not None and _speculation_holds(
+                *speculative[i],
+                current_weights,
+                self.optimizer.transaction_cost,
+                self.speculation_tol,
             ):
-                latest_alpha = alpha_scores.asof(date)
-                if isinstance(latest_alpha, pd.DataFrame):
-                    latest_alpha = latest_alpha.iloc[-1]
-
-                aligned_alpha, _ = latest_alpha.align(
-                    pd.Series(index=lookback_returns.columns), join="right", fill_value=0
+                opt_result = replace(
+                    speculative[i][1],
+                    turnover=np.sum(np.abs(speculative[i][1].weights - current_weights)),
                 )
-                optimizer_kwargs["alpha_scores"] = aligned_alpha
-
-            # --- Run Optimization ---
-            opt_result = self.optimizer.optimize(**optimizer_kwargs)
+                n_kept += 1
+            else:
+                if speculative is not None and speculative[i][1].weights is not None:
+                    # Correction pass: warm-start from the speculative answer
+                    self.optimizer._last_weights = speculative[i][1].weights
+                opt_result = self.optimizer.optimize(**optimizer_kwargs)
+            if opt_result:
+                row = {field: getattr(opt_result, field) for field in TELEMETRY_FIELDS}
+                if row["solvers_tried"] is not None:
+                    row["solvers_tried"] = ",".join(row["solvers_tried"])
+                telemetry_rows.append({"date": date, **row})
 
             # --- Store Results ---
-            if opt_result and opt_result.status in ["optimal", "optimal_inaccurate"]:
-                current_weights = opt_result.weights
-                result_dict = {
-                    "date": date,
-                    "universe": lookback_returns.columns.tolist(),
-                    "weights": opt_result.weights,
-                    "cvar": opt_result.cvar,
-                    "tracking_error": opt_result.tracking_error,
-                    "turnover": opt_result.turnover,
-                    "n_positions": (opt_result.weights > 1e-4).sum(),
-                    "status": opt_result.status,
-                }
-                logger.info(
-                    f"Rebalanced on {date}: CVaR={opt_result.cvar:.4f}, Status={opt_result.status}"
-                )
-            else:
-                status = opt_result.status if opt_result else "failed"
-                logger.warning(
-                    f"Optimization failed on {date} with status {status}. Holding previous weights."
-                )
-                result_dict = {
-                    "date": date,
-                    "universe": lookback_returns.columns.tolist(),
-                    "weights": current_weights,
-                    "cvar": np.nan,
-                    "tracking_error": np.nan,
-                    "turnover": 0,
-                    "n_positions": (current_weights > 1e-4).sum(),
-                    "status": "failed_optimization",
-                }
+            result_dict = self._result_dict(
+                date, lookback_returns.columns.tolist(), opt_result, current_weights
+            )
+            current_weights = result_dict["weights"]
             rebalance_results.append(result_dict)
+            if checkpoint_path and (
+                (i + 1) % checkpoint_every == 0 or i == len(rebalance_dates) - 1
+            ):
+                # Regime paths hold whole returns windows and are left out, so that each
+                # checkpoint only grows by one rebalance row
+                save_checkpoint(
+                    checkpoint_path,
+                    {
+                        "dates": list(all_dates[: n_done + i + 1]),
+                        "fingerprint": self._fingerprint(
+                            returns, benchmark_returns, alpha_scores, regimes, date
+                        ),
+                        "rebalance_results": rebalance_results,
+                        "telemetry_rows": telemetry_rows,
+                        "current_weights": current_weights,
+                        "last_weights": self.optimizer._last_weights,
+                    },
+                )
+
+        if speculative is not None:
+            logger.info(
+                f"Speculative backtest kept {n_kept} of {len(windows)} windows without a re-solve."
+            )
+
+        self.telemetry = pd.DataFrame(telemetry_rows, columns=["date"] + TELEMETRY_FIELDS)
+        self.telemetry = self.telemetry.set_index("date")
+        if not self.telemetry.empty:
+            logger.info(
+                f"Solver telemetry over {len(self.telemetry)} rebalances: "
+                f"total {self.telemetry['total_time'].sum():.2f}s, "
+                f"presolve {self.telemetry['presolve_time'].sum():.2f}s, "
+                f"setup {self.telemetry['setup_time'].sum():.2f}s, "
+                f"solver {self.telemetry['solve_time'].sum():.2f}s."
+            )
 
         if not rebalance_results:
             logger.error("Backtest loop finished but no results were generated.")
@@ -457,61 +1805,336 @@ class RollingCVaROptimizer:
         rebalance_df["date"] = pd.to_datetime(rebalance_df["date"])
         rebalance_df.set_index("date", inplace=True)
 
-        # 4. Construct Daily Weights DataFrame
-        all_weights_rows = []
-        for date, row in rebalance_df.iterrows():
-            weights_series = pd.Series(row["weights"], index=row["universe"], name=date)
-            all_weights_rows.append(weights_series)
+        # 4. Construct Target Weights
+        # Rebalance weights as a matrix over the union of the universes, in order of appearance
+        universes = rebalance_df["universe"].tolist()
+        if all(universe == universes[0] for universe in universes):
+            columns = pd.Index(universes[0])
+            weight_matrix = np.vstack(rebalance_df["weights"].tolist()).astype(float)
+        else:
+            columns = pd.Index(universes[0])
+            for universe in universes[1:]:
+                columns = columns.union(pd.Index(universe), sort=False)
+            weight_matrix = np.zeros((len(rebalance_df), len(columns)))
+            for i, (universe, weights) in enumerate(zip(universes, rebalance_df["weights"])):
+                weight_matrix[i, columns.get_indexer(universe)] = weights
+        weight_matrix[np.isnan(weight_matrix)] = 0.0
 
-        weights_df = pd.concat(all_weights_rows, axis=1).T.fillna(0.0)
+        # 5. Calculate Portfolio Returns with Transaction Costs
+        # Positions are held between rebalances and drift with their returns; the first
+        # rebalance trades from an initial EW portfolio, as in the optimizer.
+        targets = pd.DataFrame(weight_matrix, index=rebalance_df.index, columns=columns)
+        initial_weights = np.zeros(len(columns))
+        initial_weights[columns.get_indexer(universes[0])] = 1.0 / len(universes[0])
+        daily_returns = returns.reindex(columns=columns)
+        self.accounting = drift_accounting(
+            daily_returns, targets, self.optimizer.transaction_cost, initial_weights
+        )
+        daily_weights_df = self.accounting.weights
+        portfolio_returns = self.accounting.net_returns
+        rebalance_df["turnover"] = self.accounting.turnover.to_numpy()
+        self.state = BacktestState(
+            last_date=daily_weights_df.index[-1],
+            last_rebalance=targets.index[-1],
+            targets=targets.iloc[-1],
+            pre_trade=targets.iloc[-1] - self.accounting.trades.iloc[-1],
+            current_weights=current_weights,
+            last_weights=self.optimizer._last_weights,
+        )
 
-        daily_index = returns.loc[weights_df.index.min() :].index
-        daily_weights_df = weights_df.reindex(daily_index, method="ffill").fillna(0.0)
+        # `turnover` is the sum of absolute changes in weights (i.e., total volume of trades).
+        # `transaction_cost` is the per-side cost, so this correctly models the total cost.
+        costs = self.accounting.turnover * self.optimizer.transaction_cost
+        logger.info(
+            f"Applied transaction costs on {len(costs)} rebalances: total {costs.sum():.4f} "
+            f"(average turnover {self.accounting.turnover.mean():.2%})."
+        )
 
-        # 5. Calculate Portfolio Returns with Transaction Costs
-        aligned_returns, aligned_weights = returns.align(daily_weights_df, join="inner", axis=0)
-        portfolio_returns = (aligned_weights * aligned_returns).sum(axis=1)
+        rebalance_df.reset_index(inplace=True)
 
-        # Deduct transaction costs on rebalance days based on turnover from drifted weights
-        rebalance_dates_in_period = rebalance_df.index.intersection(portfolio_returns.index)
+        return rebalance_df, portfolio_returns, daily_weights_df
 
-        for date in rebalance_dates_in_period:
-            loc = aligned_weights.index.get_loc(date)
-            if loc == 0:
-                # For the first rebalance, turnover is calculated against an initial EW portfolio.
-                # This is already handled inside the optimizer. We use that value directly.
-                turnover = rebalance_df.loc[date, "turnover"]
-            else:
-                # For subsequent rebalances, calculate turnover against price-drifted weights
-                prev_trading_day = aligned_weights.index[loc - 1]
-                weights_before_rebalance = aligned_weights.loc[prev_trading_day]
-                returns_on_prev_day = aligned_returns.loc[prev_trading_day]
+    def update(
+        self,
+        returns: pd.DataFrame,
+        benchmark_returns: pd.Series,
+        state: BacktestState,
+        alpha_scores: Optional[pd.DataFrame] = None,
+        regimes: Optional[pd.Series] = None,
+    ) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame]:
+        """
+        Extends a backtest with the days appended to the returns since ``state``.
 
-                # Calculate drifted weights at end of previous day
-                drifted_numerator = weights_before_rebalance * (1 + returns_on_prev_day)
-                drifted_weights = drifted_numerator / drifted_numerator.sum()
+        Only the rebalances that fell due since the state's last rebalance are solved; the
+        holdings are then carried forward from that rebalance. The new state is stored in
+        ``self.state``.
 
-                # Target weights for the current rebalance day
-                target_weights = aligned_weights.loc[date]
+        Args:
+            returns: Returns up to the newest day, including at least ``lookback_window``
+                days before ``state.last_rebalance``.
+            benchmark_returns: Benchmark returns on the same dates.
+            state: End state of the backtest or update being extended.
+            alpha_scores: DataFrame of alpha scores.
+            regimes: Series of market regimes.
 
-                # Align and calculate turnover
-                aligned_target, aligned_drifted = target_weights.align(
-                    drifted_weights, join="outer", fill_value=0.0
-                )
-                turnover = (aligned_target - aligned_drifted).abs().sum()
+        Returns:
+            A tuple containing:
+            - DataFrame with the new rebalance results.
+            - Series with daily portfolio returns from the first day that changed.
+            - DataFrame with daily portfolio weights from the first day that changed.
+            The first changed day follows ``state.last_date``, unless a new rebalance
+            falls on or before it (a period end only known once the next day arrives).
+        """
+        loc = returns.index.searchsorted(state.last_rebalance)
+        if (
+            loc < self.lookback_window
+            or loc == len(returns.index)
+            or returns.index[loc] != state.last_rebalance
+        ):
+            raise ValueError(
+                f"Returns must include the last rebalance {state.last_rebalance.date()} and "
+                f"the {self.lookback_window} days before it."
+            )
+
+        # --- Solve the rebalances that fell due ---
+        rebalance_dates = self._get_rebalance_dates(returns.index, self.lookback_window)
+        rebalance_dates = rebalance_dates[rebalance_dates > state.last_rebalance]
+        current_weights = state.current_weights
+        self.optimizer._last_weights = state.last_weights
+        rebalance_results = []
+        for date in rebalance_dates:
+            optimizer_kwargs = self._window_kwargs(
+                returns, benchmark_returns, date, alpha_scores, regimes
+            )
+            lookback_returns = optimizer_kwargs["returns"]
+            if len(current_weights) != lookback_returns.shape[1]:
+                current_weights = np.ones(lookback_returns.shape[1]) / lookback_returns.shape[1]
+            opt_result = self.optimizer.optimize(
+                **optimizer_kwargs, current_weights=current_weights
+            )
+            result_dict = self._result_dict(
+                date, lookback_returns.columns.tolist(), opt_result, current_weights
+            )
+            current_weights = result_dict["weights"]
+            rebalance_results.append(result_dict)
+
+        # --- Carry the holdings forward from the last known rebalance ---
+        new_targets = [
+            pd.Series(result["weights"], index=result["universe"]) for result in rebalance_results
+        ]
+        targets = pd.concat([state.targets] + new_targets, axis=1).T.fillna(0.0)
+        targets.index = pd.DatetimeIndex([state.last_rebalance]).append(rebalance_dates)
+        accounting = drift_accounting(
+            returns.reindex(columns=targets.columns),
+            targets,
+            self.optimizer.transaction_cost,
+            state.pre_trade.reindex(targets.columns).fillna(0.0).to_numpy(),
+        )
+
+        days = accounting.weights.index
+        changed = days > state.last_date
+        if len(rebalance_dates):
+            changed |= days >= rebalance_dates[0]
+        first = days[changed][0] if changed.any() else days[-1] + pd.Timedelta(days=1)
+
+        rebalance_df = pd.DataFrame(rebalance_results)
+        if rebalance_results:
+            rebalance_df["turnover"] = accounting.turnover.iloc[1:].to_numpy()
+        self.state = BacktestState(
+            last_date=days[-1],
+            last_rebalance=targets.index[-1],
+            targets=targets.iloc[-1],
+            pre_trade=targets.iloc[-1] - accounting.trades.iloc[-1],
+            current_weights=current_weights,
+            last_weights=self.optimizer._last_weights,
+        )
+        logger.info(
+            f"Updated backtest through {days[-1].date()} with {len(rebalance_results)} new "
+            f"rebalances and {int(changed.sum())} new or restated days."
+        )
+
+        return (
+            rebalance_df,
+            accounting.net_returns.loc[first:],
+            accounting.weights.loc[first:],
+        )
 
-            # Deduct transaction costs from the gross return.
-            # `turnover` is the sum of absolute changes in weights (i.e., total volume of trades).
-            # `transaction_cost` is the per-side cost, so this correctly models the total cost.
-            transaction_cost = turnover * self.optimizer.transaction_cost
-            portfolio_returns.loc[date] -= transaction_cost
+    def _result_dict(
+        self,
+        date: pd.Timestamp,
+        universe: List[str],
+        opt_result: Optional[OptimizationResult],
+        current_weights: np.ndarray,
+    ) -> Dict[str, Any]:
+        """Returns the rebalance row of a solve, holding ``current_weights`` if it failed."""
+        if opt_result and opt_result.status in [
+            "optimal",
+            "optimal_inaccurate",
+            "deadline_feasible",
+        ]:
+            result_dict = {
+                "date": date,
+                "universe": universe,
+                "weights": opt_result.weights,
+                "cvar": opt_result.cvar,
+                "tracking_error": opt_result.tracking_error,
+                "turnover": opt_result.turnover,
+                "n_positions": (opt_result.weights > 1e-4).sum(),
+                "status": opt_result.status,
+            }
+            if self.sensitivities:
+                result_dict["sensitivities"] = opt_result.sensitivities
             logger.info(
-                f"Applied transaction cost on {date}: {transaction_cost:.4f} (Turnover: {turnover:.2%})"
+                f"Rebalanced on {date}: CVaR={opt_result.cvar:.4f}, Status={opt_result.status}"
+            )
+        else:
+            status = opt_result.status if opt_result else "failed"
+            logger.warning(
+                f"Optimization failed on {date} with status {status}. Holding previous weights."
             )
+            result_dict = {
+                "date": date,
+                "universe": universe,
+                "weights": current_weights,
+                "cvar": np.nan,
+                "tracking_error": np.nan,
+                "turnover": 0,
+                "n_positions": (current_weights > 1e-4).sum(),
+                "status": "failed_optimization",
+            }
+            if self.sensitivities:
+                result_dict["sensitivities"] = None
+        return result_dict
 
-        rebalance_df.reset_index(inplace=True)
+    def _fingerprint(
+        self,
+        returns: pd.DataFrame,
+        benchmark_returns: pd.Series,
+        alpha_scores: Optional[pd.DataFrame],
+        regimes: Optional[pd.Series],
+        through: pd.Timestamp,
+    ) -> str:
+        """Hashes the settings and the inputs up to ``through`` for a checkpoint."""
+        settings = {
+            **self.optimizer._cache_settings(self.optimizer.params),
+            "lookback_window": self.lookback_window,
+            "rebalance_frequency": self.rebalance_frequency,
+            "regime_grid": self.regime_grid,
+        }
+        inputs = [
+            data.loc[:through] if data is not None else None
+            for data in (returns, benchmark_returns, alpha_scores, regimes)
+        ]
+        return fingerprint(settings, *inputs)
 
-        return rebalance_df, portfolio_returns, daily_weights_df
+    def _window_kwargs(
+        self,
+        returns: pd.DataFrame,
+        benchmark_returns: pd.Series,
+        date: pd.Timestamp,
+        alpha_scores: Optional[pd.DataFrame],
+        regimes: Optional[pd.Series],
+    ) -> Dict[str, Any]:
+        """Returns the ``optimize`` arguments of one rebalance, except ``current_weights``."""
+        lookback_end_loc = returns.index.get_loc(date)
+        assert isinstance(
+            lookback_end_loc, int
+        ), "Index lookup for rebalance date did not return a single integer location."
+        lookback_start_loc = max(0, lookback_end_loc - self.lookback_window)
+        lookback_returns = returns.iloc[lookback_start_loc:lookback_end_loc]
+        lookback_benchmark = benchmark_returns.iloc[lookback_start_loc:lookback_end_loc]
+
+        # --- Parameter Adjustment (for compatible optimizers) ---
+        optimizer_kwargs = {
+            "returns": lookback_returns,
+            "benchmark_returns": lookback_benchmark,
+        }
+        if self.time_budget is not None:
+            optimizer_kwargs["time_budget"] = self.time_budget
+        if self.sensitivities:
+            optimizer_kwargs["sensitivities"] = True
+        if regimes is not None and hasattr(self.optimizer, "_interpolate_params"):
+            regime_prob = regimes.asof(date)
+            optimizer_kwargs["regime_prob"] = regime_prob
+
+        if alpha_scores is not None and isinstance(
+            self.optimizer, (AlphaAwareCVaROptimizer, RegimeAwareCVaROptimizer)
+        ):
+            latest_alpha = alpha_scores.asof(date)
+            if isinstance(latest_alpha, pd.DataFrame):
+                latest_alpha = latest_alpha.iloc[-1]
+
+            aligned_alpha, _ = latest_alpha.align(
+                pd.Series(index=lookback_returns.columns), join="right", fill_value=0
+            )
+            optimizer_kwargs["alpha_scores"] = aligned_alpha
+
+        return optimizer_kwargs
+
+    def _speculate(
+        self, windows: List[Dict[str, Any]], initial_weights: np.ndarray
+    ) -> List[Tuple[np.ndarray, OptimizationResult]]:
+        """
+        Solves every window concurrently against a guessed turnover prior.
+
+        A first parallel pass solves each window without the turnover penalty, and window
+        k-1's answer becomes window k's guess of its current weights. Each further pass
+        solves, in parallel, the windows whose answer is no longer provably optimal for
+        their new guess, window k-1's latest speculative answer. The first window's guess
+        is exact, so each pass fixes at least one more window of the chain; how many
+        more depends on how strongly the turnover penalty ties windows together.
+
+        Returns:
+            (guessed current weights, speculative result) per window.
+        """
+
+        def answer(result: OptimizationResult, fallback: np.ndarray) -> np.ndarray:
+            solved = result.weights is not None and result.status in [
+                "optimal",
+                "optimal_inaccurate",
+                "deadline_feasible",
+            ]
+            return result.weights if solved else fallback
+
+        transaction_cost = self.optimizer.transaction_cost
+        results = self._map_windows([{**kwargs, "current_weights": None} for kwargs in windows])
+        priors: List[Optional[np.ndarray]] = [None] * len(windows)
+        for n_pass in range(1, self.speculation_passes + 1):
+            guesses = [initial_weights] + [
+                answer(result, initial_weights) for result in results[:-1]
+            ]
+            stale = [
+                k
+                for k, guess in enumerate(guesses)
+                if priors[k] is None
+                or not _speculation_holds(priors[k], results[k], guess, transaction_cost, 0.0)
+            ]
+            if not stale:
+                break
+            solved = self._map_windows(
+                [{**windows[k], "current_weights": guesses[k]} for k in stale]
+            )
+            for k, result in zip(stale, solved):
+                priors[k], results[k] = guesses[k], result
+            logger.debug(f"Speculative pass {n_pass} re-solved {len(stale)} windows.")
+        return list(zip(priors, results))
+
+    def _map_windows(self, windows: List[Dict[str, Any]]) -> List[OptimizationResult]:
+        """Runs ``optimize`` on every window in a pool of ``n_jobs`` workers."""
+        if _fork_is_safe():
+            # Forked workers inherit the optimizer, compiled problems included
+            executor = ProcessPoolExecutor(
+                self.n_jobs,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_speculative_worker,
+                initargs=(self.optimizer,),
+            )
+            with executor:
+                return list(executor.map(_speculative_worker, windows))
+        # The optimizer is thread-safe, so threads stand in where fork is unavailable or,
+        # with other threads running, could deadlock a worker
+        with ThreadPoolExecutor(self.n_jobs) as executor:
+            return list(executor.map(lambda kwargs: self.optimizer.optimize(**kwargs), windows))
 
     def _get_rebalance_dates(self, dates: pd.DatetimeIndex, lookback: int) -> pd.DatetimeIndex:
         """Get rebalancing dates, ensuring enough lookback data exists."""
@@ -545,6 +2168,8 @@ class AlphaAwareCVaROptimizer(CVaROptimizer):
     A CVaR optimizer that incorporates an alpha signal into the objective function.
     """
 
+    _params_class = AlphaAwareParams
+
     def __init__(self, alpha_factor: float = 0.01, **kwargs):
         """
         Initializes the AlphaAwareCVaROptimizer.
@@ -565,7 +2190,10 @@ class AlphaAwareCVaROptimizer(CVaROptimizer):
         alpha_factor: Optional[float] = None,
     ):
         """
-        Dynamically update optimizer parameters.
+        Update the optimizer's default parameters.
+
+        This modifies the shared instance; to vary parameters between calls (or across
+        threads), pass ``params=dataclasses.replace(optimizer.params, ...)`` instead.
 
         Args:
             alpha (Optional[float]): New confidence level for CVaR.
@@ -586,110 +2214,63 @@ class AlphaAwareCVaROptimizer(CVaROptimizer):
             f"Optimizer params updated: alpha={self.alpha}, lasso={self.lasso_penalty}, max_w={self.max_weight}, alpha_f={self.alpha_factor}"
         )
 
-    def optimize(
+    def optimize_array(
         self,
-        returns: pd.DataFrame,
-        benchmark_returns: Optional[pd.Series] = None,
+        R: np.ndarray,
+        b: Optional[np.ndarray] = None,
         current_weights: Optional[np.ndarray] = None,
+        labels: Optional[np.ndarray] = None,
         **kwargs,
     ) -> OptimizationResult:
         """
         Optimize portfolio to minimize CVaR and maximize alpha.
+
+        ``alpha_scores`` is either an array aligned with the columns of ``R`` or a
+        Series indexed by asset, which is aligned to ``labels`` (missing assets score 0).
         """
         alpha_scores = kwargs.get("alpha_scores")
         if alpha_scores is None:
             raise ValueError("alpha_scores are required for AlphaAwareCVaROptimizer")
+        params = kwargs.get("params") or self.params
+        alpha_factor = getattr(params, "alpha_factor", self.alpha_factor)
 
         # --- Data Preparation ---
-        returns = returns.fillna(0.0)
-        if benchmark_returns is not None:
-            benchmark_returns = benchmark_returns.fillna(0.0)
-
-        n_assets = returns.shape[1]
-        n_scenarios = returns.shape[0]
-        R = returns.values
-        aligned_alpha = alpha_scores.reindex(returns.columns).fillna(0).values
-
-        if benchmark_returns is None:
-            b = returns.mean(axis=1).values
+        R = np.asarray(R, dtype=np.float64)
+        n_assets = R.shape[1]
+        if isinstance(alpha_scores, pd.Series):
+            if labels is None:
+                raise ValueError("labels are required to align alpha_scores given as a Series")
+            aligned_alpha = alpha_scores.reindex(labels).fillna(0).values
         else:
-            b = benchmark_returns.values
+            aligned_alpha = np.asarray(alpha_scores, dtype=np.float64)
 
-        # --- CVXPY Problem Definition ---
-        w = cp.Variable(n_assets)
-        z = cp.Variable(n_scenarios)
-        zeta = cp.Variable()
-
-        tracking_error = (R @ w) - b
-        cvar = zeta + (1.0 / ((1 - self.alpha) * n_scenarios)) * cp.sum(z)
-
-        # --- Objective Function Construction ---
-        objective_terms = [cvar]
-        # Add Alpha Term (negative for maximization)
-        objective_terms.append(-self.alpha_factor * (aligned_alpha @ w))
-
-        # Add Lasso Term
-        if self.lasso_penalty > 0:
-            objective_terms.append(self.lasso_penalty * cp.norm1(w))
-
-        # Add Transaction Cost Term
-        if current_weights is not None:
-            turnover = cp.sum(cp.abs(w - current_weights))
-            objective_terms.append(self.transaction_cost * turnover)
-
-        objective = cp.Minimize(cp.sum(objective_terms))
-
-        # --- Constraints ---
-        constraints = [
-            z >= 0,
-            z >= -tracking_error - zeta,
-            cp.sum(w) == 1.0,
-            w >= 0,
-            w <= self.max_weight,
-        ]
-
-        problem = cp.Problem(objective, constraints)
+        if b is None:
+            b = R.mean(axis=1)
 
         # --- Solve Problem ---
+        # Alpha enters the shared CVaR problem as a linear reward (negative for maximization)
         try:
-            problem.solve(solver=self.solver, verbose=False)
-            if problem.status not in ["optimal", "optimal_inaccurate"] or w.value is None:
-                logger.warning(f"Solver {self.solver} failed with status: {problem.status}. Trying SCS.")
-                problem.solve(solver="SCS", verbose=False, max_iters=5000, eps=1e-4)
-
-            if problem.status not in ["optimal", "optimal_inaccurate"] or w.value is None:
-                logger.error(f"Optimization failed with all solvers. Status: {problem.status}")
-                return self._get_empty_result(n_assets, status=problem.status)
-
+            return self._solve(
+                R,
+                np.asarray(b, dtype=np.float64),
+                current_weights,
+                linear_tilt=alpha_factor * aligned_alpha,
+                scenario_weights=kwargs.get("scenario_weights"),
+                time_budget=kwargs.get("time_budget"),
+                params=params,
+                sensitivities=kwargs.get("sensitivities", False),
+                missing_assets=kwargs.get("missing_assets"),
+            )
         except Exception as e:
             logger.error(f"CVXPY solver failed: {e}")
             return self._get_empty_result(n_assets, status="solver_exception")
 
-        # --- Process Results ---
-        optimal_weights = w.value
-        portfolio_ret_series = R @ optimal_weights
-        tracking_err_series = portfolio_ret_series - b
-        turnover_val = (
-            np.sum(np.abs(optimal_weights - current_weights))
-            if current_weights is not None
-            else 0.0
-        )
-
-        return OptimizationResult(
-            weights=optimal_weights,
-            cvar=cvar.value,
-            portfolio_return=np.mean(portfolio_ret_series),
-            portfolio_volatility=np.std(portfolio_ret_series),
-            tracking_error=np.std(tracking_err_series),
-            turnover=turnover_val,
-            status=problem.status,
-            solve_time=problem.solver_stats.solve_time or 0.0,
-        )
-
 
 class RegimeAwareCVaROptimizer(CVaROptimizer):
     """Extends the CVaR optimizer to dynamically adjust parameters based on market regime."""
 
+    _batch_arguments = ("regime_prob",)
+
     def __init__(
         self,
         alpha: float = 0.95,
@@ -741,6 +2322,30 @@ class RegimeAwareCVaROptimizer(CVaROptimizer):
             interpolated[param] = interp_val
         return interpolated
 
+    def _regime_params(
+        self, regime_prob: Optional[float], params: Optional[CVaRParams]
+    ) -> CVaRParams:
+        """Returns ``params`` with the parameters interpolated for ``regime_prob``."""
+        params = params or self.params
+        if regime_prob is None:
+            return params
+
+        # Interpolate parameters based on the continuous regime probability
+        interpolated_params = self._interpolate_params(regime_prob)
+
+        logger.info(
+            f"Regime-adjusted params (prob={regime_prob:.2f}): "
+            f"α={interpolated_params['alpha']:.3f}, "
+            f"λ={interpolated_params['lasso_penalty']:.4f}, "
+            f"max_w={interpolated_params['max_weight']:.3f}"
+        )
+        return replace(
+            params,
+            alpha=interpolated_params["alpha"],
+            lasso_penalty=interpolated_params["lasso_penalty"],
+            max_weight=interpolated_params["max_weight"],
+        )
+
     def optimize(
         self,
         returns: pd.DataFrame,
@@ -752,39 +2357,308 @@ class RegimeAwareCVaROptimizer(CVaROptimizer):
     ) -> OptimizationResult:
         """
         Optimize with dynamic parameters based on continuous regime score.
+
+        The interpolated parameters are passed on as this call's ``params``; the
+        optimizer's own parameters are left unchanged. With ``sensitivities=True`` the
+        result also holds the derivative of the weights to ``regime_prob``.
         """
-        # Store original parameters to restore after optimization
-        original_params = {
-            "alpha": self.alpha,
-            "lasso_penalty": self.lasso_penalty,
-            "max_weight": self.max_weight,
-        }
+        result = super().optimize(
+            returns=returns,
+            benchmark_returns=benchmark_returns,
+            current_weights=current_weights,
+            scenario_weights=kwargs.get("scenario_weights"),
+            time_budget=kwargs.get("time_budget"),
+            params=self._regime_params(regime_prob, kwargs.get("params")),
+            sensitivities=kwargs.get("sensitivities", False),
+        )
+        return self._with_regime_sensitivity(result, regime_prob)
 
-        if regime_prob is not None:
-            # Interpolate parameters based on the continuous regime probability
-            interpolated_params = self._interpolate_params(regime_prob)
+    def optimize_array(
+        self,
+        R: np.ndarray,
+        b: Optional[np.ndarray] = None,
+        current_weights: Optional[np.ndarray] = None,
+        labels: Optional[np.ndarray] = None,
+        regime_prob: Optional[float] = None,
+        alpha_scores: Optional[pd.Series] = None,  # For compatibility
+        **kwargs,
+    ) -> OptimizationResult:
+        """
+        Optimize from NumPy arrays with parameters based on continuous regime score.
+        """
+        result = super().optimize_array(
+            R,
+            b,
+            current_weights,
+            labels=labels,
+            scenario_weights=kwargs.get("scenario_weights"),
+            time_budget=kwargs.get("time_budget"),
+            params=self._regime_params(regime_prob, kwargs.get("params")),
+            sensitivities=kwargs.get("sensitivities", False),
+            missing_assets=kwargs.get("missing_assets"),
+        )
+        return self._with_regime_sensitivity(result, regime_prob)
 
-            logger.info(
-                f"Regime-adjusted params (prob={regime_prob:.2f}): "
-                f"α={interpolated_params['alpha']:.3f}, "
-                f"λ={interpolated_params['lasso_penalty']:.4f}, "
-                f"max_w={interpolated_params['max_weight']:.3f}"
-            )
+    def _with_regime_sensitivity(
+        self, result: OptimizationResult, regime_prob: Optional[float]
+    ) -> OptimizationResult:
+        """Adds d(weights)/d(regime_prob) to the result's sensitivities, if present."""
+        if result.sensitivities is None or regime_prob is None:
+            return result
+        # Chain rule through the linear interpolation of each regime parameter. Only the
+        # constraint parameters have a derivative; the objective-only ones keep the vertex
+        d_regime = np.zeros_like(result.weights)
+        for param, on_val in self.risk_on_params.items():
+            if param in result.sensitivities:
+                d_regime += result.sensitivities[param] * (self.risk_off_params[param] - on_val)
+        result.sensitivities["regime_prob"] = d_regime
+        return result
+
+    def solve_regime_path(
+        self,
+        returns: pd.DataFrame,
+        benchmark_returns: Optional[pd.Series] = None,
+        current_weights: Optional[np.ndarray] = None,
+        grid: Tuple[float, ...] = REGIME_GRID,
+        **kwargs,
+    ) -> RegimePath:
+        """
+        Solves one window on a grid of regime probabilities, warm-started along the path.
 
-            # Apply the interpolated parameters for this optimization run
-            self.alpha = interpolated_params["alpha"]
-            self.lasso_penalty = interpolated_params["lasso_penalty"]
-            self.max_weight = interpolated_params["max_weight"]
+        The grid solutions carry their sensitivities, so that ``optimize_on_path`` can
+        serve any probability from them afterwards.
 
-        try:
-            # Call the base class's optimize method with the dynamically adjusted parameters
-            return super().optimize(
-                returns=returns,
-                benchmark_returns=benchmark_returns,
-                current_weights=current_weights,
+        Args:
+            returns: DataFrame of asset returns (T x N)
+            benchmark_returns: Series of benchmark returns (T x 1)
+            current_weights: Current portfolio weights for turnover calculation
+            grid: Regime probabilities to solve, in [0, 1]
+            **kwargs: ``scenario_weights``, ``time_budget`` and ``params``, as for
+                ``optimize``.
+
+        Returns:
+            RegimePath with one result per grid point, in increasing probability.
+        """
+        missing_assets = _missing_assets(returns)
+        R = _clean_array(returns)
+        b = _clean_array(benchmark_returns) if benchmark_returns is not None else R.mean(axis=1)
+        base_params = kwargs.get("params") or self.params
+        path = RegimePath(
+            grid=np.sort(np.asarray(grid, dtype=float)),
+            results=[],
+            params=replace(base_params, warm_start=True),
+            returns=R,
+            benchmark=b,
+            current_weights=current_weights,
+            labels=returns.columns.values,
+            scenario_weights=kwargs.get("scenario_weights"),
+            missing_assets=missing_assets,
+        )
+        for regime_prob in path.grid:
+            path.results.append(
+                self.optimize_array(
+                    R,
+                    b,
+                    current_weights,
+                    labels=path.labels,
+                    regime_prob=regime_prob,
+                    scenario_weights=path.scenario_weights,
+                    time_budget=kwargs.get("time_budget"),
+                    params=path.params,
+                    sensitivities=True,
+                    missing_assets=path.missing_assets,
+                )
             )
-        finally:
-            # Restore original parameters to ensure statelessness for the next run
-            self.alpha = original_params["alpha"]
-            self.lasso_penalty = original_params["lasso_penalty"]
-            self.max_weight = original_params["max_weight"]
+        return path
+
+    def optimize_on_path(
+        self, path: RegimePath, regime_prob: float, tol: float = 1e-6
+    ) -> OptimizationResult:
+        """
+        Serves a regime probability from a precomputed ``RegimePath``.
+
+        Between two grid points the optimal weights are linear in the regime probability
+        as long as the LP's active set does not change. That is checked with the
+        sensitivities: when the first-order step from each bracketing solution reaches
+        the other one within ``tol``, the weights are interpolated without a solve.
+        Otherwise the probability is solved, warm-started from the nearest grid point.
+
+        Args:
+            path: Output of ``solve_regime_path`` for the window.
+            regime_prob: Regime probability to serve.
+            tol: Largest per-asset mismatch for the interpolation check.
+
+        Returns:
+            OptimizationResult; interpolated results have ``solver='regime_path'``.
+        """
+        start = time.perf_counter()
+        grid = path.grid
+        nearest = int(np.abs(grid - regime_prob).argmin())
+        if abs(grid[nearest] - regime_prob) <= 1e-12:
+            return path.results[nearest]
+
+        upper = int(np.searchsorted(grid, regime_prob))
+        if 0 < upper < len(grid):
+            left, right = path.results[upper - 1], path.results[upper]
+            if _on_one_linear_piece(left, right, grid[upper] - grid[upper - 1], tol):
+                t = (regime_prob - grid[upper - 1]) / (grid[upper] - grid[upper - 1])
+                weights = (1 - t) * left.weights + t * right.weights
+                params = self._regime_params(regime_prob, path.params)
+                cvar, _ = cvar_of_losses(
+                    path.benchmark - path.returns @ weights, params.alpha, path.scenario_weights
+                )
+                result = self._build_result(
+                    path.returns,
+                    path.benchmark,
+                    weights,
+                    cvar,
+                    path.current_weights,
+                    "optimal",
+                    time.perf_counter() - start,
+                    scenario_weights=path.scenario_weights,
+                    solver="regime_path",
+                )
+                result.sensitivities = {
+                    name: (1 - t) * left.sensitivities[name] + t * right.sensitivities[name]
+                    for name in left.sensitivities
+                }
+                return result
+
+        # Outside the grid or across a breakpoint: warm-start from the nearest solution
+        self._last_weights = path.results[nearest].weights
+        return self.optimize_array(
+            path.returns,
+            path.benchmark,
+            path.current_weights,
+            labels=path.labels,
+            regime_prob=regime_prob,
+            scenario_weights=path.scenario_weights,
+            params=path.params,
+            sensitivities=True,
+            missing_assets=path.missing_assets,
+        )
+
+
+def _on_one_linear_piece(
+    left: OptimizationResult, right: OptimizationResult, step: float, tol: float
+) -> bool:
+    """Whether two regime-path solutions predict each other from their sensitivities."""
+    for result in (left, right):
+        if result.status != "optimal" or result.sensitivities is None:
+            return False
+    forward = left.weights + step * left.sensitivities["regime_prob"]
+    backward = right.weights - step * right.sensitivities["regime_prob"]
+    return (
+        np.abs(forward - right.weights).max() <= tol
+        and np.abs(backward - left.weights).max() <= tol
+    )
+
+
+def _speculation_holds(
+    prior: np.ndarray,
+    result: OptimizationResult,
+    current_weights: np.ndarray,
+    transaction_cost: float,
+    tol: float,
+) -> bool:
+    """
+    Whether a window solved against guessed current weights is optimal for the true ones.
+
+    The guess only enters through ``tc * |w - prior|``. The speculative weights stay
+    optimal when every asset's turnover subgradient is unchanged or only widened: the
+    guess was right, or the weights sit at the true current weight, or they lie on the
+    same side of both. Otherwise their suboptimality is at most
+    ``tc * (|w - c|_1 - |w - prior|_1 + |prior - c|_1)``, accepted up to ``tol``.
+
+    The sign tests assume an exact solution, so only 'optimal' answers of
+    ``EXACT_SOLVERS`` are accepted. Interior-point answers (ECOS, CLARABEL) still sit up
+    to about 1e-8 off a kink ``w == prior``, so weights that close to the guess are not
+    trusted to lie on its side and go to the gap bound instead.
+    """
+    if (
+        result.weights is None
+        or result.status != "optimal"
+        or result.solver not in EXACT_SOLVERS
+    ):
+        return False
+    if transaction_cost == 0:
+        return True
+    eps, kink = 1e-9, 1e-6
+    to_prior = result.weights - prior
+    to_current = result.weights - current_weights
+    unchanged = (
+        (np.abs(prior - current_weights) <= eps)
+        | (np.abs(to_current) <= eps)
+        | ((np.abs(to_prior) > kink) & (np.sign(to_prior) == np.sign(to_current)))
+    )
+    if unchanged.all():
+        return True
+    gap = transaction_cost * (
+        np.abs(to_current).sum() - np.abs(to_prior).sum() + np.abs(prior - current_weights).sum()
+    )
+    return gap <= tol
+
+
+# Optimizer of a speculative backtest worker process, inherited from the parent on fork
+_worker_optimizer: Optional[CVaROptimizer] = None
+
+
+def _init_speculative_worker(optimizer: CVaROptimizer) -> None:
+    """Stores the optimizer handed to a forked speculative backtest worker."""
+    global _worker_optimizer
+    _worker_optimizer = optimizer
+
+
+def _speculative_worker(kwargs: Dict[str, Any]) -> OptimizationResult:
+    """Solves one speculative backtest window in a worker process."""
+    return _worker_optimizer.optimize(**kwargs)
+
+
+def _fork_is_safe() -> bool:
+    """
+    Whether worker processes can be forked from this process.
+
+    A forked child inherits every lock in the state it had at the fork but only the
+    forking thread, so a lock held by any other thread is never released in the child.
+    """
+    return "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1
+
+
+def _clean_array(data: Union[pd.DataFrame, pd.Series]) -> np.ndarray:
+    """Returns the float64 values of a frame with NaNs as 0, copying only if there are NaNs."""
+    values = data.to_numpy(dtype=np.float64)
+    # The sum is NaN exactly when some value is, and needs no T x N temporary
+    if np.isnan(values.sum()):
+        values = np.where(np.isnan(values), 0.0, values)
+    return values
+
+
+def _missing_assets(data: pd.DataFrame) -> Optional[np.ndarray]:
+    """Returns the mask of the columns without any data, or None if nothing is missing."""
+    values = data.to_numpy(dtype=np.float64)
+    if not np.isnan(values.sum()):
+        return None
+    return np.isnan(values).all(axis=0)
+
+
+def _race_worker(
+    source: Any,
+    solver: str,
+    args: Tuple[Optional[np.ndarray], ...],
+    results: Any,
+) -> None:
+    """Solves one prepared window with a single solver and reports to the race queue."""
+    if isinstance(source, CVaROptimizer):
+        optimizer = source
+        optimizer.solver = solver
+    else:
+        optimizer = CVaROptimizer(solver=solver, **source)
+    try:
+        if solver in NATIVE_SOLVERS:
+            result = optimizer._solve_native(*args)
+        else:
+            result = optimizer._solve_cvxpy(*args, solvers=[solver])
+    except Exception as e:
+        logger.warning(f"Solver {solver} failed in race: {e}")
+        result = None
+    results.put((solver, result))
@@ -0,0 +1,130 @@
+"""
+Statistical factor compression of the scenario matrix.
+
+Approximates a returns window by a truncated principal-component decomposition,
+``R ≈ F @ B.T + E``, with factor scores ``F`` (T x k) and loadings ``B`` (N x k). The
+CVaR optimizer can then price tracking losses through the k factor exposures
+``B.T @ w`` instead of the full T x N matrix, so the dense block the solver factorizes
+is T x k. The idiosyncratic part ``E`` is not modeled scenario by scenario; it enters
+the objective as a linear penalty on each asset's residual volatility.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FactorDecomposition:
+    """Truncated factor decomposition of one returns window."""
+
+    scores: np.ndarray
+    loadings: np.ndarray
+    residual_vol: np.ndarray
+    explained_variance: float
+
+    @property
+    def n_factors(self) -> int:
+        """Number of retained factors k."""
+        return self.loadings.shape[1]
+
+
+class PCAFactorModel:
+    """
+    PCA factor model of the lookback window, cached per rebalance.
+
+    Decompositions are keyed by a fingerprint of the window's contents, so repeated
+    solves on the same rebalance date (e.g. a frontier or a solver fallback) reuse the
+    SVD instead of recomputing it.
+    """
+
+    def __init__(
+        self,
+        n_factors: Optional[int] = None,
+        explained_variance: float = 0.9,
+        max_factors: int = 50,
+        residual_penalty: float = 1.0,
+        max_cached: int = 8,
+    ):
+        """
+        Initializes the factor model.
+
+        Args:
+            n_factors: Fixed number of factors. If None, the smallest k explaining at
+                least ``explained_variance`` of the window's second moment is used.
+            explained_variance: Target share of ``||R||_F^2`` captured by the factors.
+            max_factors: Upper bound on k when it is chosen automatically.
+            residual_penalty: Weight of the residual-volatility penalty
+                ``residual_penalty * residual_vol @ w`` added to the objective.
+            max_cached: Number of decompositions kept in the cache.
+        """
+        self.n_factors = n_factors
+        self.explained_variance = explained_variance
+        self.max_factors = max_factors
+        self.residual_penalty = residual_penalty
+        self.max_cached = max_cached
+        self._cache: "OrderedDict[str, FactorDecomposition]" = OrderedDict()
+        # Guards the cache when optimizers sharing this model solve from several threads
+        self._lock = threading.Lock()
+
+    def decompose(self, R: np.ndarray) -> FactorDecomposition:
+        """
+        Returns the factor decomposition of a returns window, computing it on first use.
+
+        Args:
+            R: Asset returns (T x N).
+
+        Returns:
+            FactorDecomposition with scores (T x k) and loadings (N x k).
+        """
+        R = np.ascontiguousarray(R, dtype=float)
+        key = hashlib.blake2b(R.tobytes(), digest_size=16).hexdigest() + str(R.shape)
+        with self._lock:
+            decomposition = self._cache.get(key)
+            if decomposition is not None:
+                self._cache.move_to_end(key)
+                return decomposition
+
+        decomposition = self._fit(R)
+        with self._lock:
+            self._cache[key] = decomposition
+            if len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        logger.debug(
+            f"Compressed {R.shape[1]} assets to {decomposition.n_factors} factors "
+            f"({decomposition.explained_variance:.1%} explained)."
+        )
+        return decomposition
+
+    def _fit(self, R: np.ndarray) -> FactorDecomposition:
+        """Fits the truncated SVD of the (uncentered) returns window."""
+        # Uncentered, so the factors also carry the mean returns the tracking loss depends on
+        U, s, Vt = np.linalg.svd(R, full_matrices=False)
+        energy = s**2
+        total = energy.sum()
+        if self.n_factors is not None:
+            k = self.n_factors
+        elif total > 0:
+            cumulative = np.cumsum(energy) / total
+            k = int(np.searchsorted(cumulative, self.explained_variance - 1e-12)) + 1
+            k = min(k, self.max_factors)
+        else:
+            k = 1
+        k = max(1, min(k, len(s)))
+
+        scores = U[:, :k] * s[:k]
+        loadings = Vt[:k].T
+        residual = R - scores @ loadings.T
+        return FactorDecomposition(
+            scores=scores,
+            loadings=loadings,
+            residual_vol=np.sqrt(np.mean(residual**2, axis=0)),
+            explained_variance=float(energy[:k].sum() / total) if total > 0 else 1.0,
+        )
@@ -0,0 +1,570 @@
+"""
+Sparse LP backend for the CLEIR CVaR problem.
+
+The CVaR-LASSO tracking problem is a pure linear program once the CVaR auxiliaries
+and the L1 turnover term (split into buy and sell variables) are written out. This
+module builds the constraint matrices directly with ``scipy.sparse`` and solves them
+with HiGHS through ``scipy.optimize.linprog``, bypassing CVXPY altogether.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+logger = logging.getLogger(__name__)
+
+# Map of scipy.optimize.linprog status codes to CVXPY-style status strings
+LINPROG_STATUS = {
+    0: "optimal",
+    1: "user_limit",
+    2: "infeasible",
+    3: "unbounded",
+    4: "solver_error",
+}
+
+
+def _scenario_probabilities(
+    n_scenarios: int, scenario_weights: Optional[np.ndarray]
+) -> np.ndarray:
+    """Returns scenario probabilities, defaulting to equally likely scenarios."""
+    if scenario_weights is None:
+        return np.full(n_scenarios, 1.0 / n_scenarios)
+    return np.asarray(scenario_weights, dtype=float)
+
+
+@dataclass
+class CVaRLinearProgram:
+    """Matrices of the CVaR LP in ``linprog`` form, with the variable layout."""
+
+    c: np.ndarray
+    A_ub: sp.csr_matrix
+    b_ub: np.ndarray
+    A_eq: sp.csr_matrix
+    b_eq: np.ndarray
+    bounds: List[Tuple[Optional[float], Optional[float]]]
+    n_assets: int
+    n_scenarios: int
+    has_turnover: bool
+
+    @property
+    def zeta_index(self) -> int:
+        """Position of the VaR variable zeta in the variable vector."""
+        return self.n_assets + self.n_scenarios
+
+
+@dataclass
+class LPSolution:
+    """Solution of the CVaR LP."""
+
+    weights: Optional[np.ndarray]
+    cvar: float
+    status: str
+    solve_time: float
+    iterations: Optional[int]
+    # Size of the (final master) LP
+    n_variables: Optional[int] = None
+    n_constraints: Optional[int] = None
+
+
+def build_cvar_lp(
+    R: np.ndarray,
+    b: np.ndarray,
+    alpha: float,
+    max_weight: float,
+    lasso_penalty: float = 0.0,
+    transaction_cost: float = 0.0,
+    current_weights: Optional[np.ndarray] = None,
+    linear_tilt: Optional[np.ndarray] = None,
+    scenario_weights: Optional[np.ndarray] = None,
+    factor_loadings: Optional[np.ndarray] = None,
+) -> CVaRLinearProgram:
+    """
+    Builds the sparse LP for minimizing the CVaR of tracking error.
+
+    Variables are ordered as ``[w (N), z (T), zeta, buy (N), sell (N), y (k)]``; the buy
+    and sell blocks are only present when ``current_weights`` is given, and the factor
+    exposures ``y = B.T @ w`` only when ``factor_loadings`` is given.
+
+    Args:
+        R: Asset returns (T x N), or factor scores (T x k) with ``factor_loadings``.
+        b: Benchmark returns (T,).
+        alpha: Confidence level for CVaR.
+        max_weight: Maximum weight per asset.
+        lasso_penalty: L1 penalty; linear in w because weights are long-only.
+        transaction_cost: Cost per unit of turnover.
+        current_weights: Current weights for the turnover term.
+        linear_tilt: Per-asset reward subtracted from the objective (e.g. alpha scores).
+        scenario_weights: Scenario probabilities (T,), summing to one. Defaults to
+            equally likely scenarios.
+        factor_loadings: Loadings B (N x k) of a factor model ``R ≈ F @ B.T``. The tail
+            constraints then use the T x k scores instead of the T x N returns.
+
+    Returns:
+        CVaRLinearProgram ready to pass to ``linprog``.
+    """
+    n_scenarios = R.shape[0]
+    n_assets = factor_loadings.shape[0] if factor_loadings is not None else R.shape[1]
+    n_factors = R.shape[1] if factor_loadings is not None else 0
+    has_turnover = current_weights is not None
+    n_trade = n_assets if has_turnover else 0
+
+    # --- Objective ---
+    c_w = np.full(n_assets, lasso_penalty, dtype=float)
+    if linear_tilt is not None:
+        c_w -= linear_tilt
+    probabilities = _scenario_probabilities(n_scenarios, scenario_weights)
+    c_z = probabilities / (1 - alpha)
+    c_trade = np.full(2 * n_trade, transaction_cost, dtype=float)
+    c = np.concatenate([c_w, c_z, [1.0], c_trade, np.zeros(n_factors)])
+
+    # --- Tail constraints: -R w - zeta - z <= -b, or -F y - zeta - z <= -b with factors ---
+    tail_blocks = [
+        sp.csr_matrix(-R) if factor_loadings is None else sp.csr_matrix((n_scenarios, n_assets)),
+        -sp.identity(n_scenarios, format="csr"),
+        sp.csr_matrix(-np.ones((n_scenarios, 1))),
+        sp.csr_matrix((n_scenarios, 2 * n_trade)),
+    ]
+    if factor_loadings is not None:
+        tail_blocks.append(sp.csr_matrix(-R))
+    A_ub = sp.hstack(tail_blocks, format="csr")
+    b_ub = -b
+
+    # --- Budget and turnover split: sum(w) = 1, w - buy + sell = current_weights ---
+    budget = sp.hstack(
+        [
+            sp.csr_matrix(np.ones((1, n_assets))),
+            sp.csr_matrix((1, n_scenarios + 1 + 2 * n_trade + n_factors)),
+        ]
+    )
+    eq_blocks = [budget]
+    b_eq = [np.ones(1)]
+    if has_turnover:
+        eye = sp.identity(n_assets, format="csr")
+        eq_blocks.append(
+            sp.hstack(
+                [
+                    eye,
+                    sp.csr_matrix((n_assets, n_scenarios + 1)),
+                    -eye,
+                    eye,
+                    sp.csr_matrix((n_assets, n_factors)),
+                ]
+            )
+        )
+        b_eq.append(np.asarray(current_weights, dtype=float))
+    if factor_loadings is not None:
+        # --- Factor exposures: B.T w - y = 0 ---
+        eq_blocks.append(
+            sp.hstack(
+                [
+                    sp.csr_matrix(factor_loadings.T),
+                    sp.csr_matrix((n_factors, n_scenarios + 1 + 2 * n_trade)),
+                    -sp.identity(n_factors, format="csr"),
+                ]
+            )
+        )
+        b_eq.append(np.zeros(n_factors))
+    A_eq = sp.vstack(eq_blocks, format="csr")
+
+    bounds = (
+        [(0.0, max_weight)] * n_assets
+        + [(0.0, None)] * n_scenarios
+        + [(None, None)]
+        + [(0.0, None)] * (2 * n_trade)
+        + [(None, None)] * n_factors
+    )
+
+    return CVaRLinearProgram(
+        c=c,
+        A_ub=A_ub,
+        b_ub=b_ub,
+        A_eq=A_eq,
+        b_eq=np.concatenate(b_eq),
+        bounds=bounds,
+        n_assets=n_assets,
+        n_scenarios=n_scenarios,
+        has_turnover=has_turnover,
+    )
+
+
+def solve_cvar_lp(
+    R: np.ndarray,
+    b: np.ndarray,
+    alpha: float,
+    max_weight: float,
+    lasso_penalty: float = 0.0,
+    transaction_cost: float = 0.0,
+    current_weights: Optional[np.ndarray] = None,
+    linear_tilt: Optional[np.ndarray] = None,
+    scenario_weights: Optional[np.ndarray] = None,
+    factor_loadings: Optional[np.ndarray] = None,
+    options: Optional[Dict[str, Any]] = None,
+    time_limit: Optional[float] = None,
+) -> LPSolution:
+    """
+    Solves the CVaR tracking LP with HiGHS.
+
+    Args:
+        R, b, alpha, max_weight, lasso_penalty, transaction_cost, current_weights,
+        linear_tilt, scenario_weights, factor_loadings: See ``build_cvar_lp``.
+        options: Extra options passed to ``linprog``.
+        time_limit: Wall-clock budget in seconds for HiGHS.
+
+    Returns:
+        LPSolution with the optimal weights and the CVaR of tracking error. When the
+        time limit is hit, the status is 'user_limit' and the weights are HiGHS's last
+        iterate, if it reported one (not necessarily feasible).
+    """
+    lp = build_cvar_lp(
+        R,
+        b,
+        alpha,
+        max_weight,
+        lasso_penalty=lasso_penalty,
+        transaction_cost=transaction_cost,
+        current_weights=current_weights,
+        linear_tilt=linear_tilt,
+        scenario_weights=scenario_weights,
+        factor_loadings=factor_loadings,
+    )
+
+    if time_limit is not None:
+        options = {**(options or {}), "time_limit": max(time_limit, 1e-3)}
+
+    start = time.perf_counter()
+    res = linprog(
+        lp.c,
+        A_ub=lp.A_ub,
+        b_ub=lp.b_ub,
+        A_eq=lp.A_eq,
+        b_eq=lp.b_eq,
+        bounds=lp.bounds,
+        method="highs",
+        options=options,
+    )
+    solve_time = time.perf_counter() - start
+
+    n_variables = lp.c.shape[0]
+    n_constraints = lp.A_ub.shape[0] + lp.A_eq.shape[0]
+    status = LINPROG_STATUS.get(res.status, "solver_error")
+    if status != "optimal" or res.x is None:
+        logger.warning(f"HiGHS did not solve the CVaR LP: {res.message}")
+        iterate = res.x[: lp.n_assets] if status == "user_limit" and res.x is not None else None
+        return LPSolution(
+            iterate,
+            np.nan,
+            status,
+            solve_time,
+            getattr(res, "nit", None),
+            n_variables,
+            n_constraints,
+        )
+
+    n_assets, n_scenarios = lp.n_assets, lp.n_scenarios
+    z = res.x[n_assets : n_assets + n_scenarios]
+    zeta = res.x[lp.zeta_index]
+    cvar = zeta + lp.c[n_assets : n_assets + n_scenarios] @ z
+
+    return LPSolution(
+        weights=res.x[:n_assets],
+        cvar=float(cvar),
+        status=status,
+        solve_time=solve_time,
+        iterations=getattr(res, "nit", None),
+        n_variables=n_variables,
+        n_constraints=n_constraints,
+    )
+
+
+def solve_cvar_cutting_plane(
+    R: np.ndarray,
+    b: np.ndarray,
+    alpha: float,
+    max_weight: float,
+    lasso_penalty: float = 0.0,
+    transaction_cost: float = 0.0,
+    current_weights: Optional[np.ndarray] = None,
+    linear_tilt: Optional[np.ndarray] = None,
+    scenario_weights: Optional[np.ndarray] = None,
+    factor_loadings: Optional[np.ndarray] = None,
+    tol: float = 1e-9,
+    max_iter: int = 500,
+    options: Optional[Dict[str, Any]] = None,
+    time_limit: Optional[float] = None,
+) -> LPSolution:
+    """
+    Solves the CVaR tracking problem with the cutting-plane method of Künzi-Bay and Mayer.
+
+    Instead of one auxiliary variable and two constraints per scenario, the expected
+    tail loss is represented by a single variable ``theta`` bounded below by aggregated
+    cuts ``theta >= sum_{t in K} p_t * (L_t(w) - zeta)``, one per scenario subset K.
+    Each round solves the small master LP and adds the cut of the scenarios in the tail
+    at the current solution, until no cut is violated by more than ``tol``.
+
+    Variables are ordered as ``[w (N), zeta, theta, buy (N), sell (N)]``; the buy and
+    sell blocks are only present when ``current_weights`` is given.
+
+    Args:
+        R, b, alpha, max_weight, lasso_penalty, transaction_cost, current_weights,
+        linear_tilt, scenario_weights, factor_loadings: See ``build_cvar_lp``.
+        tol: Maximum cut violation accepted at convergence.
+        max_iter: Maximum number of master LP solves.
+        options: Extra options passed to ``linprog`` for each master solve.
+        time_limit: Wall-clock budget in seconds over all rounds. Every master solution
+            is feasible, so the last one is returned with status 'user_limit'.
+
+    Returns:
+        LPSolution whose ``iterations`` is the number of master LP solves.
+    """
+    n_scenarios = R.shape[0]
+    n_assets = factor_loadings.shape[0] if factor_loadings is not None else R.shape[1]
+    has_turnover = current_weights is not None
+    n_trade = n_assets if has_turnover else 0
+    n_vars = n_assets + 2 + 2 * n_trade
+    zeta_idx, theta_idx = n_assets, n_assets + 1
+    probabilities = _scenario_probabilities(n_scenarios, scenario_weights)
+
+    # --- Master problem objective and fixed constraints ---
+    c_w = np.full(n_assets, lasso_penalty, dtype=float)
+    if linear_tilt is not None:
+        c_w -= linear_tilt
+    c = np.concatenate([c_w, [1.0, 1.0 / (1 - alpha)], np.full(2 * n_trade, transaction_cost)])
+
+    A_eq = np.zeros((1 + n_trade, n_vars))
+    A_eq[0, :n_assets] = 1.0
+    b_eq = np.ones(1 + n_trade)
+    if has_turnover:
+        idx = np.arange(n_assets)
+        A_eq[1 + idx, idx] = 1.0
+        A_eq[1 + idx, n_assets + 2 + idx] = -1.0
+        A_eq[1 + idx, n_assets + 2 + n_trade + idx] = 1.0
+        b_eq[1:] = current_weights
+    A_eq = sp.csr_matrix(A_eq)
+
+    bounds = (
+        [(0.0, max_weight)] * n_assets
+        + [(None, None), (0.0, None)]
+        + [(0.0, None)] * (2 * n_trade)
+    )
+
+    def make_cut(tail: np.ndarray) -> Tuple[np.ndarray, float]:
+        # sum_{t in K} p_t * (b_t - R_t w - zeta) - theta <= 0
+        p_tail = probabilities[tail]
+        row = np.zeros(n_vars)
+        row[:n_assets] = -(p_tail @ R[tail])
+        if factor_loadings is not None:
+            row[:n_assets] = factor_loadings @ row[:n_assets]
+        row[zeta_idx] = -p_tail.sum()
+        row[theta_idx] = -1.0
+        return row, -(p_tail @ b[tail])
+
+    # Start from the cut over all scenarios (CVaR is at least the mean loss)
+    cut_rows, cut_rhs = [], []
+    row, rhs = make_cut(np.ones(n_scenarios, dtype=bool))
+    cut_rows.append(row)
+    cut_rhs.append(rhs)
+
+    start = time.perf_counter()
+    w = None
+    for iteration in range(1, max_iter + 1):
+        if time_limit is not None and time.perf_counter() - start > time_limit and w is not None:
+            # Keep the last master solution, which is feasible
+            logger.warning(f"Cutting-plane solver hit time_limit={time_limit}s before converging.")
+            status = "user_limit"
+            iteration -= 1
+            break
+        res = linprog(
+            c,
+            A_ub=np.vstack(cut_rows),
+            b_ub=np.array(cut_rhs),
+            A_eq=A_eq,
+            b_eq=b_eq,
+            bounds=bounds,
+            method="highs",
+            options=options,
+        )
+        status = LINPROG_STATUS.get(res.status, "solver_error")
+        if status != "optimal" or res.x is None:
+            logger.warning(f"Cutting-plane master LP failed at round {iteration}: {res.message}")
+            return LPSolution(None, np.nan, status, time.perf_counter() - start, iteration)
+
+        w, zeta, theta = res.x[:n_assets], res.x[zeta_idx], res.x[theta_idx]
+        exposures = factor_loadings.T @ w if factor_loadings is not None else w
+        excess = (b - R @ exposures) - zeta
+        tail = excess > 0
+        expected_excess = probabilities[tail] @ excess[tail]
+        if expected_excess <= theta + tol:
+            break
+
+        row, rhs = make_cut(tail)
+        cut_rows.append(row)
+        cut_rhs.append(rhs)
+    else:
+        logger.warning(f"Cutting-plane solver hit max_iter={max_iter} before converging.")
+        status = "user_limit"
+
+    return LPSolution(
+        weights=w,
+        cvar=float(zeta + expected_excess / (1 - alpha)),
+        status=status,
+        solve_time=time.perf_counter() - start,
+        iterations=iteration,
+        n_variables=n_vars,
+        n_constraints=len(cut_rows) + A_eq.shape[0],
+    )
+
+
+def solve_cvar_column_generation(
+    R: np.ndarray,
+    b: np.ndarray,
+    alpha: float,
+    max_weight: float,
+    lasso_penalty: float = 0.0,
+    transaction_cost: float = 0.0,
+    current_weights: Optional[np.ndarray] = None,
+    linear_tilt: Optional[np.ndarray] = None,
+    scenario_weights: Optional[np.ndarray] = None,
+    factor_loadings: Optional[np.ndarray] = None,
+    initial_size: int = 100,
+    max_add: Optional[int] = None,
+    tol: float = 1e-9,
+    max_iter: int = 100,
+    options: Optional[Dict[str, Any]] = None,
+    time_limit: Optional[float] = None,
+) -> LPSolution:
+    """
+    Solves the CVaR tracking LP by column generation over the assets.
+
+    The restricted master is the full LP (``build_cvar_lp``) on a subset of the assets,
+    with the others held at zero weight. After each HiGHS solve, every excluded asset is
+    priced with the duals of the tail, budget and factor-exposure constraints:
+
+        d_j = c_j + R_j @ lambda_tail - lambda_budget - B_j @ lambda_factor +/- tc
+
+    where the turnover term is ``-tc`` if the asset is currently held (raising its
+    weight saves a sale) and ``+tc`` otherwise. Assets with ``d_j < -tol`` enter the
+    master. When none is left, the master's primal-dual pair satisfies the optimality
+    conditions of the full LP, so its optimum is that of the full solve.
+
+    The first master holds the ``initial_size`` assets with the lowest tracking error
+    to the benchmark (at least twice the ``1 / max_weight`` needed for feasibility).
+
+    Args:
+        R, b, alpha, max_weight, lasso_penalty, transaction_cost, current_weights,
+        linear_tilt, scenario_weights, factor_loadings: See ``build_cvar_lp``.
+        initial_size: Number of assets in the first master.
+        max_add: Most assets added per round, the most negative reduced costs first
+            (default: half the initial master).
+        tol: Reduced cost below which an excluded asset enters the master.
+        max_iter: Maximum number of master LP solves.
+        options: Extra options passed to ``linprog`` for each master solve.
+        time_limit: Wall-clock budget in seconds over all rounds. Every master solution
+            is feasible, so the last one is returned with status 'user_limit'.
+
+    Returns:
+        LPSolution whose ``iterations`` is the number of master LP solves and whose
+        sizes are those of the final master.
+    """
+    n_assets = factor_loadings.shape[0] if factor_loadings is not None else R.shape[1]
+    n_scenarios = R.shape[0]
+    start = time.perf_counter()
+
+    c_w = np.full(n_assets, lasso_penalty, dtype=float)
+    if linear_tilt is not None:
+        c_w = c_w - linear_tilt
+    held = current_weights > 0 if current_weights is not None else np.zeros(n_assets, bool)
+    if current_weights is not None:
+        c_w = c_w + np.where(held, -transaction_cost, transaction_cost)
+
+    # --- First master: the assets that track the benchmark best ---
+    asset_returns = R @ factor_loadings.T if factor_loadings is not None else R
+    n_initial = min(n_assets, max(initial_size, 2 * int(np.ceil(1 / max_weight))))
+    tracking = (asset_returns - b[:, None]).std(axis=0)
+    active = np.zeros(n_assets, dtype=bool)
+    active[np.argsort(tracking, kind="stable")[:n_initial]] = True
+    max_add = max_add or max(n_initial // 2, 1)
+
+    if time_limit is not None:
+        options = {**(options or {}), "time_limit": max(time_limit, 1e-3)}
+
+    weights, solution = None, None
+    for iteration in range(1, max_iter + 1):
+        out_of_time = time_limit is not None and time.perf_counter() - start > time_limit
+        if out_of_time and weights is not None:
+            # Keep the last master solution, which is feasible
+            logger.warning(f"Column generation hit time_limit={time_limit}s before converging.")
+            status = "user_limit"
+            iteration -= 1
+            break
+
+        columns = np.flatnonzero(active)
+        lp = build_cvar_lp(
+            R if factor_loadings is not None else R[:, columns],
+            b,
+            alpha,
+            max_weight,
+            lasso_penalty=lasso_penalty,
+            transaction_cost=transaction_cost,
+            current_weights=current_weights[columns] if current_weights is not None else None,
+            linear_tilt=linear_tilt[columns] if linear_tilt is not None else None,
+            scenario_weights=scenario_weights,
+            factor_loadings=factor_loadings[columns] if factor_loadings is not None else None,
+        )
+        res = linprog(
+            lp.c,
+            A_ub=lp.A_ub,
+            b_ub=lp.b_ub,
+            A_eq=lp.A_eq,
+            b_eq=lp.b_eq,
+            bounds=lp.bounds,
+            method="highs",
+            options=options,
+        )
+        status = LINPROG_STATUS.get(res.status, "solver_error")
+        if status != "optimal" or res.x is None:
+            logger.warning(f"Column-generation master failed at round {iteration}: {res.message}")
+            return LPSolution(None, np.nan, status, time.perf_counter() - start, iteration)
+
+        n_active = columns.shape[0]
+        weights = np.zeros(n_assets)
+        weights[columns] = res.x[:n_active]
+        z = res.x[n_active : n_active + n_scenarios]
+        cvar = float(res.x[lp.zeta_index] + lp.c[n_active : n_active + n_scenarios] @ z)
+        solution = (lp.c.shape[0], lp.A_ub.shape[0] + lp.A_eq.shape[0])
+
+        # --- Pricing: reduced costs of the excluded assets at the master's duals ---
+        excluded = np.flatnonzero(~active)
+        if excluded.size == 0:
+            break
+        tail_duals = res.ineqlin.marginals
+        budget_dual = res.eqlin.marginals[0]
+        reduced = c_w[excluded] - budget_dual
+        if factor_loadings is not None:
+            factor_duals = res.eqlin.marginals[-factor_loadings.shape[1] :]
+            reduced -= factor_loadings[excluded] @ factor_duals
+        else:
+            reduced += tail_duals @ R[:, excluded]
+        entering = excluded[reduced < -tol]
+        if entering.size == 0:
+            break
+        entering = entering[np.argsort(reduced[reduced < -tol], kind="stable")[:max_add]]
+        active[entering] = True
+        logger.debug(f"Column generation round {iteration}: {entering.size} assets enter.")
+    else:
+        logger.warning(f"Column generation hit max_iter={max_iter} before converging.")
+        status = "user_limit"
+
+    return LPSolution(
+        weights=weights,
+        cvar=cvar,
+        status=status,
+        solve_time=time.perf_counter() - start,
+        iterations=iteration,
+        n_variables=solution[0],
+        n_constraints=solution[1],
+    )
@@ -0,0 +1,132 @@
+"""
+Presolve for the CVaR optimizer.
+
+Shrinks a window before it reaches the solver without changing the optimal portfolio
+over the investable universe:
+
+- The L1 (LASSO) term is constant: on the long-only, fully invested set ``norm1(w)`` is
+  always 1, so the term only shifts the objective. The compiled CVXPY problem leaves it
+  out (it would otherwise add N epigraph variables); the LP backends keep it, as there
+  it is only a linear cost without any extra rows.
+- Assets without any data over the whole window (e.g. before their listing) are not
+  investable: they are removed and their weight is fixed at 0. They are found from the
+  missing-data mask, not from their values: ``fillna(0.0)`` turns them into zero
+  columns, but a zero-return column with data is a cash-like asset the optimizer may
+  legitimately hold. An asset that is currently held is always kept, so that presolve
+  never forces a sale.
+- Identical scenarios (e.g. market holidays, all zero after ``fillna``) are folded into
+  one scenario carrying their combined probability.
+
+The solution is re-expanded to the full universe with ``PresolvedCVaR.expand``.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PresolvedCVaR:
+    """A presolved CVaR window and the mapping back to the full universe."""
+
+    returns: np.ndarray
+    benchmark: np.ndarray
+    current_weights: Optional[np.ndarray]
+    linear_tilt: Optional[np.ndarray]
+    scenario_weights: Optional[np.ndarray]
+    active: np.ndarray
+    n_dropped_assets: int = 0
+    n_folded_scenarios: int = 0
+
+    @property
+    def is_reduced(self) -> bool:
+        """Whether presolve removed any asset or scenario."""
+        return self.n_dropped_assets > 0 or self.n_folded_scenarios > 0
+
+    def expand(self, weights: np.ndarray) -> np.ndarray:
+        """Maps weights of the active assets back to the full universe (zeros elsewhere)."""
+        full = np.zeros(self.active.shape[0])
+        full[self.active] = weights
+        return full
+
+    def restrict(self, weights: np.ndarray) -> np.ndarray:
+        """Maps full-universe weights to the active assets."""
+        return weights[self.active]
+
+
+def presolve_cvar(
+    R: np.ndarray,
+    b: np.ndarray,
+    max_weight: float,
+    current_weights: Optional[np.ndarray] = None,
+    linear_tilt: Optional[np.ndarray] = None,
+    scenario_weights: Optional[np.ndarray] = None,
+    missing_assets: Optional[np.ndarray] = None,
+) -> PresolvedCVaR:
+    """
+    Removes dead assets and duplicate scenarios from a CVaR window.
+
+    Args:
+        R: Asset returns (T x N), already cleaned of NaNs.
+        b: Benchmark returns (T,).
+        max_weight: Maximum weight per asset; assets are only dropped while the
+            remaining ones can still hold the full budget.
+        current_weights, linear_tilt: Per-asset vectors, restricted to the active assets.
+        scenario_weights: Scenario probabilities (T,); equally likely if None.
+        missing_assets: Boolean mask (N,) of the assets whose returns were all missing
+            before cleaning; no asset is dropped if None.
+
+    Returns:
+        PresolvedCVaR with the reduced data.
+    """
+    n_scenarios, n_assets = R.shape
+
+    # --- Dead assets: no data in the window and not currently held ---
+    active = np.ones(n_assets, dtype=bool)
+    if missing_assets is not None:
+        active = ~np.asarray(missing_assets, dtype=bool)
+        if current_weights is not None:
+            active |= np.asarray(current_weights) != 0
+    if active.sum() * max_weight < 1.0 - 1e-12:
+        # Dropping them would make the budget infeasible, so keep the universe as is
+        active = np.ones(n_assets, dtype=bool)
+    n_dropped = int(n_assets - active.sum())
+    if n_dropped:
+        R = R[:, active]
+        current_weights = current_weights[active] if current_weights is not None else None
+        linear_tilt = linear_tilt[active] if linear_tilt is not None else None
+
+    # --- Duplicate scenarios: fold identical (R_t, b_t) rows into scenario weights ---
+    _, first, inverse = np.unique(
+        np.column_stack([R, b]), axis=0, return_index=True, return_inverse=True
+    )
+    n_folded = n_scenarios - first.shape[0]
+    if n_folded:
+        probabilities = (
+            scenario_weights
+            if scenario_weights is not None
+            else np.full(n_scenarios, 1.0 / n_scenarios)
+        )
+        folded = np.bincount(inverse.reshape(-1), weights=probabilities, minlength=first.shape[0])
+        # Keep the surviving scenarios in their original (chronological) order
+        order = np.argsort(first)
+        keep = first[order]
+        R, b, scenario_weights = R[keep], b[keep], folded[order]
+
+    if n_dropped or n_folded:
+        logger.debug(f"Presolve dropped {n_dropped} dead assets and folded {n_folded} scenarios.")
+
+    return PresolvedCVaR(
+        returns=R,
+        benchmark=b,
+        current_weights=current_weights,
+        linear_tilt=linear_tilt,
+        scenario_weights=scenario_weights,
+        active=active,
+        n_dropped_assets=n_dropped,
+        n_folded_scenarios=n_folded,
+    )
@@ -0,0 +1,145 @@
+"""
+Content-addressed on-disk cache of CVaR optimization results.
+
+A solve is fully determined by its scenario data (returns window, benchmark, current
+weights, linear tilt, scenario probabilities) and the optimizer's settings, so the
+result is stored under a hash of exactly those inputs, salted with the versions of the
+code that produced it. Reruns of a backtest, report
+regeneration and parameter sweeps that revisit a window then skip the solver. Entries
+are single pickle files; once the store outgrows ``max_bytes``, the least recently used
+ones are evicted.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import cvxpy as cp
+import numpy as np
+import scipy
+
+logger = logging.getLogger(__name__)
+
+# Version of the cached problem formulation; bump it whenever the optimizer's model or
+# result format changes so that results solved by older code are no longer served
+CACHE_VERSION = 1
+
+# Default store, inside the project's data directory whatever the working directory
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "cache" / "optimization"
+
+
+class ResultCache:
+    """
+    Size-bounded store of optimization results keyed by a hash of the problem.
+    """
+
+    def __init__(
+        self, cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR, max_bytes: int = 256 * 2**20
+    ):
+        """
+        Initializes the result cache.
+
+        Args:
+            cache_dir: Directory holding one file per cached result; it is created by the
+                first ``put``.
+            max_bytes: Total size above which the least recently used entries are removed.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(settings: Dict[str, Any], **arrays: Optional[np.ndarray]) -> str:
+        """
+        Hashes the optimizer settings and the problem data into a cache key.
+
+        The key also covers ``CACHE_VERSION`` and the CVXPY and SciPy versions, so an
+        upgrade of the formulation or of a solver never serves a stale result.
+
+        Args:
+            settings: Optimizer parameters; their ``repr`` must identify them.
+            **arrays: Problem data; None is hashed distinctly from any array.
+
+        Returns:
+            Hex digest identifying the problem.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{CACHE_VERSION}:{cp.__version__}:{scipy.__version__}".encode())
+        digest.update(repr(sorted(settings.items())).encode())
+        for name in sorted(arrays):
+            value = arrays[name]
+            digest.update(name.encode())
+            if value is None:
+                digest.update(b"<none>")
+                continue
+            array = np.ascontiguousarray(value, dtype=np.float64)
+            digest.update(repr(array.shape).encode())
+            digest.update(array.tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value for ``key``, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        # Mark the entry as recently used for eviction
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Stores ``value`` under ``key`` and evicts old entries beyond ``max_bytes``."""
+        # Write to a temporary file first so that readers never see a partial entry
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        """Removes the least recently used entries until the store fits ``max_bytes``."""
+        entries = []
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
+        logger.debug(f"Evicted result cache entries down to {total} bytes.")
+
+    def clear(self) -> None:
+        """Removes every cached result."""
+        for path in self.cache_dir.glob("*.pkl"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,201 @@
+"""
+Scenario reduction for the CVaR optimizer.
+
+Shrinks a lookback window of T return scenarios to a fixed budget of weighted scenarios
+before the optimizer runs, so the per-rebalance LP has a few hundred rows instead of T.
+Three methods are available:
+
+- ``kmeans``: Lloyd's k-means on the joint (asset, benchmark) return vectors; each
+  centroid becomes a scenario with the share of the window in its cluster.
+- ``kmedoids``: the same clustering but with actual historical days as representatives.
+- ``importance``: keeps every tail scenario of a reference portfolio with its original
+  probability and samples the body uniformly, re-weighting the kept body scenarios.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REDUCTION_METHODS = ["kmeans", "kmedoids", "importance"]
+
+
+@dataclass
+class ReducedScenarios:
+    """A reduced, weighted scenario set."""
+
+    returns: np.ndarray
+    benchmark: np.ndarray
+    probabilities: np.ndarray
+
+
+class ScenarioReducer:
+    """
+    Reduces a (T x N) returns window to at most ``n_scenarios`` weighted scenarios.
+    """
+
+    def __init__(
+        self,
+        method: str = "importance",
+        n_scenarios: int = 250,
+        tail_fraction: float = 0.1,
+        max_iter: int = 50,
+        random_state: Optional[int] = 42,
+    ):
+        """
+        Initializes the scenario reducer.
+
+        Args:
+            method: 'kmeans', 'kmedoids' or 'importance'.
+            n_scenarios: Scenario budget of the reduced set.
+            tail_fraction: Share of the window kept as tail scenarios by 'importance'
+                (default 0.1, twice the tail of a 95% CVaR to leave room for the
+                optimized portfolio's tail to differ from the reference one).
+            max_iter: Maximum refinement iterations of the clustering methods.
+            random_state: Seed for the initialization and the body sampling.
+        """
+        if method not in REDUCTION_METHODS:
+            raise ValueError(f"Unknown reduction method '{method}'. Use one of {REDUCTION_METHODS}.")
+        self.method = method
+        self.n_scenarios = n_scenarios
+        self.tail_fraction = tail_fraction
+        self.max_iter = max_iter
+        self.random_state = random_state
+
+    def reduce(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        reference_weights: Optional[np.ndarray] = None,
+        probabilities: Optional[np.ndarray] = None,
+    ) -> ReducedScenarios:
+        """
+        Reduces a window of scenarios.
+
+        Args:
+            R: Asset returns (T x N).
+            b: Benchmark returns (T,).
+            reference_weights: Portfolio whose tracking losses define the tail for
+                'importance' (default: equal weights).
+            probabilities: Probabilities of the input scenarios (default: equally likely).
+
+        Returns:
+            ReducedScenarios whose probabilities sum to one.
+        """
+        n_scenarios = R.shape[0]
+        if probabilities is None:
+            probabilities = np.full(n_scenarios, 1.0 / n_scenarios)
+        if n_scenarios <= self.n_scenarios:
+            return ReducedScenarios(R, b, probabilities)
+
+        rng = np.random.default_rng(self.random_state)
+        if self.method == "importance":
+            reduced = self._importance(R, b, probabilities, reference_weights, rng)
+        else:
+            reduced = self._cluster(R, b, probabilities, rng, medoids=self.method == "kmedoids")
+
+        logger.debug(
+            f"Reduced {n_scenarios} scenarios to {len(reduced.probabilities)} with {self.method}."
+        )
+        return reduced
+
+    def _importance(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        probabilities: np.ndarray,
+        reference_weights: Optional[np.ndarray],
+        rng: np.random.Generator,
+    ) -> ReducedScenarios:
+        """Keeps every tail scenario and samples the body with re-weighting."""
+        n_scenarios, n_assets = R.shape
+        if reference_weights is None:
+            reference_weights = np.full(n_assets, 1.0 / n_assets)
+
+        losses = b - R @ reference_weights
+        n_tail = min(max(int(np.ceil(self.tail_fraction * n_scenarios)), 1), self.n_scenarios)
+        order = np.argsort(losses)
+        tail, body = order[-n_tail:], order[:-n_tail]
+
+        n_sampled = min(self.n_scenarios - n_tail, len(body))
+        sampled = rng.choice(body, size=n_sampled, replace=False) if n_sampled > 0 else body[:0]
+
+        # Tail days keep their probability; sampled body days carry the whole body's mass
+        body_mass = probabilities[body].sum()
+        sampled_mass = probabilities[sampled].sum()
+        reduced_probabilities = np.concatenate(
+            [
+                probabilities[tail],
+                probabilities[sampled] * (body_mass / sampled_mass if sampled_mass > 0 else 0.0),
+            ]
+        )
+        keep = np.concatenate([tail, sampled])
+        return ReducedScenarios(
+            R[keep], b[keep], reduced_probabilities / reduced_probabilities.sum()
+        )
+
+    def _cluster(
+        self,
+        R: np.ndarray,
+        b: np.ndarray,
+        probabilities: np.ndarray,
+        rng: np.random.Generator,
+        medoids: bool,
+    ) -> ReducedScenarios:
+        """Clusters the joint return vectors with k-means or k-medoids."""
+        X = np.column_stack([R, b])
+        n_scenarios = X.shape[0]
+        k = self.n_scenarios
+        sq_norms = np.einsum("ij,ij->i", X, X)
+
+        def sq_distances(centers: np.ndarray) -> np.ndarray:
+            # ||x - c||^2 for all pairs, via one matrix product
+            return np.maximum(
+                sq_norms[:, None] - 2 * X @ centers.T + np.einsum("ij,ij->i", centers, centers),
+                0.0,
+            )
+
+        # --- k-means++ seeding ---
+        centers_idx = [int(rng.integers(n_scenarios))]
+        closest = sq_distances(X[centers_idx])[:, 0]
+        for _ in range(1, k):
+            total = closest.sum()
+            if total <= 0:
+                candidates = np.setdiff1d(np.arange(n_scenarios), centers_idx)
+                centers_idx.append(int(rng.choice(candidates)))
+            else:
+                centers_idx.append(int(rng.choice(n_scenarios, p=closest / total)))
+            closest = np.minimum(closest, sq_distances(X[centers_idx[-1:]])[:, 0])
+        centers_idx_arr = np.array(centers_idx)
+        centers = X[centers_idx_arr]
+
+        labels = np.full(n_scenarios, -1)
+        for _ in range(self.max_iter):
+            new_labels = sq_distances(centers).argmin(axis=1)
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+            for j in range(k):
+                members = np.flatnonzero(labels == j)
+                if members.size == 0:
+                    continue
+                member_p = probabilities[members]
+                if medoids:
+                    # Medoid: the member with the smallest weighted distance to the others
+                    within = sq_distances(X[members])[members]
+                    centers_idx_arr[j] = members[(member_p @ np.sqrt(within)).argmin()]
+                    centers[j] = X[centers_idx_arr[j]]
+                else:
+                    centers[j] = member_p @ X[members] / member_p.sum()
+
+        mass = np.bincount(labels, weights=probabilities, minlength=k)
+        used = np.bincount(labels, minlength=k) > 0
+        centers = centers[used]
+        return ReducedScenarios(
+            returns=centers[:, :-1],
+            benchmark=centers[:, -1],
+            probabilities=mass[used] / mass.sum(),
+        )
@@ -0,0 +1,118 @@
+"""
+Analytic sensitivities of the optimal CVaR weights to the optimizer parameters.
+
+The CVaR tracking problem is a linear program, so around an optimal vertex its solution
+is determined by the active constraints alone:
+
+- assets at 0, at ``max_weight`` or, with a turnover penalty, at their current weight
+  are fixed by their bound;
+- the remaining (free) weights and the VaR ``zeta`` solve the budget constraint
+  ``sum(w) = 1`` and the tail constraints that hold with equality,
+  ``b_t - R_t @ w - zeta = 0``.
+
+Differentiating that square system gives the derivative of the weights exactly, from a
+single solve. This only holds at an exact vertex of the LP itself: a solution of an
+approximated window (reduced scenarios, factor model) or an approximate solver has no
+well-defined active set, and its derivatives are not computed.
+
+Only ``max_weight`` enters the constraints. Parameters that only enter the objective
+(``alpha`` through the tail weights ``p_t / (1 - alpha)``, ``lasso_penalty``,
+``transaction_cost``) move the weights in jumps, when a bump crosses a breakpoint and
+the active set changes, and have no derivative to report.
+"""
+
+import logging
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from .first_order import cvar_of_losses
+
+logger = logging.getLogger(__name__)
+
+# Parameters with a derivative at an optimal vertex
+SENSITIVITY_PARAMETERS = ["max_weight"]
+
+
+def weight_sensitivities(
+    R: np.ndarray,
+    b: np.ndarray,
+    weights: np.ndarray,
+    alpha: float,
+    max_weight: float,
+    current_weights: Optional[np.ndarray] = None,
+    transaction_cost: float = 0.0,
+    scenario_weights: Optional[np.ndarray] = None,
+    parameters: Sequence[str] = SENSITIVITY_PARAMETERS,
+    tol: float = 1e-6,
+) -> Dict[str, np.ndarray]:
+    """
+    Computes d(weights)/d(parameter) at an optimal vertex of the CVaR LP.
+
+    The weights must be an exact vertex solution of the problem given by ``R`` and ``b``;
+    see the module docstring.
+
+    Args:
+        R: Asset returns (T x N) of the solved window.
+        b: Benchmark returns (T,).
+        weights: Optimal weights (N,).
+        alpha, max_weight, current_weights, transaction_cost, scenario_weights: The
+            parameters the weights were solved with.
+        parameters: Parameters to differentiate, from ``SENSITIVITY_PARAMETERS``.
+        tol: Tolerance for a constraint to count as active.
+
+    Returns:
+        Dict mapping each parameter to the derivative of the weights (N,). At a
+        degenerate vertex, where the active set does not pin the solution down, the
+        least-squares derivative is returned.
+
+    Raises:
+        ValueError: If a parameter is not in ``SENSITIVITY_PARAMETERS``.
+    """
+    unknown = set(parameters) - set(SENSITIVITY_PARAMETERS)
+    if unknown:
+        raise ValueError(
+            f"Unsupported sensitivity parameters {sorted(unknown)}; "
+            f"use {SENSITIVITY_PARAMETERS}. Objective-only parameters are not differentiable."
+        )
+
+    sensitivities: Dict[str, np.ndarray] = {}
+    if "max_weight" not in parameters:
+        return sensitivities
+
+    n_assets = weights.shape[0]
+
+    # --- Active set of the optimal vertex ---
+    at_lower = weights <= tol
+    at_upper = weights >= max_weight - tol
+    at_current = np.zeros(n_assets, dtype=bool)
+    if current_weights is not None and transaction_cost > 0:
+        at_current = np.abs(weights - current_weights) <= tol
+    free = ~(at_lower | at_upper | at_current)
+
+    # Bumping max_weight moves the capped assets one for one; the others stay fixed
+    d_fixed = np.where(at_upper & ~at_lower, 1.0, 0.0)
+    d_weights = d_fixed.copy()
+
+    if free.any():
+        losses = b - R @ weights
+        _, zeta = cvar_of_losses(losses, alpha, scenario_weights)
+        scale = max(1.0, float(np.abs(losses).max()))
+        tail = np.abs(losses - zeta) <= tol * scale
+
+        # Unknowns [dw_free, dzeta]: budget row, then one row per active tail scenario
+        n_free = int(free.sum())
+        A = np.zeros((1 + int(tail.sum()), n_free + 1))
+        A[0, :n_free] = 1.0
+        A[1:, :n_free] = R[np.ix_(tail, free)]
+        A[1:, n_free] = 1.0
+        rhs = np.concatenate([[-d_fixed.sum()], -(R[tail] @ d_fixed)])
+        if A.shape[0] != A.shape[1]:
+            logger.debug(
+                f"Degenerate vertex: {A.shape[0]} active rows for {A.shape[1]} unknowns."
+            )
+        solution = np.linalg.lstsq(A, rhs, rcond=None)[0]
+        d_weights[free] = solution[:n_free]
+
+    sensitivities["max_weight"] = d_weights
+    return sensitivities
@@ -0,0 +1,130 @@
+"""
+Run the Daily Update of the Baseline CVaR Index
+
+This script extends the Task A outputs (CVaR index, daily returns and daily weights)
+with the days appended to the price data since the last run, instead of rerunning the
+full 2010-2024 backtest. It loads the end state persisted by the last run, solves a new
+rebalance only when one falls due and appends the new days to the outputs.
+"""
+
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+
+# Add project root to Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, project_root)
+
+from src.backtesting.checkpoint import load_checkpoint, save_checkpoint  # noqa: E402
+from src.data.processor import DataProcessor  # noqa: E402
+from src.run_full_backtest import (  # noqa: E402
+    LOOKBACK_WINDOW,
+    RESULTS_DIR,
+    STATE_PATH,
+    build_rolling_optimizer,
+)
+
+# --- Configuration ---
+LOG_LEVEL = logging.INFO
+PRICE_DATA_PATH = RESULTS_DIR / "sp500_prices_2010_2024.csv"
+BENCHMARK_TICKER = "SPY"
+INDEX_PATH = RESULTS_DIR / "task_a_baseline_cvar_index.csv"
+RETURNS_PATH = RESULTS_DIR / "task_a_baseline_daily_returns.csv"
+WEIGHTS_PATH = RESULTS_DIR / "task_a_baseline_daily_weights.csv"
+
+# --- Setup ---
+logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def write_rows(path: Path, rows: Union[pd.Series, pd.DataFrame]) -> None:
+    """
+    Appends ``rows`` to a CSV output, restating any rows from their first date on.
+
+    Args:
+        path: Existing output with a date index.
+        rows: New rows; a Series fills the output's single column.
+    """
+    existing = pd.read_csv(path, index_col=0, parse_dates=True)
+    if isinstance(rows, pd.Series):
+        rows = rows.to_frame(name=existing.columns[0])
+    rows = rows.reindex(columns=existing.columns).fillna(0.0)
+    if existing.index[-1] < rows.index[0]:
+        rows.to_csv(path, mode="a", header=False)
+    else:
+        pd.concat([existing[existing.index < rows.index[0]], rows]).to_csv(path)
+
+
+def load_returns(last_rebalance: pd.Timestamp) -> pd.DataFrame:
+    """
+    Loads the cleaned daily returns from the last lookback window before a rebalance on.
+
+    Returns are computed and forward-filled on the full stored price history before the
+    window is cut, so that prices missing around the window's start are filled exactly
+    as in the full backtest.
+
+    Args:
+        last_rebalance: Date of the last rebalance of the persisted state.
+
+    Returns:
+        Returns of every ticker, including the benchmark, from ``LOOKBACK_WINDOW`` days
+        before ``last_rebalance`` to the newest day.
+    """
+    price_data = pd.read_csv(PRICE_DATA_PATH, index_col=0, parse_dates=True)
+    processor = DataProcessor()
+    cleaned_returns = processor.clean_data(processor.calculate_returns(price_data))
+    start = cleaned_returns.index.searchsorted(last_rebalance) - LOOKBACK_WINDOW
+    return cleaned_returns.iloc[max(start, 0) :]
+
+
+def main():
+    """Main function to run the daily update of the baseline CVaR index."""
+    logging.info("--- Starting Daily Update of the Baseline CVaR Index ---")
+
+    checkpoint = load_checkpoint(STATE_PATH)
+    if checkpoint is None:
+        logging.error(f"No backtest state at {STATE_PATH}. Run the full backtest first.")
+        return
+    state = checkpoint["state"]
+
+    # Only the last lookback window before the last rebalance is needed
+    cleaned_returns = load_returns(state.last_rebalance)
+    if cleaned_returns.index[-1] <= state.last_date:
+        logging.info(f"Outputs are up to date through {state.last_date.date()}.")
+        return
+
+    asset_returns = cleaned_returns.drop(columns=[BENCHMARK_TICKER])
+    benchmark_returns = cleaned_returns[BENCHMARK_TICKER]
+
+    rolling_optimizer = build_rolling_optimizer()
+    rebalances, portfolio_returns, daily_weights = rolling_optimizer.update(
+        asset_returns, benchmark_returns, state
+    )
+    for _, rebalance in rebalances.iterrows():
+        logging.info(f"Rebalanced on {rebalance['date'].date()} ({rebalance['status']}).")
+    if portfolio_returns.empty:
+        logging.info(f"No new trading days after {state.last_date.date()}.")
+        return
+
+    # --- Append to the outputs ---
+    first = portfolio_returns.index[0]
+    index_level = pd.read_csv(INDEX_PATH, index_col=0, parse_dates=True).iloc[:, 0]
+    previous_level = index_level[index_level.index < first].iloc[-1]
+    new_levels = previous_level * (1 + portfolio_returns.fillna(0)).cumprod()
+
+    write_rows(RETURNS_PATH, portfolio_returns)
+    write_rows(INDEX_PATH, new_levels)
+    write_rows(WEIGHTS_PATH, daily_weights)
+    save_checkpoint(STATE_PATH, {"state": rolling_optimizer.state})
+
+    logging.info(
+        f"Appended {len(portfolio_returns)} days through {portfolio_returns.index[-1].date()}; "
+        f"index level {new_levels.iloc[-1]:.2f}."
+    )
+
+
+if __name__ == "__main__":
+    main()
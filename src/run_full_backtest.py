@@ -11,10 +11,12 @@ from dotenv import load_dotenv
 # Adjust path to import from src
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.backtesting.checkpoint import save_checkpoint
 from src.backtesting.metrics import calculate_raw_metrics, format_metrics_for_display
 from src.data.loader import FmpDataLoader
 from src.data.processor import DataProcessor
 from src.optimization.cvar_optimizer import CVaROptimizer, RollingCVaROptimizer
+from src.optimization.result_cache import ResultCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -24,10 +26,44 @@ load_dotenv()
 
 # Define the results directory at the module level so it can be patched for testing
 RESULTS_DIR = Path(__file__).resolve().parent.parent / "results"
+# Loop state of the rolling backtest, for restarting an interrupted run with --resume
+CHECKPOINT_DIR = Path(__file__).resolve().parent.parent / "data" / "cache" / "checkpoints"
+CHECKPOINT_PATH = CHECKPOINT_DIR / "task_a_baseline.ckpt"
+# End state of the backtest, from which the daily update extends the outputs
+STATE_PATH = CHECKPOINT_DIR / "task_a_baseline_state.ckpt"
+
+# --- Optimizer Settings ---
+CVAR_ALPHA = 0.95
+# Per-side transaction cost. The optimizer's turnover calculation already accounts for buys and sells.
+TRANSACTION_COST = 0.0050  # 50 bps per side, further increased to reduce turnover
+MAX_WEIGHT = 0.05
+LOOKBACK_WINDOW = 252  # 1 year
+
+
+def build_rolling_optimizer() -> RollingCVaROptimizer:
+    """Builds the baseline rolling optimizer, shared by the full run and the daily update."""
+    cvar_optimizer = CVaROptimizer(
+        alpha=CVAR_ALPHA,
+        lasso_penalty=1.5,  # As per CLEIR paper - promotes sparsity
+        transaction_cost=TRANSACTION_COST,
+        max_weight=MAX_WEIGHT,
+        solver="SCS",
+        result_cache=ResultCache(),  # Reruns skip windows already solved
+    )
+    return RollingCVaROptimizer(
+        optimizer=cvar_optimizer,
+        lookback_window=LOOKBACK_WINDOW,
+        rebalance_frequency="Q",  # Quarterly
+    )
+
 
+async def main(resume: bool = False):
+    """
+    Main function to run the full backtest.
 
-async def main():
-    """Main function to run the full backtest."""
+    Args:
+        resume: Restart the rolling backtest from its last checkpoint.
+    """
     logging.info("--- Starting Full Backtest Script ---")
     # --- Parameters ---
     FMP_API_KEY = os.getenv("FMP_API_KEY")
@@ -157,22 +193,7 @@ async def main():
     logging.info("Data loaded and processed successfully.")
 
     # --- Run Rolling Backtest ---
-    CVAR_ALPHA = 0.95
-    # Per-side transaction cost. The optimizer's turnover calculation already accounts for buys and sells.
-    TRANSACTION_COST = 0.0050  # 50 bps per side, further increased to reduce turnover
-    MAX_WEIGHT = 0.05
-    cvar_optimizer = CVaROptimizer(
-        alpha=CVAR_ALPHA,
-        lasso_penalty=1.5,  # As per CLEIR paper - promotes sparsity
-        transaction_cost=TRANSACTION_COST,
-        max_weight=MAX_WEIGHT,
-        solver="SCS",
-    )
-    rolling_optimizer = RollingCVaROptimizer(
-        optimizer=cvar_optimizer,
-        lookback_window=252,  # 1 year
-        rebalance_frequency="Q",  # Quarterly
-    )
+    rolling_optimizer = build_rolling_optimizer()
 
     logging.info("Starting rolling backtest over the full 2010-2024 period to ensure adequate warm-up...")
     # The RollingCVaROptimizer's backtest method handles the rolling logic.
@@ -181,9 +202,13 @@ async def main():
         benchmark_returns=benchmark_returns,
         start_date=START_DATE,
         end_date=END_DATE,
+        checkpoint_path=str(CHECKPOINT_PATH),
+        resume_from=str(CHECKPOINT_PATH) if resume else None,
     )
 
     logging.info("Full historical backtest completed.")
+    if rolling_optimizer.state is not None:
+        save_checkpoint(STATE_PATH, {"state": rolling_optimizer.state})
 
     # Preserve full-period results before slicing for evaluation
     full_period_portfolio_returns = portfolio_returns.copy()
@@ -364,8 +389,12 @@ async def main():
     # Ensure benchmark returns are aligned with portfolio returns for metric calculation
     # Use the net-of-cost equal-weighted benchmark for a fair comparison
     aligned_benchmark = net_ew_daily_returns.reindex(portfolio_returns.index).ffill()
+    # The daily weights drift between rebalances; turnover counts only the rebalance trades
     raw_metrics = calculate_raw_metrics(
-        portfolio_returns, aligned_benchmark, daily_weights=full_period_weights
+        portfolio_returns,
+        aligned_benchmark,
+        daily_weights=daily_weights,
+        rebalance_turnover=rolling_optimizer.accounting.turnover.loc[EVALUATION_START_DATE:],
     )
     display_metrics = format_metrics_for_display(raw_metrics, portfolio_returns)
 
@@ -384,6 +413,11 @@ async def main():
             )
         rebalance_results_to_save.to_csv(weights_path)
 
+        # Save per-rebalance solver telemetry next to the rebalance weights
+        telemetry_path = RESULTS_DIR / "task_a_baseline_cvar_solver_telemetry_2010-2024.csv"
+        rolling_optimizer.telemetry.to_csv(telemetry_path)
+        logging.info(f"Saved solver telemetry to {telemetry_path}")
+
         # Save performance metrics for the evaluation period
         eval_metrics_path = RESULTS_DIR / "task_b_baseline_cvar_performance_2020-2024.csv"
         logging.info(f"Attempting to save evaluation metrics to {eval_metrics_path}...")
@@ -463,4 +497,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(resume="--resume" in sys.argv))
@@ -10,6 +10,7 @@ This script runs a backtest of a hybrid strategy that combines:
 import logging
 import os
 import sys
+from dataclasses import replace
 
 import numpy as np
 import pandas as pd
@@ -21,10 +22,13 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, project_root)
 
 from src.alpha.ml_model import MLAlphaModel  # noqa: E402
+from src.backtesting.accounting import drift_accounting  # noqa: E402
+from src.backtesting.checkpoint import fingerprint, load_checkpoint, save_checkpoint  # noqa: E402
 from src.backtesting.metrics import calculate_raw_metrics, format_metrics_for_display  # noqa: E402
 from src.data.loader import FmpDataLoader, GoogleTrendsLoader  # noqa: E402
 from src.data.processor import DataProcessor  # noqa: E402
 from src.optimization.cvar_optimizer import AlphaAwareCVaROptimizer  # noqa: E402
+from src.optimization.result_cache import ResultCache  # noqa: E402
 from src.regime.ensemble_regime import EnsembleRegimeDetector  # noqa: E402
 
 # --- Configuration ---
@@ -35,6 +39,9 @@ BENCHMARK_TICKER = "SPY"
 START_DATE = "2010-01-01"
 END_DATE = "2024-12-31"
 EVALUATION_START_DATE = "2020-01-01"
+# Loop state of the backtest, for restarting an interrupted run with --resume
+CHECKPOINT_DIR = os.path.join(project_root, "data", "cache", "checkpoints")
+CHECKPOINT_PATH = os.path.join(CHECKPOINT_DIR, "task_c_hybrid.ckpt")
 FMP_API_KEY = os.getenv("FMP_API_KEY")
 
 # --- Setup ---
@@ -78,8 +85,13 @@ def get_hybrid_prediction_features(current_date, returns_data, raw_fmp_signals,
     return X_pred
 
 
-def main():
-    """Main function to run the hybrid model backtest."""
+def main(resume: bool = False):
+    """
+    Main function to run the hybrid model backtest.
+
+    Args:
+        resume: Restart the backtest loop from its last checkpoint.
+    """
     logging.info("--- Starting Hybrid Regime-Aware Alpha Model Backtest ---")
 
     # --- 1. Load All Data Sources for Full Period ---
@@ -106,7 +118,9 @@ def main():
     spy_prices = price_data[BENCHMARK_TICKER]
     regime_probs = regime_detector.detect_regime(spy_prices)
     ml_alpha_model = MLAlphaModel()
-    optimizer = AlphaAwareCVaROptimizer(transaction_cost=0.001, solver="SCS")
+    optimizer = AlphaAwareCVaROptimizer(
+        transaction_cost=0.001, solver="SCS", result_cache=ResultCache()
+    )
 
     # --- 3. Run Rolling Backtest on Full History ---
     logging.info("Running rolling backtest on full 2010-2024 period...")
@@ -116,13 +130,38 @@ def main():
     all_weights = {}
     current_weights = pd.Series(1 / len(universe), index=universe)
 
+    def run_fingerprint(through: pd.Timestamp) -> str:
+        """Hashes the settings and the inputs up to ``through`` for the checkpoint."""
+        return fingerprint(
+            {**optimizer._cache_settings(optimizer.params), "lookback": 252},
+            asset_returns_full.loc[:through],
+            benchmark_returns_full.loc[:through],
+            regime_probs.loc[:through],
+        )
+
+    # The model and the random features depend on the global RNG, so it is restored too
+    state = load_checkpoint(CHECKPOINT_PATH) if resume else None
+    if state is not None:
+        if run_fingerprint(state["last_date"]) != state["fingerprint"]:
+            raise ValueError(
+                f"Checkpoint {CHECKPOINT_PATH} does not match the settings or the data of this "
+                "backtest; delete it to start afresh."
+            )
+        all_weights = state["all_weights"]
+        current_weights = state["current_weights"]
+        ml_alpha_model = state["ml_model"]
+        optimizer._last_weights = state["last_weights"]
+        np.random.set_state(state["rng_state"])
+        rebalance_dates = rebalance_dates[rebalance_dates > state["last_date"]]
+        logging.info(f"Resuming from checkpoint after {state['last_date'].date()}.")
+
     for date in tqdm(rebalance_dates, desc="Running Hybrid Backtest"):
         hist_returns = asset_returns_full.loc[:date].tail(252)
         if hist_returns.shape[0] < 252:
             continue
 
         risk_off_prob = regime_probs.loc[date, "risk_off_probability"]
-        optimizer.set_params(alpha=0.99 if risk_off_prob > 0.5 else 0.95, lasso_penalty=0.05 if risk_off_prob > 0.5 else 0.01, max_weight=0.03 if risk_off_prob > 0.5 else 0.07)
+        params = replace(optimizer.params, alpha=0.99 if risk_off_prob > 0.5 else 0.95, lasso_penalty=0.05 if risk_off_prob > 0.5 else 0.01, max_weight=0.03 if risk_off_prob > 0.5 else 0.07)
 
         X_train, y_train = build_hybrid_feature_set(date, hist_returns, raw_fmp_signals, trends_data, 252, 63)
         ml_alpha_model.train_model(X_train, y_train)
@@ -131,40 +170,54 @@ def main():
         alpha_scores = ml_alpha_model.predict_alpha(X_pred)
 
         try:
-            opt_result = optimizer.optimize(returns=hist_returns, alpha_scores=alpha_scores, benchmark_returns=benchmark_returns_full.loc[hist_returns.index], current_weights=current_weights.values)
+            opt_result = optimizer.optimize(returns=hist_returns, alpha_scores=alpha_scores, benchmark_returns=benchmark_returns_full.loc[hist_returns.index], current_weights=current_weights.values, params=params)
             if opt_result and opt_result.status in ["optimal", "optimal_inaccurate"]:
                 current_weights = pd.Series(opt_result.weights, index=hist_returns.columns)
         except Exception as e:
             logging.error(f"Optimization failed on {date}: {e}. Holding weights.")
 
         all_weights[date] = current_weights
+        save_checkpoint(
+            CHECKPOINT_PATH,
+            {
+                "last_date": date,
+                "fingerprint": run_fingerprint(date),
+                "all_weights": all_weights,
+                "current_weights": current_weights,
+                "ml_model": ml_alpha_model,
+                "last_weights": optimizer._last_weights,
+                "rng_state": np.random.get_state(),
+            },
+        )
 
     # --- 4. Slice to Evaluation Period and Calculate Metrics ---
     logging.info("Slicing results to evaluation period and calculating performance...")
-    weights_df_full = pd.DataFrame(all_weights).T.reindex(asset_returns_full.index, method="ffill").dropna()
-    daily_returns_raw_full = (weights_df_full * asset_returns_full).sum(axis=1)
+    # Positions drift with their returns between rebalances; costs are charged on the
+    # trades from the drifted holdings on each rebalance date
+    targets = pd.DataFrame(all_weights).T
+    accounting = drift_accounting(asset_returns_full, targets, optimizer.transaction_cost)
+    # Save and score the drifted holdings, as the baseline does, not the ffilled targets
+    weights_df_full = accounting.weights
 
     weights_df = weights_df_full.loc[EVALUATION_START_DATE:]
     asset_returns = asset_returns_full.loc[EVALUATION_START_DATE:]
     benchmark_returns = benchmark_returns_full.loc[EVALUATION_START_DATE:]
-    daily_returns_raw = daily_returns_raw_full.loc[EVALUATION_START_DATE:]
 
     weights_df, asset_returns = weights_df.align(asset_returns, join='inner', axis=0)
-    daily_returns_raw = daily_returns_raw.reindex(asset_returns.index)
     benchmark_returns = benchmark_returns.reindex(asset_returns.index)
-
-    drifted_weights = weights_df.shift(1) * (1 + asset_returns.shift(1))
-    drifted_weights = drifted_weights.div(drifted_weights.sum(axis=1), axis=0).fillna(0)
-    turnover = (weights_df - drifted_weights).abs().sum(axis=1)
-    transaction_costs = turnover * 0.001
-    daily_returns_net = (daily_returns_raw - transaction_costs).dropna()
+    daily_returns_net = accounting.net_returns.reindex(asset_returns.index).dropna()
     daily_returns_net.name = "Hybrid_Model"
 
     if daily_returns_net.empty:
         logging.error("Backtest generated no returns for the evaluation period. Exiting.")
         return
 
-    raw_metrics = calculate_raw_metrics(daily_returns_net, benchmark_returns, daily_weights=weights_df)
+    raw_metrics = calculate_raw_metrics(
+        daily_returns_net,
+        benchmark_returns,
+        daily_weights=weights_df,
+        rebalance_turnover=accounting.turnover.loc[EVALUATION_START_DATE:],
+    )
     display_metrics = format_metrics_for_display(raw_metrics, daily_returns_net)
 
     metrics_path = os.path.join(RESULTS_DIR, "task_c_hybrid_model_performance.csv")
@@ -176,10 +229,13 @@ def main():
     daily_returns_net.to_csv(returns_path, header=True)
 
     logging.info(f"Results saved to {RESULTS_DIR}")
+    # The run is complete; a later --resume must start afresh rather than skip every date
+    if os.path.exists(CHECKPOINT_PATH):
+        os.remove(CHECKPOINT_PATH)
     logging.info("--- Hybrid Backtest Complete ---")
     print("\n--- Hybrid Model Performance Metrics (2020-2024) ---")
     print(display_metrics)
 
 
 if __name__ == "__main__":
-    main()
+    main(resume="--resume" in sys.argv)
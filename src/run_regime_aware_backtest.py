@@ -17,9 +17,12 @@ from dotenv import load_dotenv
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, project_root)
 
+from src.backtesting.accounting import drift_accounting  # noqa: E402
+from src.backtesting.checkpoint import fingerprint, load_checkpoint, save_checkpoint  # noqa: E402
 from src.backtesting.metrics import calculate_raw_metrics, format_metrics_for_display  # noqa: E402
 from src.data.processor import DataProcessor  # noqa: E402
 from src.optimization.cvar_optimizer import CVaROptimizer, RegimeAwareCVaROptimizer  # noqa: E402
+from src.optimization.result_cache import ResultCache  # noqa: E402
 from src.regime.ensemble_regime import EnsembleRegimeDetector  # noqa: E402
 
 # --- Configuration ---
@@ -30,6 +33,9 @@ BENCHMARK_TICKER = "SPY"
 START_DATE = "2010-01-01"
 END_DATE = "2024-12-31"
 EVALUATION_START_DATE = "2020-01-01"
+# Loop state of the backtest, for restarting an interrupted run with --resume
+CHECKPOINT_DIR = os.path.join(project_root, "data", "cache", "checkpoints")
+CHECKPOINT_PATH = os.path.join(CHECKPOINT_DIR, "task_b_regime_aware.ckpt")
 
 # Regime-Aware Optimizer Settings
 RISK_ON_PARAMS = {
@@ -52,8 +58,13 @@ load_dotenv()
 
 
 
-def main():
-    """Main function to run the regime-aware backtest."""
+def main(resume: bool = False):
+    """
+    Main function to run the regime-aware backtest.
+
+    Args:
+        resume: Restart the backtest loop from its last checkpoint.
+    """
     logging.info("--- Starting Regime-Aware CVaR Backtest ---")
 
     # --- Load Data ---
@@ -82,7 +93,11 @@ def main():
     # --- Run Regime-Aware Backtest on Full History for Warm-up ---
     logging.info("Setting up and running regime-aware backtest on full 2010-2024 period...")
     optimizer = RegimeAwareCVaROptimizer(
-        risk_on_params=RISK_ON_PARAMS, risk_off_params=RISK_OFF_PARAMS, transaction_cost=0.001, solver="SCS"
+        risk_on_params=RISK_ON_PARAMS,
+        risk_off_params=RISK_OFF_PARAMS,
+        transaction_cost=0.001,
+        solver="SCS",
+        result_cache=ResultCache(),  # Reruns skip windows already solved
     )
     lookback = 252
     rebalance_dates = pd.date_range(start=START_DATE, end=END_DATE, freq="BQ").to_series()
@@ -92,6 +107,36 @@ def main():
     rebalance_results_list = []
     current_weights = pd.Series(1 / len(tickers), index=tickers)
 
+    def run_fingerprint(through: pd.Timestamp) -> str:
+        """Hashes the settings and the inputs up to ``through`` for the checkpoint."""
+        settings = {
+            **optimizer._cache_settings(optimizer.params),
+            "risk_on_params": sorted(RISK_ON_PARAMS.items()),
+            "risk_off_params": sorted(RISK_OFF_PARAMS.items()),
+            "smoothing_window": smoothing_window,
+            "lookback": lookback,
+        }
+        return fingerprint(
+            settings,
+            asset_returns_full.loc[:through],
+            benchmark_returns_full.loc[:through],
+            regime_probs.loc[:through],
+        )
+
+    state = load_checkpoint(CHECKPOINT_PATH) if resume else None
+    if state is not None:
+        if run_fingerprint(state["last_date"]) != state["fingerprint"]:
+            raise ValueError(
+                f"Checkpoint {CHECKPOINT_PATH} does not match the settings or the data of this "
+                "backtest; delete it to start afresh."
+            )
+        all_weights = state["all_weights"]
+        rebalance_results_list = state["rebalance_results"]
+        current_weights = state["current_weights"]
+        optimizer._last_weights = state["last_weights"]
+        rebalance_dates = rebalance_dates[rebalance_dates > state["last_date"]]
+        logging.info(f"Resuming from checkpoint after {state['last_date'].date()}.")
+
     for date in rebalance_dates:
         start_window = date - pd.DateOffset(days=lookback)
         hist_returns = asset_returns_full.loc[start_window:date]
@@ -108,36 +153,48 @@ def main():
         except Exception as e:
             logging.error(f"Optimization failed on {date}: {e}. Holding weights.")
         all_weights[date] = current_weights
+        save_checkpoint(
+            CHECKPOINT_PATH,
+            {
+                "last_date": date,
+                "fingerprint": run_fingerprint(date),
+                "all_weights": all_weights,
+                "rebalance_results": rebalance_results_list,
+                "current_weights": current_weights,
+                "last_weights": optimizer._last_weights,
+            },
+        )
 
     if not rebalance_results_list:
         logging.error("Backtest failed to produce any rebalance results. Exiting.")
         return
 
-    weights_df_full = pd.DataFrame(all_weights).T.reindex(asset_returns_full.index, method="ffill").dropna()
-    daily_returns_raw_full = (weights_df_full * asset_returns_full).sum(axis=1)
+    # Positions drift with their returns between rebalances; costs are charged on the
+    # trades from the drifted holdings on each rebalance date
+    targets = pd.DataFrame(all_weights).T
+    accounting = drift_accounting(asset_returns_full, targets, optimizer.transaction_cost)
+    # Save and score the drifted holdings, as the baseline does, not the ffilled targets
+    weights_df_full = accounting.weights
 
-    # --- Slice to Evaluation Period and Apply Costs ---
+    # --- Slice to Evaluation Period ---
     logging.info(f"Slicing results to evaluation period: {EVALUATION_START_DATE} - {END_DATE}")
     weights_df = weights_df_full.loc[EVALUATION_START_DATE:]
     asset_returns = asset_returns_full.loc[EVALUATION_START_DATE:]
     benchmark_returns = benchmark_returns_full.loc[EVALUATION_START_DATE:]
-    daily_returns_raw = daily_returns_raw_full.loc[EVALUATION_START_DATE:]
 
     weights_df, asset_returns = weights_df.align(asset_returns, join='inner', axis=0)
-    daily_returns_raw = daily_returns_raw.reindex(asset_returns.index)
     benchmark_returns = benchmark_returns.reindex(asset_returns.index)
-
-    logging.info("Applying transaction costs for the evaluation period...")
-    drifted_weights = weights_df.shift(1) * (1 + asset_returns.shift(1))
-    drifted_weights = drifted_weights.div(drifted_weights.sum(axis=1), axis=0).fillna(0)
-    turnover = (weights_df - drifted_weights).abs().sum(axis=1)
-    transaction_costs = turnover * 0.001
-    daily_returns_net = (daily_returns_raw - transaction_costs).dropna()
+    daily_returns_net = accounting.net_returns.reindex(asset_returns.index).dropna()
     daily_returns_net.name = "Regime_Aware_CVaR"
 
     # --- Calculate and Save Metrics for Evaluation Period ---
     logging.info("Calculating final performance metrics for the evaluation period...")
-    raw_metrics = calculate_raw_metrics(daily_returns_net, benchmark_returns, daily_weights=weights_df)
+    raw_metrics = calculate_raw_metrics(
+        daily_returns_net,
+        benchmark_returns,
+        daily_weights=weights_df,
+        rebalance_turnover=accounting.turnover.loc[EVALUATION_START_DATE:],
+    )
     
     metrics_path = os.path.join(RESULTS_DIR, "task_b_regime_aware_cvar_performance.csv")
     raw_metrics.to_csv(metrics_path, header=True)
@@ -155,10 +212,13 @@ def main():
     regime_probs.loc[EVALUATION_START_DATE:].to_csv(regime_probs_path)
     logging.info(f"Saved regime probabilities for evaluation period to {regime_probs_path}")
 
+    # The run is complete; a later --resume must start afresh rather than skip every date
+    if os.path.exists(CHECKPOINT_PATH):
+        os.remove(CHECKPOINT_PATH)
     logging.info("--- Backtest Complete ---")
     print("\n--- Regime-Aware Performance Metrics (2020-2024) ---")
     print(format_metrics_for_display(raw_metrics, daily_returns_net))
 
 
 if __name__ == "__main__":
-    main()
+    main(resume="--resume" in sys.argv)
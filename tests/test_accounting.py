@@ -0,0 +1,65 @@
+"""
+Tests for the holdings-based drift accounting of rebalanced portfolios.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting.accounting import drift_accounting
+from src.backtesting.metrics import calculate_annual_turnover
+
+
+def test_drift_accounting_matches_day_by_day_holdings():
+    """The vectorized pass matches a book grown position by position, with cash and gaps."""
+    rng = np.random.default_rng(5)
+    dates = pd.bdate_range("2021-01-01", periods=60)
+    returns = pd.DataFrame(rng.normal(0, 0.02, (60, 4)), index=dates, columns=list("ABCD"))
+    returns.iloc[7, 1] = np.nan
+    targets = pd.DataFrame(
+        [[0.4, 0.3, 0.3], [0.2, 0.5, 0.2], [0.5, 0.0, 0.5]],
+        index=dates[[3, 20, 41]],
+        columns=["A", "B", "D"],
+    )
+
+    accounting = drift_accounting(returns, targets, transaction_cost=0.01)
+
+    values, cash = np.zeros(4), 1.0
+    turnover = []
+    for date, day_returns in returns.loc[dates[3] :].iterrows():
+        wealth = values.sum() + cash
+        if date in targets.index:
+            target = targets.loc[date].reindex(returns.columns).fillna(0.0).to_numpy()
+            turnover.append(np.abs(target - values / wealth).sum())
+            values, cash = target * wealth, (1 - target.sum()) * wealth
+        weights = values / (values.sum() + cash)
+        growth = day_returns.fillna(0.0).to_numpy()
+        gross = weights @ growth
+
+        assert accounting.weights.loc[date].to_numpy() == pytest.approx(weights, abs=1e-12)
+        assert accounting.gross_returns.loc[date] == pytest.approx(gross, abs=1e-12)
+        values = values * (1 + growth)
+
+    assert accounting.weights.index[0] == dates[3]
+    assert accounting.turnover.to_numpy() == pytest.approx(turnover, abs=1e-12)
+    assert turnover[0] == pytest.approx(1.0)
+    costs = accounting.gross_returns - accounting.net_returns
+    assert costs.loc[targets.index].to_numpy() == pytest.approx(0.01 * np.array(turnover))
+    assert costs.drop(targets.index).abs().max() == 0.0
+
+
+def test_annual_turnover_counts_rebalance_trades_not_drift():
+    """Drifted weights change daily, but only the rebalance trades are turnover."""
+    rng = np.random.default_rng(11)
+    dates = pd.bdate_range("2021-01-01", periods=252)
+    returns = pd.DataFrame(rng.normal(0, 0.02, (252, 3)), index=dates, columns=list("ABC"))
+    targets = pd.DataFrame(
+        [[0.5, 0.3, 0.2], [0.2, 0.3, 0.5]], index=dates[[0, 126]], columns=list("ABC")
+    )
+
+    accounting = drift_accounting(returns, targets, initial_weights=np.array([0.5, 0.3, 0.2]))
+
+    assert calculate_annual_turnover(accounting.weights) > 0.5
+    turnover = calculate_annual_turnover(accounting.weights, accounting.turnover)
+    assert turnover == pytest.approx(0.5 * accounting.turnover.iloc[1])
+    assert accounting.turnover.iloc[0] == pytest.approx(0.0)
@@ -6,11 +6,14 @@ runs correctly and produces all the expected artifacts with the correct structur
 """
 
 import pytest
+import numpy as np
 import pandas as pd
 import asyncio
 import logging
 
 # We need to import the main functions from the scripts we want to test
+from src.data.processor import DataProcessor
+from src.run_daily_update import LOOKBACK_WINDOW, load_returns
 from src.run_full_backtest import main as run_backtest
 from src.reporting.run_visualizations import main as run_visuals
 
@@ -74,3 +77,30 @@ def test_task_a_full_pipeline(tmp_path, monkeypatch):
     assert not index_df.empty
     assert isinstance(index_df.index, pd.DatetimeIndex)
     assert index_df.iloc[0, 0] == 100.0, "Index should start at 100."
+
+
+def test_daily_update_returns_match_the_full_history(tmp_path, monkeypatch):
+    """The update's returns window equals the full run's returns, gaps at its start included."""
+    rng = np.random.default_rng(8)
+    dates = pd.bdate_range("2022-01-03", periods=400)
+    prices = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(0, 0.01, (400, 3)), axis=0)),
+        index=dates,
+        columns=["AAA", "BBB", "SPY"],
+    )
+    last_rebalance = dates[350]
+    # A price gap straddling the first day of the update's lookback window
+    window_start = 350 - LOOKBACK_WINDOW + 1
+    prices.iloc[window_start - 3 : window_start + 2, 1] = np.nan
+    price_path = tmp_path / "prices.csv"
+    prices.to_csv(price_path)
+    monkeypatch.setattr("src.run_daily_update.PRICE_DATA_PATH", price_path)
+
+    loaded = load_returns(last_rebalance)
+
+    processor = DataProcessor()
+    stored = pd.read_csv(price_path, index_col=0, parse_dates=True)
+    expected = processor.clean_data(processor.calculate_returns(stored))
+    assert (loaded.index < last_rebalance).sum() == LOOKBACK_WINDOW
+    pd.testing.assert_frame_equal(loaded, expected.loc[loaded.index[0] :])
+    assert loaded.notna().all().all()
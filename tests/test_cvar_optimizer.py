@@ -1,9 +1,26 @@
 # tests/test_cvar_optimizer.py
 
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
 import pytest
 import numpy as np
 import pandas as pd
-from src.optimization.cvar_optimizer import CVaROptimizer
+from src.optimization.cvar_optimizer import (
+    AlphaAwareCVaROptimizer,
+    CVaROptimizer,
+    RegimeAwareCVaROptimizer,
+    RollingCVaROptimizer,
+    _speculation_holds,
+)
+from src.optimization.factor_model import PCAFactorModel
+from src.optimization.first_order import project_capped_simplex
+from src.optimization.presolve import presolve_cvar
+from src.optimization import result_cache
+from src.optimization.result_cache import ResultCache
+from src.optimization.scenario_reduction import REDUCTION_METHODS, ScenarioReducer
+from src.optimization.sensitivity import weight_sensitivities
 
 
 @pytest.fixture
@@ -24,6 +41,37 @@ def test_cvar_optimizer_initialization():
     assert optimizer.max_weight == 0.2
 
 
+def test_dpp_warning_is_only_silenced_inside_solves(sample_returns_data):
+    """Importing and using the optimizer leaves the process-wide warning filters alone."""
+    filters = list(warnings.filters)
+    CVaROptimizer(solver="ECOS").optimize(sample_returns_data)
+    assert warnings.filters == filters
+    assert not any(
+        f[1] is not None and f[1].pattern.startswith("Your problem has too many")
+        for f in warnings.filters
+    )
+
+
+def test_dpp_warning_filter_does_not_leak_from_threaded_solves():
+    """Concurrent solves on one optimizer leave the process-wide warning filters alone."""
+    # Large enough for CVXPY's too-many-parameters warning
+    returns = pd.DataFrame(np.random.default_rng(2).normal(0, 0.01, (500, 25)))
+    filters = list(warnings.filters)
+    optimizer = CVaROptimizer(alpha=0.95, max_weight=0.25, solver="ECOS")
+    params = [replace(optimizer.params, max_weight=0.2 + 0.01 * (i % 5)) for i in range(32)]
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        with ThreadPoolExecutor(8) as pool:
+            results = list(
+                pool.map(lambda p: optimizer.optimize(returns, params=p), params)
+            )
+        assert not any("too many parameters" in str(w.message) for w in caught)
+
+    assert all(result.status == "optimal" for result in results)
+    assert warnings.filters == filters
+
+
 def test_optimization_constraints(sample_returns_data):
     """Test that optimization respects all weight constraints."""
     optimizer = CVaROptimizer(alpha=0.95, max_weight=0.25, solver="SCS")
@@ -85,3 +133,729 @@ def test_max_weight_constraint_is_active():
     assert np.isclose(
         weights[0], max_w, atol=1e-4
     ), f"The superior asset's weight should be at the max_weight ceiling ({max_w})."
+
+
+def test_compiled_problem_is_reused_across_windows(sample_returns_data):
+    """A window of the same shape reuses the compiled problem and matches a fresh solve."""
+    optimizer = CVaROptimizer(alpha=0.95, max_weight=0.25, solver="ECOS")
+    first_window = sample_returns_data.iloc[:60]
+    second_window = sample_returns_data.iloc[40:]
+
+    optimizer.optimize(first_window)
+    compiled = optimizer._get_problem(60, 10)
+    reused = optimizer.optimize(second_window, current_weights=np.full(10, 0.1))
+
+    assert len(optimizer._problems) == 1
+    assert optimizer._get_problem(60, 10) is compiled
+
+    fresh = CVaROptimizer(alpha=0.95, max_weight=0.25, solver="ECOS").optimize(
+        second_window, current_weights=np.full(10, 0.1)
+    )
+    assert reused.status == fresh.status == "optimal"
+    np.testing.assert_allclose(reused.weights, fresh.weights, atol=1e-6)
+    assert np.isclose(reused.cvar, fresh.cvar, atol=1e-8)
+
+
+def test_warm_start_reports_iteration_savings(sample_returns_data):
+    """A warm-started re-solve needs fewer iterations and reaches the same portfolio."""
+    optimizer = CVaROptimizer(alpha=0.95, max_weight=0.25, solver="SCS", warm_start=True)
+    cold = optimizer.optimize(sample_returns_data)
+    warm = optimizer.optimize(sample_returns_data, current_weights=cold.weights)
+
+    assert cold.iterations is not None and cold.iterations_saved is None
+    assert warm.iterations_saved is not None
+    assert warm.iterations_saved == cold.iterations - warm.iterations
+
+    reference = CVaROptimizer(alpha=0.95, max_weight=0.25, solver="SCS").optimize(
+        sample_returns_data, current_weights=cold.weights
+    )
+    np.testing.assert_allclose(warm.weights, reference.weights, atol=1e-3)
+
+
+def test_iterations_saved_is_measured_per_warm_start_solver(sample_returns_data):
+    """Savings are measured against each solver's own cold solve, and only if it warm-starts."""
+    optimizer = CVaROptimizer(alpha=0.95, max_weight=0.25, solver="ECOS", warm_start=True)
+    ecos_cold = optimizer.optimize(sample_returns_data)
+    ecos_again = optimizer.optimize(sample_returns_data, current_weights=ecos_cold.weights)
+    assert ecos_cold.iterations_saved is None and ecos_again.iterations_saved is None
+
+    optimizer.solver = "SCS"
+    scs_cold = optimizer.optimize(sample_returns_data)
+    scs_warm = optimizer.optimize(sample_returns_data, current_weights=ecos_cold.weights)
+    assert scs_cold.solver == scs_warm.solver == "SCS"
+    assert scs_cold.iterations_saved is None
+    assert scs_warm.iterations_saved == scs_cold.iterations - scs_warm.iterations
+
+
+@pytest.mark.parametrize("with_turnover", [False, True])
+def test_highs_backend_matches_cvxpy(sample_returns_data, with_turnover):
+    """The direct sparse-LP HiGHS backend reaches the same optimum as the CVXPY path."""
+    current_weights = np.full(10, 0.1) if with_turnover else None
+    kwargs = dict(alpha=0.95, max_weight=0.25, transaction_cost=0.01)
+    cvxpy_result = CVaROptimizer(solver="ECOS", **kwargs).optimize(
+        sample_returns_data, current_weights=current_weights
+    )
+    highs_result = CVaROptimizer(solver="HIGHS", **kwargs).optimize(
+        sample_returns_data, current_weights=current_weights
+    )
+
+    assert highs_result.status == "optimal"
+    assert np.isclose(highs_result.cvar, cvxpy_result.cvar, atol=1e-7)
+    assert np.isclose(highs_result.turnover, cvxpy_result.turnover, atol=1e-5)
+    np.testing.assert_allclose(highs_result.weights, cvxpy_result.weights, atol=1e-5)
+
+
+def test_cutting_plane_matches_full_lp():
+    """The cutting-plane solver reaches the full LP optimum on a long lookback."""
+    np.random.seed(7)
+    returns = pd.DataFrame(np.random.randn(1500, 20) / 100)
+    benchmark = returns.mean(axis=1) + np.random.randn(1500) / 1000
+    current_weights = np.full(20, 0.05)
+    kwargs = dict(alpha=0.95, max_weight=0.15, transaction_cost=0.002)
+
+    full = CVaROptimizer(solver="HIGHS", **kwargs).optimize(returns, benchmark, current_weights)
+    cuts = CVaROptimizer(solver="CUTTING_PLANE", **kwargs).optimize(
+        returns, benchmark, current_weights
+    )
+
+    assert cuts.status == "optimal"
+    full_objective = full.cvar + 0.002 * full.turnover
+    cuts_objective = cuts.cvar + 0.002 * cuts.turnover
+    assert np.isclose(cuts_objective, full_objective, atol=1e-7)
+    np.testing.assert_allclose(cuts.weights, full.weights, atol=1e-4)
+
+
+def test_column_generation_matches_full_lp():
+    """Column generation over a wide universe stops at the full LP optimum."""
+    rng = np.random.default_rng(7)
+    returns = pd.DataFrame(rng.standard_t(4, (300, 400)) / 100)
+    benchmark = returns.iloc[:, :30].mean(axis=1) + rng.normal(0, 0.001, 300)
+    current_weights = np.zeros(400)
+    current_weights[rng.choice(400, 25, replace=False)] = 1 / 25
+    kwargs = dict(alpha=0.95, max_weight=0.1, transaction_cost=0.002, lasso_penalty=0.0)
+
+    full = CVaROptimizer(solver="HIGHS", **kwargs).optimize(returns, benchmark, current_weights)
+    columns = CVaROptimizer(
+        solver="COLUMN_GENERATION", solver_options={"initial_size": 20}, **kwargs
+    ).optimize(returns, benchmark, current_weights)
+
+    assert columns.status == "optimal"
+    assert columns.iterations > 1, "The first master should not already be optimal."
+    full_objective = full.cvar + 0.002 * full.turnover
+    columns_objective = columns.cvar + 0.002 * columns.turnover
+    assert np.isclose(columns_objective, full_objective, atol=1e-9)
+    np.testing.assert_allclose(columns.weights, full.weights, atol=1e-6)
+
+
+def test_project_capped_simplex():
+    """The projection lands on the capped simplex and is idempotent."""
+    v = np.random.default_rng(0).normal(size=50)
+    w = project_capped_simplex(v, upper=0.05)
+
+    assert np.isclose(w.sum(), 1.0)
+    assert w.min() >= 0.0 and w.max() <= 0.05 + 1e-12
+    np.testing.assert_allclose(project_capped_simplex(w, upper=0.05), w, atol=1e-12)
+
+
+def test_first_order_solver_approaches_lp_optimum(sample_returns_data):
+    """The smoothed first-order solver lands close to the exact LP optimum."""
+    kwargs = dict(alpha=0.95, max_weight=0.25, transaction_cost=0.002)
+    current_weights = np.full(10, 0.1)
+    # A benchmark the assets cannot replicate exactly, so the optimum is non-trivial
+    benchmark = sample_returns_data.mean(axis=1) + np.random.default_rng(1).normal(0, 0.002, 100)
+    exact = CVaROptimizer(solver="HIGHS", **kwargs).optimize(
+        sample_returns_data, benchmark, current_weights
+    )
+    first_order = CVaROptimizer(solver="FIRST_ORDER", **kwargs).optimize(
+        sample_returns_data, benchmark, current_weights
+    )
+
+    # The smoothed solution is not certified as the exact LP optimum
+    assert first_order.status == "optimal_inaccurate"
+    assert np.isclose(first_order.weights.sum(), 1.0)
+    assert np.all(first_order.weights <= 0.25 + 1e-9)
+    exact_objective = exact.cvar + 0.002 * exact.turnover
+    first_order_objective = first_order.cvar + 0.002 * first_order.turnover
+    assert first_order_objective == pytest.approx(exact_objective, rel=1e-2)
+
+
+@pytest.mark.parametrize("method", REDUCTION_METHODS)
+def test_scenario_reducer_respects_budget(sample_returns_data, method):
+    """Every reduction method returns at most the budget with probabilities summing to one."""
+    R = sample_returns_data.values
+    reduced = ScenarioReducer(method=method, n_scenarios=20).reduce(R, R.mean(axis=1))
+
+    assert reduced.returns.shape[0] <= 20
+    assert reduced.returns.shape[1] == R.shape[1]
+    assert np.isclose(reduced.probabilities.sum(), 1.0)
+
+
+def test_importance_reduction_keeps_tail(sample_returns_data):
+    """Importance sampling keeps every tail scenario of the reference portfolio."""
+    R = sample_returns_data.values
+    b = R.mean(axis=1) + np.random.default_rng(2).normal(0, 0.002, 100)
+    reduced = ScenarioReducer(method="importance", n_scenarios=30, tail_fraction=0.1).reduce(R, b)
+
+    tail_losses = np.sort(b - R.mean(axis=1))[-10:]
+    kept_losses = reduced.benchmark - reduced.returns.mean(axis=1)
+    assert np.all(np.isin(tail_losses, kept_losses))
+
+
+def test_weighted_scenarios_match_duplicated_scenarios(sample_returns_data):
+    """Doubling a scenario's probability is the same as repeating it in the window."""
+    R = sample_returns_data.values[:40]
+    b = R.mean(axis=1) + np.random.default_rng(3).normal(0, 0.002, 40)
+    optimizer = CVaROptimizer(alpha=0.9, lasso_penalty=0.0, max_weight=0.25, solver="HIGHS")
+
+    duplicated = optimizer._solve(np.vstack([R, R[:10]]), np.concatenate([b, b[:10]]))
+    probabilities = np.where(np.arange(40) < 10, 2.0, 1.0) / 50
+    weighted = optimizer._solve(R, b, scenario_weights=probabilities)
+
+    assert weighted.cvar == pytest.approx(duplicated.cvar, abs=1e-8)
+
+
+def test_factor_model_is_cached_per_window(sample_returns_data):
+    """Decomposing the same window twice reuses the cached SVD."""
+    R = sample_returns_data.values
+    factor_model = PCAFactorModel(explained_variance=0.8)
+    decomposition = factor_model.decompose(R)
+
+    assert factor_model.decompose(R.copy()) is decomposition
+    assert decomposition.explained_variance >= 0.8
+    assert decomposition.scores.shape == (100, decomposition.n_factors)
+    assert decomposition.loadings.shape == (10, decomposition.n_factors)
+
+
+@pytest.mark.parametrize("solver", ["ECOS", "HIGHS", "CUTTING_PLANE"])
+def test_full_rank_factor_model_matches_full_solve(sample_returns_data, solver):
+    """With every factor kept there is no residual, so the factor-space optimum is exact."""
+    kwargs = dict(alpha=0.95, lasso_penalty=0.0, max_weight=0.25, solver=solver)
+    current_weights = np.full(10, 0.1)
+    benchmark = sample_returns_data.mean(axis=1) + np.random.default_rng(4).normal(0, 0.002, 100)
+    full = CVaROptimizer(**kwargs).optimize(sample_returns_data, benchmark, current_weights)
+    factored = CVaROptimizer(factor_model=PCAFactorModel(n_factors=10), **kwargs).optimize(
+        sample_returns_data, benchmark, current_weights
+    )
+
+    assert factored.status == "optimal"
+    assert factored.cvar == pytest.approx(full.cvar, rel=1e-4, abs=1e-7)
+
+
+def test_optimize_batch_matches_individual_solves(sample_returns_data):
+    """A batch over a parameter grid returns the same results, in grid order, as one-off solves."""
+    optimizer = CVaROptimizer(lasso_penalty=0.0, max_weight=0.25, solver="HIGHS")
+    grid = [{"alpha": 0.99, "max_weight": 0.2}, {"alpha": 0.9}, {"alpha": 0.95, "max_weight": 0.3}]
+    results = optimizer.optimize_batch(sample_returns_data, grid)
+
+    assert len(results) == len(grid)
+    for params, result in zip(grid, results):
+        single = CVaROptimizer(
+            lasso_penalty=0.0, solver="HIGHS", **{"max_weight": 0.25, **params}
+        ).optimize(sample_returns_data)
+        assert result.cvar == pytest.approx(single.cvar, abs=1e-8)
+    # The optimizer's own parameters are left untouched
+    assert optimizer.alpha == 0.95 and optimizer.max_weight == 0.25
+
+
+def test_optimize_batch_rejects_unknown_parameters(sample_returns_data):
+    """Grid keys the optimizer does not understand raise instead of being ignored."""
+    with pytest.raises(ValueError):
+        CVaROptimizer().optimize_batch(sample_returns_data, [{"regime_prob": 0.5}])
+
+
+def test_presolve_drops_missing_assets_and_folds_duplicate_days(sample_returns_data):
+    """All-missing assets are removed and repeated days become one weighted scenario."""
+    R = sample_returns_data.values.copy()
+    R[:, 3] = 0.0  # e.g. a name before its listing, zero-filled
+    R[50:55] = R[10]  # five repeats of day 10
+    b = R.mean(axis=1)
+    current_weights = np.full(10, 1 / 9)
+    current_weights[3] = 0.0
+    missing = np.arange(10) == 3
+    presolved = presolve_cvar(
+        R, b, max_weight=0.25, current_weights=current_weights, missing_assets=missing
+    )
+
+    assert presolved.returns.shape == (95, 9)
+    assert presolved.current_weights.shape == (9,)
+    assert np.isclose(presolved.scenario_weights.sum(), 1.0)
+    assert np.isclose(presolved.scenario_weights.max(), 6 / 100)
+    assert presolved.expand(np.ones(9))[3] == 0.0
+
+
+def test_presolve_keeps_held_and_zero_return_assets(sample_returns_data):
+    """A zero-return column is a cash-like asset, and a held one is never force-sold."""
+    returns = sample_returns_data.copy()
+    returns.iloc[:, 3] = 0.0
+    kwargs = dict(alpha=0.95, max_weight=0.25, transaction_cost=0.01, solver="HIGHS")
+    current_weights = np.full(10, 0.1)
+
+    presolved = CVaROptimizer(**kwargs).optimize(returns, current_weights=current_weights)
+    plain = CVaROptimizer(presolve=False, **kwargs).optimize(
+        returns, current_weights=current_weights
+    )
+    assert presolved.weights[3] == pytest.approx(plain.weights[3], abs=1e-9)
+    assert presolved.weights[3] > 0
+    assert presolved.cvar + 0.01 * presolved.turnover == pytest.approx(
+        plain.cvar + 0.01 * plain.turnover, abs=1e-9
+    )
+
+    # An asset without any data is only dropped when it is not held
+    returns.iloc[:, 3] = np.nan
+    held = CVaROptimizer(**kwargs).optimize(returns, current_weights=current_weights)
+    assert held.weights[3] == pytest.approx(plain.weights[3], abs=1e-9)
+
+
+@pytest.mark.parametrize("solver", ["ECOS", "HIGHS"])
+def test_presolve_matches_solve_without_missing_assets(sample_returns_data, solver):
+    """Presolving equals solving the live universe only, with the missing asset at zero."""
+    returns = sample_returns_data.copy()
+    returns.iloc[:, 3] = np.nan
+    returns.iloc[60:70] = returns.iloc[20].values
+    benchmark = returns.fillna(0.0).mean(axis=1) + np.random.default_rng(5).normal(0, 0.002, 100)
+    kwargs = dict(alpha=0.95, lasso_penalty=1.5, max_weight=0.25, solver=solver)
+    current_weights = np.full(10, 1 / 9)
+    current_weights[3] = 0.0
+    live = np.arange(10) != 3
+
+    presolved = CVaROptimizer(**kwargs).optimize(returns, benchmark, current_weights)
+    plain = CVaROptimizer(presolve=False, **kwargs).optimize(
+        returns.loc[:, live], benchmark, current_weights[live]
+    )
+
+    assert presolved.weights.shape == (10,)
+    assert presolved.weights[3] == 0.0
+    assert presolved.cvar == pytest.approx(plain.cvar, abs=1e-6)
+    np.testing.assert_allclose(presolved.weights[live], plain.weights, atol=1e-4)
+
+
+def test_solver_race_records_the_winner(sample_returns_data):
+    """Racing returns an optimal answer from one of the raced solvers and names it."""
+    kwargs = dict(alpha=0.95, lasso_penalty=0.0, max_weight=0.25)
+    benchmark = sample_returns_data.mean(axis=1) + np.random.default_rng(6).normal(0, 0.002, 100)
+    raced = CVaROptimizer(solver="RACE", race_solvers=["ECOS", "HIGHS"], **kwargs).optimize(
+        sample_returns_data, benchmark
+    )
+    exact = CVaROptimizer(solver="HIGHS", **kwargs).optimize(sample_returns_data, benchmark)
+
+    assert raced.status == "optimal"
+    assert raced.solver in ["ECOS", "HIGHS"]
+    assert raced.cvar == pytest.approx(exact.cvar, abs=1e-6)
+
+
+@pytest.mark.parametrize("solver", ["ECOS", "SCS", "FIRST_ORDER"])
+def test_exhausted_time_budget_returns_feasible_portfolio(sample_returns_data, solver):
+    """A budget that runs out returns a feasible 'deadline_feasible' portfolio, not NaNs."""
+    benchmark = sample_returns_data.mean(axis=1) + np.random.default_rng(7).normal(0, 0.002, 100)
+    optimizer = CVaROptimizer(alpha=0.95, lasso_penalty=0.0, max_weight=0.25, solver=solver)
+
+    result = optimizer.optimize(sample_returns_data, benchmark, time_budget=1e-6)
+
+    assert result.status == "deadline_feasible"
+    assert np.isfinite(result.cvar)
+    assert np.isclose(result.weights.sum(), 1.0)
+    assert result.weights.min() >= -1e-9
+    assert result.weights.max() <= 0.25 + 1e-9
+
+    # FIRST_ORDER only certifies an approximate optimum
+    status = optimizer.optimize(sample_returns_data, benchmark, time_budget=60).status
+    assert status in ["optimal", "optimal_inaccurate"]
+
+
+def test_ecos_time_budget_is_enforced_in_process(sample_returns_data, monkeypatch):
+    """Under a budget ECOS runs in the calling process, capped by its iteration limit."""
+    optimizer = CVaROptimizer(alpha=0.95, lasso_penalty=0.0, max_weight=0.25, solver="ECOS")
+    monkeypatch.setattr(optimizer, "_solve_race", lambda *args, **kwargs: pytest.fail("forked"))
+
+    first = optimizer.optimize(sample_returns_data, time_budget=60)
+    second = optimizer.optimize(sample_returns_data, time_budget=60)
+
+    assert first.status == second.status == "optimal"
+    (problem,) = optimizer._problems.values()
+    assert problem.iteration_limit("ECOS", 60.0) >= second.iterations
+
+
+@pytest.mark.parametrize("solver", ["ECOS", "HIGHS"])
+def test_result_reports_solver_telemetry(sample_returns_data, solver):
+    """Results carry the solver chain, the time split and the problem dimensions."""
+    returns = sample_returns_data.copy()
+    returns.iloc[:, 3] = np.nan
+    optimizer = CVaROptimizer(alpha=0.95, max_weight=0.25, solver=solver)
+    current_weights = np.full(10, 1 / 9)
+    current_weights[3] = 0.0
+
+    result = optimizer.optimize(returns, current_weights=current_weights)
+
+    assert result.solver == solver
+    assert result.solvers_tried == [solver]
+    assert (result.n_scenarios, result.n_assets, result.n_factors) == (100, 9, None)
+    assert result.n_variables > 9 and result.n_constraints > 100
+    assert result.total_time >= result.presolve_time + result.setup_time + result.solve_time * 0.99
+
+
+def test_rolling_backtest_collects_telemetry():
+    """The rolling backtest keeps one telemetry row per rebalance."""
+    rng = np.random.default_rng(8)
+    dates = pd.bdate_range("2020-01-01", periods=160)
+    returns = pd.DataFrame(rng.normal(0, 0.01, (160, 6)), index=dates)
+    benchmark = returns.mean(axis=1) + rng.normal(0, 0.002, 160)
+    optimizer = CVaROptimizer(alpha=0.95, max_weight=0.4, solver="HIGHS")
+    rolling = RollingCVaROptimizer(optimizer, lookback_window=60, rebalance_frequency="M")
+
+    rebalances, _, _ = rolling.backtest(returns, benchmark)
+
+    assert list(rolling.telemetry.index) == list(rebalances["date"])
+    assert (rolling.telemetry["solver"] == "HIGHS").all()
+    assert (rolling.telemetry["n_scenarios"] <= 60).all()
+    assert rolling.telemetry["total_time"].notna().all()
+
+
+def test_result_cache_skips_repeated_solves(sample_returns_data, tmp_path):
+    """An identical problem is served from the cache; any changed input is re-solved."""
+    cache = ResultCache(cache_dir=tmp_path)
+    optimizer = CVaROptimizer(alpha=0.95, max_weight=0.25, solver="HIGHS", result_cache=cache)
+
+    first = optimizer.optimize(sample_returns_data)
+    second = optimizer.optimize(sample_returns_data)
+    assert not first.from_cache and second.from_cache
+    np.testing.assert_array_equal(first.weights, second.weights)
+
+    optimizer.max_weight = 0.2
+    assert not optimizer.optimize(sample_returns_data).from_cache
+    assert not optimizer.optimize(sample_returns_data.iloc[1:]).from_cache
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    """The store stays within max_bytes by dropping the oldest entries."""
+    cache = ResultCache(cache_dir=tmp_path, max_bytes=2500)
+    for i in range(5):
+        cache.put(f"key{i}", np.zeros(100) + i)
+
+    assert sum(path.stat().st_size for path in tmp_path.glob("*.pkl")) <= 2500
+    assert cache.get("key0") is None
+    np.testing.assert_array_equal(cache.get("key4"), np.full(100, 4.0))
+
+
+def test_result_cache_key_is_salted_with_the_code_version(tmp_path, monkeypatch):
+    """Bumping the cache version changes every key; the store is created on first write."""
+    cache = ResultCache(cache_dir=tmp_path / "store")
+    assert not cache.cache_dir.exists()
+    assert ResultCache().cache_dir.is_absolute()
+
+    key = cache.make_key({"alpha": 0.95}, R=np.eye(3))
+    monkeypatch.setattr(result_cache, "CACHE_VERSION", result_cache.CACHE_VERSION + 1)
+    assert cache.make_key({"alpha": 0.95}, R=np.eye(3)) != key
+
+    cache.put(key, 1.0)
+    assert cache.get(key) == 1.0
+
+
+def test_optimize_array_matches_dataframe_api(sample_returns_data):
+    """The ndarray entry point gives the same portfolio as the DataFrame wrapper."""
+    benchmark = sample_returns_data.mean(axis=1) + np.random.default_rng(9).normal(0, 0.002, 100)
+    alpha_scores = pd.Series(np.linspace(-1, 1, 10), index=sample_returns_data.columns[::-1])
+    kwargs = dict(alpha=0.95, max_weight=0.25, solver="HIGHS", alpha_factor=0.001)
+
+    framed = AlphaAwareCVaROptimizer(**kwargs).optimize(
+        sample_returns_data, benchmark, alpha_scores=alpha_scores
+    )
+    aligned = alpha_scores.reindex(sample_returns_data.columns).values
+    native = AlphaAwareCVaROptimizer(**kwargs).optimize_array(
+        sample_returns_data.values.astype(np.float32), benchmark.values, alpha_scores=aligned
+    )
+
+    assert native.status == framed.status == "optimal"
+    np.testing.assert_allclose(native.weights, framed.weights, atol=1e-5)
+
+
+def test_shared_optimizer_serves_concurrent_calls(sample_returns_data):
+    """Threads sharing one optimizer with per-call params match sequential solves."""
+    optimizer = CVaROptimizer(alpha=0.95, lasso_penalty=0.0, max_weight=0.25, solver="ECOS")
+    grid = [
+        replace(optimizer.params, max_weight=m, alpha=a) for m in (0.2, 0.3) for a in (0.9, 0.95)
+    ]
+    expected = [
+        CVaROptimizer(solver="ECOS", **vars(params)).optimize(sample_returns_data)
+        for params in grid
+    ]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(
+            pool.map(lambda params: optimizer.optimize(sample_returns_data, params=params), grid)
+        )
+
+    for result, reference in zip(results, expected):
+        assert result.status == "optimal"
+        assert result.cvar == pytest.approx(reference.cvar, abs=1e-7)
+    assert optimizer.params == replace(grid[0], alpha=0.95, max_weight=0.25)
+
+
+def test_max_weight_sensitivity_matches_finite_difference(sample_returns_data):
+    """Analytic d(weights)/d(max_weight) agrees with a central difference of two solves."""
+    benchmark = sample_returns_data.mean(axis=1) + np.random.default_rng(3).normal(0, 0.002, 100)
+    kwargs = dict(alpha=0.95, lasso_penalty=0.0, solver="HIGHS")
+    result = CVaROptimizer(max_weight=0.15, **kwargs).optimize(
+        sample_returns_data, benchmark, sensitivities=True
+    )
+
+    h = 1e-5
+    up = CVaROptimizer(max_weight=0.15 + h, **kwargs).optimize(sample_returns_data, benchmark)
+    down = CVaROptimizer(max_weight=0.15 - h, **kwargs).optimize(sample_returns_data, benchmark)
+    finite_difference = (up.weights - down.weights) / (2 * h)
+
+    assert result.status == "optimal"
+    assert np.abs(finite_difference).max() > 0.1, "max_weight should bind in this window."
+    np.testing.assert_allclose(result.sensitivities["max_weight"], finite_difference, atol=1e-6)
+    assert result.sensitivities["max_weight"].sum() == pytest.approx(0.0, abs=1e-9)
+    assert set(result.sensitivities) == {"max_weight"}
+    with pytest.raises(ValueError, match="Objective-only"):
+        weight_sensitivities(
+            sample_returns_data.to_numpy(),
+            benchmark.to_numpy(),
+            result.weights,
+            alpha=0.95,
+            max_weight=0.15,
+            parameters=["alpha"],
+        )
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        dict(solver="FIRST_ORDER"),
+        dict(solver="SCS"),
+        dict(solver="HIGHS", scenario_reducer=ScenarioReducer(n_scenarios=40)),
+        dict(solver="HIGHS", factor_model=PCAFactorModel(n_factors=3)),
+    ],
+)
+def test_sensitivities_are_skipped_for_approximate_solves(sample_returns_data, settings):
+    """Approximate solvers and approximated windows have no active set to differentiate."""
+    optimizer = CVaROptimizer(alpha=0.95, lasso_penalty=0.0, max_weight=0.15, **settings)
+
+    result = optimizer.optimize(sample_returns_data, sensitivities=True)
+
+    assert np.isfinite(result.weights).all()
+    assert result.sensitivities is None
+
+
+def test_cvar_decomposition_matches_per_date_tail_means():
+    """Batched CVaR contributions match a per-date loop and add up to the portfolio CVaR."""
+    rng = np.random.default_rng(17)
+    dates = pd.bdate_range("2020-01-01", periods=300)
+    returns = pd.DataFrame(rng.normal(0, 0.01, (300, 6)), index=dates, columns=list("ABCDEF"))
+    rebalance_dates = dates[[120, 180, 299]]
+    weights = pd.DataFrame(
+        rng.dirichlet(np.ones(6), 3), index=rebalance_dates, columns=list("ABCDEF")
+    )
+    optimizer = CVaROptimizer(alpha=0.95)
+
+    contributions = optimizer.calculate_cvar_decomposition(returns, weights, lookback_window=100)
+
+    for date in rebalance_dates:
+        end = dates.get_loc(date)
+        window = returns.iloc[end - 100 : end].values
+        w = weights.loc[date].values
+        tail = np.argsort(window @ w)[:5]
+        np.testing.assert_allclose(
+            contributions.loc[date].values, -w * window[tail].mean(axis=0), atol=1e-15
+        )
+        assert contributions.loc[date].sum() == pytest.approx(-(window[tail] @ w).mean())
+
+
+def test_batch_portfolio_metrics_match_single_portfolio(sample_returns_data):
+    """Each row of the batch metrics equals calculate_portfolio_metrics for that portfolio."""
+    rng = np.random.default_rng(5)
+    weights = rng.dirichlet(np.ones(10), 20)
+    benchmark = sample_returns_data.mean(axis=1)
+    optimizer = CVaROptimizer()
+
+    batch = optimizer.calculate_portfolio_metrics_batch(sample_returns_data, weights, benchmark)
+
+    assert batch.shape[0] == 20
+    for k in (0, 7, 19):
+        single = optimizer.calculate_portfolio_metrics(sample_returns_data, weights[k], benchmark)
+        assert list(batch.columns) == list(single)
+        for name, value in single.items():
+            assert batch.loc[k, name] == pytest.approx(value, rel=1e-9), name
+
+
+def test_regime_path_serves_probabilities_like_direct_solves():
+    """Path interpolation within one active set, and re-solves across breakpoints, are exact."""
+    rng = np.random.default_rng(0)
+    returns = pd.DataFrame(rng.normal(0, 1, (150, 20)) * np.linspace(0.005, 0.03, 20))
+    benchmark = returns.mean(axis=1) + rng.normal(0, 0.003, 150)
+    optimizer = RegimeAwareCVaROptimizer(
+        solver="HIGHS",
+        risk_on_params={"alpha": 0.95, "lasso_penalty": 0.0, "max_weight": 0.1},
+        risk_off_params={"alpha": 0.95, "lasso_penalty": 0.0, "max_weight": 0.095},
+    )
+    path = optimizer.solve_regime_path(returns, benchmark, grid=(0.0, 0.25, 0.5, 0.75, 1.0))
+    coarse = RegimeAwareCVaROptimizer(
+        solver="HIGHS",
+        risk_on_params={"alpha": 0.95, "lasso_penalty": 0.0, "max_weight": 0.3},
+        risk_off_params={"alpha": 0.99, "lasso_penalty": 0.0, "max_weight": 0.08},
+    )
+    coarse_path = coarse.solve_regime_path(returns, benchmark, grid=(0.0, 1.0))
+
+    for regime_prob in (0.2, 0.7):
+        served = optimizer.optimize_on_path(path, regime_prob)
+        direct = optimizer.optimize(returns, benchmark, regime_prob=regime_prob)
+        assert served.solver == "regime_path"
+        np.testing.assert_allclose(served.weights, direct.weights, atol=1e-8)
+        assert served.cvar == pytest.approx(direct.cvar, abs=1e-10)
+
+        served = coarse.optimize_on_path(coarse_path, regime_prob)
+        direct = coarse.optimize(returns, benchmark, regime_prob=regime_prob)
+        assert served.solver == "HIGHS"
+        np.testing.assert_allclose(served.weights, direct.weights, atol=1e-8)
+
+
+# Kept speculative answers are exact for HiGHS; ECOS only reproduces them to its accuracy
+@pytest.mark.parametrize(
+    "solver, weights_atol, returns_atol", [("HIGHS", 1e-9, 1e-12), ("ECOS", 1e-7, 1e-9)]
+)
+@pytest.mark.parametrize("transaction_cost", [0.0001, 0.001])
+def test_speculative_backtest_matches_sequential(
+    transaction_cost, solver, weights_atol, returns_atol
+):
+    """The parallel speculative backtest reproduces the sequential one."""
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2020-01-01", periods=400)
+    returns = pd.DataFrame(rng.standard_t(4, (400, 20)) * np.linspace(0.005, 0.02, 20), index=dates)
+    benchmark = returns.mean(axis=1) + rng.normal(0, 0.002, 400)
+    kwargs = dict(solver=solver, max_weight=0.15, transaction_cost=transaction_cost)
+
+    sequential = RollingCVaROptimizer(
+        CVaROptimizer(**kwargs), lookback_window=120, rebalance_frequency="M"
+    ).backtest(returns, benchmark)
+    speculative = RollingCVaROptimizer(
+        CVaROptimizer(**kwargs), lookback_window=120, rebalance_frequency="M", n_jobs=2
+    ).backtest(returns, benchmark)
+
+    np.testing.assert_allclose(
+        np.vstack(speculative[0]["weights"]),
+        np.vstack(sequential[0]["weights"]),
+        atol=weights_atol,
+    )
+    np.testing.assert_allclose(speculative[1].values, sequential[1].values, atol=returns_atol)
+
+
+def test_speculation_only_trusts_exact_optimal_answers(sample_returns_data):
+    """Approximate answers are never kept unverified, and a zero-pass setting is refused."""
+    with pytest.raises(ValueError, match="speculation_passes"):
+        RollingCVaROptimizer(CVaROptimizer(), n_jobs=2, speculation_passes=0)
+
+    exact = CVaROptimizer(max_weight=0.25, solver="HIGHS").optimize(sample_returns_data)
+    prior = exact.weights.copy()
+    assert _speculation_holds(prior, exact, prior, 0.001, 0.0)
+    for solver, status in [("SCS", "optimal"), ("HIGHS", "optimal_inaccurate")]:
+        approximate = replace(exact, solver=solver, status=status)
+        assert not _speculation_holds(prior, approximate, prior, 0.001, 0.0)
+
+    # Weights within interior-point noise of the guessed kink are not trusted to sit on
+    # the side of the true current weight
+    k = int(np.argmax(exact.weights))
+    near_kink, current = prior.copy(), prior.copy()
+    near_kink[k] -= 1e-8
+    current[k] -= 0.05
+    assert not _speculation_holds(near_kink, exact, current, 0.001, 0.0)
+    near_kink[k] -= 1e-3
+    assert _speculation_holds(near_kink, exact, current, 0.001, 0.0)
+
+
+def test_backtest_charges_turnover_against_drifted_weights():
+    """Rebalance-day returns are net of costs on the turnover from the drifted holdings."""
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2020-01-01", periods=200)
+    returns = pd.DataFrame(rng.normal(0, 0.01, (200, 8)), index=dates)
+    returns.iloc[130, 2] = np.nan
+    optimizer = CVaROptimizer(max_weight=0.3, transaction_cost=0.002, solver="HIGHS")
+    rolling = RollingCVaROptimizer(optimizer, lookback_window=60, rebalance_frequency="M")
+
+    rebalances, portfolio_returns, daily_weights = rolling.backtest(returns, returns.mean(axis=1))
+
+    assert daily_weights.index[0] == rebalances["date"].iloc[0]
+    for date in rebalances["date"].iloc[1:]:
+        loc = daily_weights.index.get_loc(date)
+        held = daily_weights.iloc[loc - 1]
+        previous = returns.loc[daily_weights.index[loc - 1]].fillna(0.0)
+        drifted = held * (1 + previous)
+        drifted /= drifted.sum()
+        turnover = (daily_weights.loc[date] - drifted).abs().sum()
+        gross = (daily_weights.loc[date] * returns.loc[date]).sum()
+        assert portfolio_returns.loc[date] == pytest.approx(gross - 0.002 * turnover, abs=1e-15)
+
+
+def test_backtest_resumes_from_checkpoint(tmp_path):
+    """A backtest resumed from an interrupted run's checkpoint matches an uninterrupted one."""
+    rng = np.random.default_rng(4)
+    dates = pd.bdate_range("2020-01-01", periods=200)
+    returns = pd.DataFrame(rng.normal(0, 0.01, (200, 6)), index=dates)
+    benchmark = returns.mean(axis=1)
+    checkpoint = tmp_path / "backtest.ckpt"
+
+    def rolling(max_weight=0.4):
+        optimizer = CVaROptimizer(max_weight=max_weight, transaction_cost=0.002, solver="HIGHS")
+        return RollingCVaROptimizer(optimizer, lookback_window=60, rebalance_frequency="M")
+
+    expected, expected_returns, _ = rolling().backtest(returns, benchmark)
+    # Interrupted after the rebalances up to the end of June
+    rolling().backtest(returns, benchmark, end_date="2020-06-30", checkpoint_path=str(checkpoint))
+    rebalances, portfolio_returns, _ = rolling().backtest(
+        returns, benchmark, resume_from=str(checkpoint)
+    )
+
+    assert len(rebalances) == len(expected)
+    np.testing.assert_array_equal(np.vstack(rebalances["weights"]), np.vstack(expected["weights"]))
+    pd.testing.assert_series_equal(portfolio_returns, expected_returns)
+    with pytest.raises(ValueError, match="does not match"):
+        rolling().backtest(returns, benchmark, start_date="2020-02-03", resume_from=str(checkpoint))
+    with pytest.raises(ValueError, match="does not match the optimizer settings"):
+        rolling(max_weight=0.3).backtest(returns, benchmark, resume_from=str(checkpoint))
+    with pytest.raises(ValueError, match="does not match the optimizer settings or the returns"):
+        rolling().backtest(returns.drop(dates[100]), benchmark, resume_from=str(checkpoint))
+    restated = returns.copy()
+    restated.iloc[50, 2] += 1e-4
+    with pytest.raises(ValueError, match="does not match the optimizer settings or the returns"):
+        rolling().backtest(restated, benchmark, resume_from=str(checkpoint))
+
+
+def test_backtest_update_matches_full_rerun():
+    """Extending a backtest day by day reproduces a backtest over the longer history."""
+    rng = np.random.default_rng(6)
+    dates = pd.bdate_range("2020-01-01", periods=220)
+    returns = pd.DataFrame(rng.normal(0, 0.01, (220, 6)), index=dates)
+    benchmark = returns.mean(axis=1)
+
+    def rolling():
+        optimizer = CVaROptimizer(max_weight=0.4, transaction_cost=0.002, solver="HIGHS")
+        return RollingCVaROptimizer(optimizer, lookback_window=60, rebalance_frequency="M")
+
+    expected, expected_returns, expected_weights = rolling().backtest(returns, benchmark)
+
+    # Published through mid-July, then extended as each new day arrives
+    daily = rolling()
+    _, portfolio_returns, daily_weights = daily.backtest(returns, benchmark, end_date="2020-07-15")
+    new_rebalances = []
+    for end in dates[dates > "2020-07-15"]:
+        window = returns.loc[:end].iloc[-150:]
+        rebalances, new_returns, new_weights = daily.update(
+            window, benchmark.loc[window.index], daily.state
+        )
+        new_rebalances.append(rebalances)
+        # Rows from the first changed day on are restated
+        first = new_returns.index[0]
+        portfolio_returns = pd.concat(
+            [portfolio_returns[portfolio_returns.index < first], new_returns]
+        )
+        daily_weights = pd.concat([daily_weights[daily_weights.index < first], new_weights])
+
+    rebalances = pd.concat(new_rebalances)
+    assert list(rebalances["date"]) == list(expected["date"][expected["date"] > "2020-07-15"])
+    np.testing.assert_allclose(
+        np.vstack(rebalances["weights"]),
+        np.vstack(expected["weights"][expected["date"] > "2020-07-15"]),
+    )
+    np.testing.assert_allclose(portfolio_returns, expected_returns, atol=1e-12)
+    np.testing.assert_allclose(daily_weights, expected_weights, atol=1e-12)
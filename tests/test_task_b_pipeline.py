@@ -103,11 +103,16 @@ class TestRegimeAwareOptimizer(unittest.TestCase):
     def test_optimize_calls_super_with_correct_params(self, mock_super_optimize):
         """Verify that the optimizer calls the parent method with interpolated params."""
 
+        original_alpha = self.optimizer.alpha
+
         def check_params_at_call_time(*args, **kwargs):
-            """Side effect to check optimizer state when super().optimize is called."""
-            self.assertAlmostEqual(self.optimizer.alpha, 0.945)
-            self.assertAlmostEqual(self.optimizer.lasso_penalty, 0.055)
-            self.assertAlmostEqual(self.optimizer.max_weight, 0.06)
+            """Side effect to check the per-call params passed to super().optimize."""
+            params = kwargs["params"]
+            self.assertAlmostEqual(params.alpha, 0.945)
+            self.assertAlmostEqual(params.lasso_penalty, 0.055)
+            self.assertAlmostEqual(params.max_weight, 0.06)
+            # The shared optimizer itself is never modified
+            self.assertEqual(self.optimizer.alpha, original_alpha)
             return MagicMock()
 
         mock_super_optimize.side_effect = check_params_at_call_time